@@ -0,0 +1,99 @@
+"""
+Compare rows/sec of the old DataFrame.to_sql load path with db.bulk_insert.
+
+    python scripts/benchmark_bulk_load.py --rows 200000 --batches 100 --repeat 3
+
+Each run loads the same synthetic clean_submissions rows into a fresh SQLite file
+created from sql/00_schema.sql, split into --batches appends (one per submission
+file or CSV chunk, as run_month does).
+"""
+import argparse
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.db import bulk_insert, transaction, tune_for_bulk_load
+
+SCHEMA = Path(__file__).resolve().parents[1] / "sql" / "00_schema.sql"
+
+
+def make_rows(n: int, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    pick = lambda values: rng.choice(np.array(values, dtype=object), size=n)  # noqa: E731
+    return pd.DataFrame(
+        {
+            "report_month": pick(["2025-10", "2025-11", "2025-12"]),
+            # dimension keys, as etl_run loads them (dimensions.DimensionKeys.encode)
+            "team_id": pick(list(range(1, 9))),
+            "indicator_code": pick(["YTH_EMP_001", "WEE_BIZ_002", "GBV_SRV_003", "YTH_TRN_004", "WLD_LDR_005"]),
+            "region_id": pd.array(pick([1, 2, 3, 4, None]), dtype="Int64"),
+            "gender_id": pick([1, 2]),
+            "age_band_id": pick([1, 2, 3, 4]),
+            "value": rng.integers(0, 120, size=n).astype(float),
+            "submitted_on": pick(["2025-12-03", "2025-12-10", None]),
+            "source_file": pick([f"Team_{c}_submission.xlsx" for c in "ABCDEFGH"]),
+            "loaded_at": "2026-01-05T09:00:00",
+        }
+    )
+
+
+def fresh_db(folder: Path, name: str) -> Path:
+    path = folder / f"{name}.sqlite"
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA.read_text(encoding="utf-8"))
+    conn.close()
+    return path
+
+
+def load_to_sql(path: Path, batches: list[pd.DataFrame]) -> None:
+    # the previous etl_run.append_df path: default pragmas, one commit per append
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    try:
+        for df in batches:
+            df.to_sql("clean_submissions", conn, if_exists="append", index=False)
+    finally:
+        conn.close()
+
+
+def load_bulk(path: Path, batches: list[pd.DataFrame]) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA foreign_keys = ON;")
+    conn.execute("PRAGMA journal_mode = WAL;")
+    tune_for_bulk_load(conn)
+    try:
+        with transaction(conn):
+            for df in batches:
+                bulk_insert(conn, "clean_submissions", df)
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--batches", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    df = make_rows(args.rows)
+    size = -(-args.rows // args.batches)
+    batches = [df.iloc[i : i + size] for i in range(0, args.rows, size)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, loader in [("to_sql", load_to_sql), ("bulk_insert", load_bulk)]:
+            timings = []
+            for i in range(args.repeat):
+                path = fresh_db(Path(tmp), f"{name}_{i}")
+                started = time.perf_counter()
+                loader(path, batches)
+                timings.append(time.perf_counter() - started)
+            best = min(timings)
+            print(f"{name:<12} {args.rows} rows in {args.batches} batches  best {best:.3f}s  {args.rows / best:,.0f} rows/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Compare submission workbook readers: the previous path (pd.read_excel, openpyxl, every column
+type-inferred) against io_inputs.read_submission_xlsx on each available engine, which reads only
+the columns standardize uses.
+
+    python scripts/benchmark_excel_read.py --files 4 --rows 20000 --repeat 3
+
+Workbooks come from scripts/generate_sample_submissions.py (fixed seed) in a temp folder. Each
+reader's standardized output is checked against the previous path's.
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from src.io_inputs import EXCEL_ENGINES, read_submission_xlsx
+from src.standardize import standardize_submission
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def previous_reader(path: Path) -> pd.DataFrame:
+    return pd.read_excel(path, sheet_name="submission")
+
+
+def available_engines() -> list[str]:
+    engines = []
+    for engine in EXCEL_ENGINES:
+        try:
+            __import__("python_calamine" if engine == "calamine" else engine)
+        except ImportError:
+            continue
+        engines.append(engine)
+    return engines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=4, help="workbooks (teams) to read")
+    parser.add_argument("--rows", type=int, default=20_000, help="rows per workbook")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        subprocess.run(
+            [
+                sys.executable,
+                str(ROOT / "scripts" / "generate_sample_submissions.py"),
+                "--teams", str(args.files),
+                "--months", "1",
+                "--rows-per-file", str(args.rows),
+                "--out", str(Path(tmp) / "submissions"),
+                "--registry", str(Path(tmp) / "indicator_registry.xlsx"),
+            ],
+            cwd=ROOT,
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+        files = sorted(Path(tmp, "submissions").glob("*/*.xlsx"))
+        readers = {"read_excel (previous)": previous_reader}
+        for engine in available_engines():
+            readers[f"read_submission_xlsx[{engine}]"] = lambda p, e=engine: read_submission_xlsx(p, engine=e)
+
+        expected = {f: standardize_submission(previous_reader(f), f) for f in files}
+        best = dict.fromkeys(readers, float("inf"))
+        frames = {}
+        # readers take turns within each repeat, so load drift on the machine hits them alike
+        for _ in range(args.repeat):
+            for name, reader in readers.items():
+                started = time.perf_counter()
+                frames[name] = {f: reader(f) for f in files}
+                best[name] = min(best[name], time.perf_counter() - started)
+
+        baseline = best["read_excel (previous)"]
+        for name in readers:
+            same = all(standardize_submission(frames[name][f], f).equals(expected[f]) for f in files)
+            rows = sum(len(df) for df in frames[name].values())
+            print(
+                f"{name:<32} best {best[name]:.3f}s  {rows / best[name]:>10,.0f} rows/sec  "
+                f"x{baseline / best[name]:.1f}  same standardized output: {'yes' if same else 'NO'}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Time the monthly pipeline end to end at several data scales and keep the results, so runs
+can be compared across commits.
+
+    python scripts/benchmark_pipeline.py                            # scales: small, medium
+    python scripts/benchmark_pipeline.py --scales small,large --repeat 3
+    python scripts/benchmark_pipeline.py --scale 40x6x20000:csv     # teams x months x rows per file[:format]
+    python scripts/benchmark_pipeline.py --compare                  # stored results, by scale and commit
+
+Each scale gets a scratch folder with data from scripts/generate_sample_submissions.py (fixed seed),
+a fresh SQLite database and the ingest cache off. The ETL's run log gives the read / standardize /
+validate / db_append / gold_rebuild times; exceptions reports, briefs (all re-rendered) and a full
+incremental export are timed after it. Results are appended to --results as JSON lines, tagged
+with the git commit.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+RESULTS = ROOT / "data" / "outputs" / "benchmarks" / "pipeline_results.jsonl"
+
+# columns of the summary table, in pipeline order
+STAGES = [
+    "read",
+    "standardize",
+    "validate",
+    "db_append",
+    "resolve_duplicates",
+    "anomalies",
+    "timeliness",
+    "load_month",
+    "gold_rebuild",
+    "exceptions_report",
+    "brief",
+    "export",
+]
+
+
+@dataclass(frozen=True)
+class Scale:
+    name: str
+    teams: int
+    months: int
+    rows_per_file: int | None = None  # None: the sample data's small files
+    fmt: str = "xlsx"
+    mess: float = 1.0
+
+
+SCALES = {
+    "small": Scale("small", 5, 3),
+    "medium": Scale("medium", 20, 3, 2_000),
+    "large": Scale("large", 50, 6, 20_000, "csv"),
+}
+
+
+def parse_scale(spec: str) -> Scale:
+    # TEAMSxMONTHSxROWS[:FORMAT]
+    dims, _, fmt = spec.partition(":")
+    teams, months, rows = (int(x) for x in dims.split("x"))
+    return Scale(spec.replace(":", "-"), teams, months, rows, fmt or "xlsx")
+
+
+def git_commit() -> tuple[str, bool]:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True)
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT, capture_output=True, text=True)
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown", False
+    return commit.stdout.strip(), bool(status.stdout.strip())
+
+
+def scale_env(work: Path) -> dict:
+    env = dict(os.environ)
+    env.update(
+        PYTHONPATH=str(ROOT),
+        DB_TYPE="sqlite",  # never point a benchmark at the configured Postgres database
+        SQLITE_PATH=str(work / "bench.sqlite"),
+        RAW_SUBMISSIONS_DIR=str(work / "submissions"),
+        INDICATOR_REGISTRY_PATH=str(work / "indicator_registry.xlsx"),
+        OUTPUT_EXCEPTIONS_DIR=str(work / "out" / "exceptions"),
+        OUTPUT_BRIEFS_DIR=str(work / "out" / "briefs"),
+        OUTPUT_LOGS_DIR=str(work / "out" / "logs"),
+        POWERBI_EXPORT_DIR=str(work / "out" / "powerbi"),
+        JOB_QUEUE_PATH=str(work / "jobs.sqlite"),
+        INGEST_CACHE="0",
+    )
+    return env
+
+
+def run(cmd: list[str], env: dict) -> None:
+    subprocess.run([sys.executable, *cmd], cwd=ROOT, env=env, check=True, stdout=subprocess.DEVNULL)
+
+
+def child(spec_path: str) -> None:
+    """Runs inside the scale's environment: the pipeline, then the post-load outputs one by one."""
+    from src.brief_generate import generate_briefs
+    from src.config import settings
+    from src.etl_run import run_months, write_exceptions_report
+    from src.instrument import peak_rss_mb
+    from src.powerbi_export import export_incremental
+
+    spec = json.loads(Path(spec_path).read_text(encoding="utf-8"))
+    months = spec["months"]
+    started = time.perf_counter()
+    stats = run_months(months, use_cache=False, wait_for_jobs=False)
+    seconds = {}
+
+    t = time.perf_counter()
+    for s in stats:
+        write_exceptions_report(s.report_month, s.exception_ids[0], s.exception_ids[1], s.exceptions)
+    seconds["exceptions_report"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    briefs = generate_briefs(months, scopes=settings.brief_scopes, workers=settings.brief_workers, force=True)
+    seconds["brief"] = time.perf_counter() - t
+
+    t = time.perf_counter()
+    export_incremental(settings.powerbi_export_dir, full=True)
+    seconds["export"] = time.perf_counter() - t
+    total = time.perf_counter() - started
+
+    log = json.loads(max(Path(settings.output_logs_dir).glob("run_*.json"), key=os.path.getmtime).read_text(encoding="utf-8"))
+    seconds = {**log["stage_seconds"], **seconds}
+    result = {
+        "files": sum(s.files_read for s in stats),
+        "raw_rows": log["raw_rows"],
+        "clean_rows": log["clean_rows"],
+        "exceptions": log["exceptions"],
+        "briefs": len(briefs),
+        "peak_rss_mb": max(filter(None, [log["peak_rss_mb"], peak_rss_mb()]), default=None),
+        "seconds": {k: round(v, 4) for k, v in seconds.items()},
+        "total_seconds": round(total, 4),
+    }
+    Path(spec["result_path"]).write_text(json.dumps(result), encoding="utf-8")
+
+
+def bench_scale(scale: Scale, repeat: int, work: Path) -> list[dict]:
+    env = scale_env(work)
+    gen = ["scripts/generate_sample_submissions.py", "--teams", str(scale.teams), "--months", str(scale.months)]
+    gen += ["--format", scale.fmt, "--mess", str(scale.mess)]
+    if scale.rows_per_file is not None:
+        gen += ["--rows-per-file", str(scale.rows_per_file)]
+    t = time.perf_counter()
+    run(gen, env)
+    print(f"[{scale.name}] data generated in {time.perf_counter() - t:.1f}s")
+
+    months = sorted(p.name for p in Path(env["RAW_SUBMISSIONS_DIR"]).iterdir() if p.is_dir())
+    results = []
+    for i in range(repeat):
+        for p in [work / "bench.sqlite", work / "jobs.sqlite"]:
+            p.unlink(missing_ok=True)
+        run(["scripts/init_db.py"], env)
+        spec = work / "spec.json"
+        spec.write_text(json.dumps({"months": months, "result_path": str(work / "result.json")}), encoding="utf-8")
+        run([str(Path(__file__).resolve()), "--child", str(spec)], env)
+        result = json.loads((work / "result.json").read_text(encoding="utf-8"))
+        results.append({"repeat": i, **result})
+        print(f"[{scale.name}] run {i + 1}/{repeat}: {result['total_seconds']:.2f}s, {result['raw_rows']} rows, peak {result['peak_rss_mb']} MB")
+    return results
+
+
+def compare(results_path: Path) -> None:
+    if not results_path.exists():
+        print(f"No results yet in {results_path}")
+        return
+    rows = [json.loads(line) for line in results_path.read_text(encoding="utf-8").splitlines() if line.strip()]
+    flat = pd.DataFrame(
+        [
+            {
+                "scale": r["scale"]["name"],
+                "commit": r["commit"] + ("+" if r["dirty"] else ""),
+                "timestamp": r["timestamp"],
+                "rows": r["raw_rows"],
+                "total": r["total_seconds"],
+                **{s: r["seconds"].get(s) for s in STAGES},
+                "peak_mb": r["peak_rss_mb"],
+            }
+            for r in rows
+        ]
+    )
+    # median over repeats, one line per scale and commit in the order they were first run
+    flat["first_run"] = flat.groupby(["scale", "commit"])["timestamp"].transform("min")
+    table = flat.groupby(["scale", "first_run", "commit"]).median(numeric_only=True).reset_index().drop(columns="first_run")
+    print(table.round(3).to_string(index=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="small,medium", help=f"comma-separated presets: {', '.join(SCALES)}")
+    parser.add_argument("--scale", action="append", default=[], help="custom scale TEAMSxMONTHSxROWS[:FORMAT] (repeatable)")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--results", type=Path, default=RESULTS, help="JSON lines file the results are appended to")
+    parser.add_argument("--workdir", type=Path, default=None, help="keep the scratch data here instead of a temp folder")
+    parser.add_argument("--compare", action="store_true", help="print stored results and exit")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return
+    if args.compare:
+        compare(args.results)
+        return
+
+    scales = [SCALES[name] for name in args.scales.split(",") if name] + [parse_scale(s) for s in args.scale]
+    commit, dirty = git_commit()
+    args.results.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            work = (args.workdir or Path(tmp)) / scale.name
+            work.mkdir(parents=True, exist_ok=True)
+            for result in bench_scale(scale, args.repeat, work):
+                record = {
+                    "timestamp": datetime.utcnow().isoformat(timespec="seconds"),
+                    "commit": commit,
+                    "dirty": dirty,
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "scale": asdict(scale),
+                    **result,
+                }
+                with args.results.open("a", encoding="utf-8") as fh:
+                    fh.write(json.dumps(record) + "\n")
+    print(f"Results appended to {args.results}")
+    compare(args.results)
+
+
+if __name__ == "__main__":
+    main()
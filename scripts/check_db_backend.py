@@ -0,0 +1,115 @@
+"""
+Round-trip check of the configured database backend (DB_TYPE) without touching its data:
+inside one transaction that is always rolled back, key a few rows' dimensions
+(dimensions.DimensionKeys), bulk-load them through db.bulk_insert (COPY on Postgres), read
+them back with qmark parameters, re-aggregate their gold partition and compare it with a
+full rebuild, then resubmit one row and resolve the duplicate (duplicates.resolve_duplicates),
+remove the resubmitted file again and check the original row is back in gold
+(etl_run.remove_file), and score the raw rows' submission dates against the deadline
+(timeliness.refresh_timeliness).
+
+    python scripts/init_db.py                      # once, against an empty database
+    DB_TYPE=postgres python scripts/check_db_backend.py
+
+Against the docker-compose service: `docker compose up -d db`, then DB_TYPE=postgres with the
+default DB_* settings. DB_HOST may also be a Postgres unix socket directory.
+"""
+import sys
+
+import pandas as pd
+
+from src.db import bulk_insert, connect, execute, get_backend, read_sql
+from src.dimensions import DimensionKeys
+from src.duplicates import natural_keys, resolve_duplicates
+from src.etl_run import gold_mismatch_count, rebuild_gold, remove_file
+from src.timeliness import refresh_timeliness
+
+MONTH = "1900-01"  # never a real reporting month
+
+ROWS = pd.DataFrame(
+    {
+        "report_month": [MONTH] * 3,
+        "team": ["Team_A", "Team_A", 'Team "B", East'],
+        "indicator_code": ["CHECK_001"] * 3,
+        "region": ["North", "", None],  # '' and NULL must stay distinct
+        "gender": ["Female", "Male", None],
+        "age_band": ["15-19", "20-24", pd.NA],
+        "value": [1.5, float("nan"), 4.0],
+        "submitted_on": ["1900-02-01", None, "1900-02-03"],
+        "submitted_date": ["1900-02-01", None, "1900-02-03"],
+        "source_file": ["check.csv"] * 3,
+        "loaded_at": ["1900-02-05T00:00:00"] * 3,
+    }
+)
+
+
+def main() -> int:
+    backend = get_backend()
+    conn = connect()
+    failures = []
+    try:
+        # rebuild_gold joins this outer transaction, so nothing is committed
+        backend.begin(conn)
+        bulk_insert(conn, "clean_submissions", DimensionKeys(conn).encode(ROWS.assign(natural_key=natural_keys(ROWS))))
+
+        back = read_sql(
+            conn,
+            "SELECT team, region, value FROM vw_clean_submissions WHERE report_month = ? ORDER BY id",
+            (MONTH,),
+        )
+        if back["team"].tolist() != ROWS["team"].tolist():
+            failures.append(f"teams read back as {back['team'].tolist()}")
+        if back["region"].tolist()[:2] != ["North", ""] or back["region"].iloc[2] is not None:
+            failures.append(f"regions read back as {back['region'].tolist()}")
+        if back["value"].isna().tolist() != [False, True, False]:
+            failures.append(f"values read back as {back['value'].tolist()}")
+
+        rebuild_gold(conn, {MONTH})
+        gold_rows = execute(conn, "SELECT COUNT(*) FROM gold_indicator_mart WHERE report_month = ?", (MONTH,)).fetchone()[0]
+        if gold_rows != 3:
+            failures.append(f"{gold_rows} gold rows for 3 distinct grains")
+        if gold_mismatch_count(conn):
+            failures.append("incremental gold differs from a full rebuild")
+
+        # the first row again from a later file: with DUPLICATE_POLICY=latest it replaces the original
+        resubmitted = ROWS.iloc[:1].assign(
+            value=2.5, submitted_on="1900-02-04", submitted_date="1900-02-04", source_file="check_again.csv"
+        )
+        bulk_insert(conn, "clean_submissions", DimensionKeys(conn).encode(resubmitted.assign(natural_key=natural_keys(resubmitted))))
+        dropped = resolve_duplicates(conn, {MONTH}, policy="latest").exceptions
+        kept = read_sql(conn, "SELECT source_file FROM vw_clean_submissions WHERE report_month = ? ORDER BY id", (MONTH,))
+        if dropped["source_file"].tolist() != ["check.csv"] or kept["source_file"].tolist() != ["check.csv", "check.csv", "check_again.csv"]:
+            failures.append(f"duplicate resolution kept {kept['source_file'].tolist()}, dropped {dropped['source_file'].tolist()}")
+
+        # the resubmitted file goes away: the row it superseded counts in gold again
+        gold_sum = "SELECT SUM(actual_value) FROM gold_indicator_mart WHERE report_month = ?"
+        rebuild_gold(conn, {MONTH})
+        resubmitted_total = execute(conn, gold_sum, (MONTH,)).fetchone()[0]
+        restored = remove_file(conn, MONTH, "check_again.csv").restored
+        rebuild_gold(conn, {MONTH})
+        total = execute(conn, gold_sum, (MONTH,)).fetchone()[0]
+        if restored != 1 or resubmitted_total != 6.5 or total != 5.5:
+            failures.append(f"removing the resubmission restored {restored} rows, gold total {resubmitted_total} -> {total} (expected 6.5 -> 5.5)")
+
+        # DATE columns in and out: the last dated row is a week before the 1900-02-10 deadline
+        bulk_insert(conn, "raw_submissions", DimensionKeys(conn).encode(ROWS))
+        refresh_timeliness(conn, {MONTH})
+        late = read_sql(
+            conn,
+            "SELECT dated_rows, days_after_deadline FROM team_timeliness WHERE report_month = ? ORDER BY days_after_deadline",
+            (MONTH,),
+        )
+        if late["dated_rows"].tolist() != [1, 1] or late["days_after_deadline"].tolist() != [-9, -7]:
+            failures.append(f"team timeliness read back as {late.to_dict('records')}")
+    finally:
+        backend.rollback(conn)
+        conn.close()
+
+    for f in failures:
+        print(f"FAIL {f}")
+    print(f"{backend.name}: {'round trip failed' if failures else 'round trip ok'}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""
+Fail (exit 1) if a light CLI path starts importing the heavy libraries again, or its imports
+take longer than a budget.
+
+    python scripts/check_import_time.py                  # default budget
+    python scripts/check_import_time.py --budget-ms 120
+
+Each check runs in a fresh interpreter under `python -X importtime` and sums the per-module
+times it reports, best of --repeat runs. Checks run against the SQLite backend; `status`
+reads SQLITE_PATH, so run it where that database exists (it is checked either way).
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# name -> interpreter arguments
+CHECKS = {
+    "import src.cli": ["-c", "import src.cli"],
+    "cli --help": ["-m", "src.cli", "--help"],
+    "cli status": ["-m", "src.cli", "status"],
+}
+# loaded by the subcommands that need them, never by these paths
+HEAVY = ("pandas", "numpy", "pyarrow", "reportlab", "jinja2", "openpyxl", "python_calamine", "sqlalchemy", "psycopg2")
+
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+\d+ \| (\s*)(\S+)")
+
+
+def import_profile(args: list[str]) -> tuple[float, set[str], str]:
+    """(total import ms, top-level packages imported, stderr with the importtime lines removed)"""
+    # SQLite: with DB_TYPE=postgres, connecting loads SQLAlchemy for the pool by design
+    env = {**os.environ, "PYTHONPATH": str(ROOT), "DB_TYPE": "sqlite"}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    total_us = 0
+    packages = set()
+    other = []
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if m:
+            total_us += int(m.group(1))
+            packages.add(m.group(3).split(".")[0])
+        elif not line.startswith("import time:"):
+            other.append(line)
+    return total_us / 1000, packages, "\n".join(other)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget-ms", type=float, default=150, help="import time allowed per check")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    failures = 0
+    for name, cmd in CHECKS.items():
+        best = float("inf")
+        for _ in range(args.repeat):
+            ms, packages, stderr = import_profile(cmd)
+            best = min(best, ms)
+        problems = []
+        heavy = sorted(p for p in HEAVY if p in packages)
+        if heavy:
+            problems.append(f"imports {', '.join(heavy)}")
+        if best > args.budget_ms:
+            problems.append(f"over the {args.budget_ms:g} ms budget")
+        if "Traceback" in stderr:
+            problems.append("raised: " + stderr.strip().splitlines()[-1])
+        print(f"{'FAIL' if problems else 'ok':<5} {name:<16} {best:7.1f} ms" + (f"  ({'; '.join(problems)})" if problems else ""))
+        failures += bool(problems)
+
+    if failures:
+        print(f"{failures} of {len(CHECKS)} entry points regressed")
+        return 1
+    print(f"All {len(CHECKS)} entry points import within {args.budget_ms:g} ms and without {', '.join(HEAVY)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+"""
+Check that the ingest cache (src/ingest_cache.py) serves a file's frames as if it had been
+parsed again: the cache is keyed by content, so the same bytes under another name must come
+back with that name as source_file, in raw, clean and exception rows alike, and with this
+run's loaded_at.
+
+    python scripts/check_ingest_cache.py
+
+Works in a temporary directory; the database and INGEST_CACHE_DIR are not touched.
+"""
+import sys
+import tempfile
+from pathlib import Path
+
+from src.ingest import iter_ingest
+from src.ingest_cache import IngestCache
+
+CSV = (
+    "report_month,team,indicator_code,region,gender,age_band,value,submitted_on\n"
+    "2025-11,Team_A,CHECK_001,North,Female,15-19,10,2025-12-01\n"
+    "2025-11,Team_A,CHECK_001,South,Male,20-24,12,2025-12-01\n"
+    "2025-11,Team_A,NOT_A_CODE,North,Female,15-19,3,2025-12-01\n"  # an exception row
+)
+
+
+def main() -> int:
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp:
+        first, copy = Path(tmp, "Team_A_submission_2025-11.csv"), Path(tmp, "Team_A_resubmission_2025-11.csv")
+        first.write_text(CSV, encoding="utf-8")
+        copy.write_text(CSV, encoding="utf-8")
+        cache = IngestCache(Path(tmp, "cache"), registry_version="check")
+
+        parsed = list(iter_ingest([first], {"CHECK_001"}, "2025-12-02T00:00:00", cache=cache))
+        served = list(iter_ingest([copy], {"CHECK_001"}, "2025-12-03T00:00:00", cache=cache))
+        if [r.cached for r in parsed + served] != [False, True]:
+            failures.append(f"cache hits were {[r.cached for r in parsed + served]}, expected [False, True]")
+        r = served[0]
+        if r.exceptions.empty:
+            failures.append("no exception rows to check")
+        for part, df in (("raw", r.raw), ("clean", r.clean), ("exceptions", r.exceptions)):
+            names = sorted(set(df["source_file"].astype(str)))
+            if names != [copy.name]:
+                failures.append(f"cached {part} rows name {names}, expected {[copy.name]}")
+        for part, df in (("raw", r.raw), ("clean", r.clean)):
+            if set(df["loaded_at"]) != {"2025-12-03T00:00:00"}:
+                failures.append(f"cached {part} rows loaded_at {sorted(set(df['loaded_at']))}")
+
+    for f in failures:
+        print(f"FAIL {f}")
+    print("ingest cache: " + ("failed" if failures else "ok"))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
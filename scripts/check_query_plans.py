@@ -0,0 +1,116 @@
+"""
+Run EXPLAIN QUERY PLAN over every report_month-scoped query the pipeline issues and
+fail (exit 1) if any of them scans a whole table instead of using an index.
+
+    python scripts/check_query_plans.py            # fresh in-memory schema from sql/
+    python scripts/check_query_plans.py --db PATH  # an existing database, with its statistics
+
+Whole-table reads that are full scans by design (full gold rebuild, exports) are not listed.
+"""
+import argparse
+import re
+import sqlite3
+import sys
+
+from src import anomalies, api, brief_generate, cli, duplicates, etl_run, powerbi_export, timeliness
+from src.db import schema_files
+
+MONTH = "2025-12"
+
+# name -> (sql, params, scans allowed by design: tiny dimension tables and their aliases)
+CHECKS = {
+    **{f"clear_month[{i}]": (sql, (MONTH,), ()) for i, sql in enumerate(etl_run.CLEAR_MONTH_SQL)},
+    **{f"drop_file_rows[{i}]": (sql, ("a.csv", "2026-01-01T00:00:00"), ()) for i, sql in enumerate(etl_run.DROP_FILE_ROWS_SQL)},
+    **{f"clear_file[{i}]": (sql, (MONTH, "a.csv"), ()) for i, sql in enumerate(etl_run.CLEAR_FILE_SQL)},
+    "forget_file": (etl_run.FORGET_FILE_SQL, (MONTH, "a.csv"), ()),
+    "file_stat": (etl_run.FILE_STAT_SQL, (1, 1, MONTH, "a.csv"), ()),
+    "duplicate_keys": (duplicates.DUPLICATE_KEYS_SQL, (MONTH,), ()),
+    "duplicate_rows": (duplicates.DUPLICATE_ROWS_SQL.format(placeholders="?,?"), (MONTH, 1, 2), ()),
+    "set_superseded": (duplicates.SET_SUPERSEDED_SQL.format(placeholders="?,?"), (1, 1, 2), ()),
+    "delete_duplicate_warnings": (duplicates.DELETE_EXCEPTIONS_SQL, (MONTH, duplicates.ISSUE_PREFIX + "%"), ()),
+    "month_totals": (anomalies.MONTH_TOTALS_SQL.format(placeholders="?,?"), ("2025-11", MONTH), ()),
+    "value_stats_history": (anomalies.HISTORY_SQL.format(placeholders="?,?"), ("2024-12", "2025-11"), ()),
+    "delete_value_stats": (anomalies.DELETE_STATS_SQL.format(placeholders="?,?"), ("2025-11", MONTH), ()),
+    "team_dates": (timeliness.TEAM_DATES_SQL.format(placeholders="?,?"), ("2025-11", MONTH), ()),
+    "delete_timeliness": (timeliness.DELETE_TIMELINESS_SQL.format(placeholders="?,?"), ("2025-11", MONTH), ()),
+    "months_for_indicators": (
+        etl_run.MONTHS_FOR_INDICATORS_SQL.format(placeholders="?,?"),
+        ("YTH_EMP_001", "WEE_BIZ_002"),
+        (),
+    ),
+    "gold_delete_months": (etl_run.GOLD_DELETE_MONTHS_SQL.format(placeholders="?,?"), ("2025-11", MONTH), ()),
+    "gold_insert_months": (etl_run.GOLD_INSERT_MONTHS_SQL.format(placeholders="?,?"), ("2025-11", MONTH), ()),
+    "national_delete_months": (etl_run.NATIONAL_DELETE_MONTHS_SQL.format(placeholders="?,?"), ("2025-11", MONTH), ()),
+    "national_insert_months": (etl_run.NATIONAL_INSERT_MONTHS_SQL.format(placeholders="?,?"), ("2025-11", MONTH), ()),
+    **{
+        f"brief_{name}": (sql.format(placeholders="?,?"), ("2025-11", MONTH), ())
+        for name, sql in [
+            ("intake", brief_generate.INTAKE_SQL),
+            ("clean", brief_generate.CLEAN_SQL),
+            ("dq", brief_generate.DQ_SQL),
+            ("summary", brief_generate.SUMMARY_SQL),
+            ("late", brief_generate.LATE_SQL),
+        ]
+    },
+    "exceptions_report": (etl_run.EXCEPTIONS_REPORT_SQL, (1, 500), ()),
+    "exceptions_month_report": (etl_run.EXCEPTIONS_MONTH_REPORT_SQL, (MONTH,), ()),
+    "late_reporting_view": ("SELECT * FROM vw_late_reporting_flags WHERE report_month = ?", (MONTH,), ()),
+    **{
+        f"export_partition[{ds.name}]": (powerbi_export.partition_sql(ds), (MONTH,), ())
+        for ds in powerbi_export.DATASETS
+        if ds.partitioned
+    },
+    **{
+        f"api_{name}": (*api.build_query(name, {"month": MONTH}), ())
+        for name, endpoint in api.ENDPOINTS.items()
+        if "month" in endpoint.filters
+    },
+    # one row per month from partition_state, each count an index range
+    "status_months": (cli.STATUS_MONTHS_SQL, (12,), ("partition_state", "p")),
+}
+
+
+def full_scans(conn: sqlite3.Connection, sql: str, params, allowed) -> list[str]:
+    plan = [row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+    # co-routines / materialized views and subqueries are scanned as intermediate results
+    derived = {m.group(2) for d in plan if (m := re.match(r"(CO-ROUTINE|MATERIALIZE) (\S+)", d))}
+    bad = []
+    for detail in plan:
+        m = re.match(r"SCAN (\S+)", detail)
+        if not m:
+            continue
+        name = m.group(1)
+        if name in derived or name == "CONSTANT" or name.startswith("(") or name in allowed:
+            continue
+        bad.append(detail)
+    return bad
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", help="check against this SQLite file instead of a fresh schema")
+    args = parser.parse_args()
+
+    if args.db:
+        conn = sqlite3.connect(args.db)
+    else:
+        conn = sqlite3.connect(":memory:")
+        for path in schema_files():
+            conn.executescript(path.read_text(encoding="utf-8"))
+
+    failures = 0
+    for name, (sql, params, allowed) in CHECKS.items():
+        bad = full_scans(conn, sql, params, allowed)
+        print(f"{'FULL SCAN' if bad else 'ok':<10} {name}" + (f"  ({'; '.join(bad)})" if bad else ""))
+        failures += bool(bad)
+    conn.close()
+
+    if failures:
+        print(f"{failures} of {len(CHECKS)} queries regressed to a full table scan")
+        return 1
+    print(f"All {len(CHECKS)} queries use an index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,19 +1,65 @@
-import os
+"""
+Generate messy team submissions and the indicator registry.
+
+    python scripts/generate_sample_submissions.py     # the sample data: 5 teams x 3 months, small workbooks
+
+The size knobs turn it into a benchmark data generator; the defaults reproduce the sample data:
+
+    python scripts/generate_sample_submissions.py --teams 50 --months 6 --rows-per-file 20000 --format csv
+    python scripts/generate_sample_submissions.py --mess 0      # clean data
+    python scripts/generate_sample_submissions.py --mess 3      # three times the default mess
+
+--out / --registry default to RAW_SUBMISSIONS_DIR / INDICATOR_REGISTRY_PATH. The same seed and knobs
+always produce the same data.
+"""
+from __future__ import annotations
+
+import argparse
 import random
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from string import ascii_uppercase
 
+import numpy as np
 import pandas as pd
-from openpyxl import Workbook
 
 from src.config import settings
 
-
-def ensure_dirs(months):
-    Path(settings.raw_submissions_dir).mkdir(parents=True, exist_ok=True)
+REGIONS = ["North", "South", "East", "West"]
+GENDERS = ["Female", "Male"]
+AGE_BANDS = ["15-19", "20-24", "25-29", "30-35"]
+
+
+@dataclass(frozen=True)
+class Mess:
+    """How messy each submission is; probabilities are per file, fractions per row."""
+
+    missing_region_p: float = 0.5
+    missing_region_frac: float = 0.03
+    duplicates_p: float = 0.5
+    duplicates_frac: float = 0.05  # at least 5 rows
+    odd_dates_p: float = 0.7
+    misspelled_region_p: float = 0.6
+
+    def scaled(self, factor: float) -> Mess:
+        # factor 0 gives clean files (apart from the per-team column naming)
+        return Mess(
+            missing_region_p=min(1.0, self.missing_region_p * factor),
+            missing_region_frac=min(1.0, self.missing_region_frac * factor),
+            duplicates_p=min(1.0, self.duplicates_p * factor),
+            duplicates_frac=self.duplicates_frac * factor,
+            odd_dates_p=min(1.0, self.odd_dates_p * factor),
+            misspelled_region_p=min(1.0, self.misspelled_region_p * factor),
+        )
+
+
+def ensure_dirs(months, out_dir=None):
+    out_dir = Path(out_dir or settings.raw_submissions_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
     Path("data/indicator_registry").mkdir(parents=True, exist_ok=True)
     for m in months:
-        Path(settings.raw_submissions_dir, m).mkdir(parents=True, exist_ok=True)
+        Path(out_dir, m).mkdir(parents=True, exist_ok=True)
 
 
 def build_indicator_registry() -> pd.DataFrame:
@@ -90,14 +136,14 @@ def save_registry_xlsx(df: pd.DataFrame, out_path: str):
         df.to_excel(writer, index=False, sheet_name="indicator_registry")
 
 
-def make_months():
-    # Use the report_month and generate 3 months ending at report_month
+def make_months(n: int = 3):
+    # Use the report_month and generate n months ending at report_month
     # Format: YYYY-MM
     end = datetime.strptime(settings.report_month, "%Y-%m")
     months = []
     year = end.year
     month = end.month
-    for _ in range(3):
+    for _ in range(n):
         months.append(f"{year:04d}-{month:02d}")
         month -= 1
         if month == 0:
@@ -106,19 +152,28 @@ def make_months():
     return sorted(months)
 
 
-def generate_team_submission(registry: pd.DataFrame, month: str, team_name: str) -> pd.DataFrame:
-    # Create rows per indicator x disaggregation combo (small but realistic)
-    regions = ["North", "South", "East", "West"]
-    genders = ["Female", "Male"]
-    age_bands = ["15-19", "20-24", "25-29", "30-35"]
+def team_names(n: int) -> list[str]:
+    # Team_A .. Team_Z, then Team_AA, Team_AB, ...
+    names = []
+    for i in range(n):
+        label = ""
+        i += 1
+        while i:
+            i, r = divmod(i - 1, 26)
+            label = ascii_uppercase[r] + label
+        names.append(f"Team_{label}")
+    return names
+
 
+def _sample_rows(registry: pd.DataFrame, month: str, team_name: str) -> list[dict]:
+    # Create rows per indicator x disaggregation combo (small but realistic)
     rows = []
     for _, ind in registry.iterrows():
         code = ind["indicator_code"]
         # messy: some teams omit some disaggregations
-        for region in random.sample(regions, k=random.randint(2, 4)):
-            gender = random.choice(genders)
-            age_band = random.choice(age_bands)
+        for region in random.sample(REGIONS, k=random.randint(2, 4)):
+            gender = random.choice(GENDERS)
+            age_band = random.choice(AGE_BANDS)
             # value generation
             base = random.randint(10, 90)
             value = base + random.randint(-5, 25)
@@ -135,8 +190,38 @@ def generate_team_submission(registry: pd.DataFrame, month: str, team_name: str)
                     "submitted_on": f"{month}-" + str(random.randint(1, 28)).zfill(2),
                 }
             )
+    return rows
+
 
-    df = pd.DataFrame(rows)
+def _scaled_rows(registry: pd.DataFrame, month: str, team_name: str, n: int) -> pd.DataFrame:
+    # same value distributions as _sample_rows, drawn column-wise for large files
+    rng = np.random.default_rng(random.randint(0, 2**32 - 1))
+    values = rng.integers(10, 91, size=n) + rng.integers(-5, 26, size=n)
+    return pd.DataFrame(
+        {
+            "report_month": month,
+            "team": team_name,
+            "indicator_code": rng.choice(registry["indicator_code"].to_numpy(), size=n),
+            "region": rng.choice(REGIONS, size=n),
+            "gender": rng.choice(GENDERS, size=n),
+            "age_band": rng.choice(AGE_BANDS, size=n),
+            "value": np.maximum(values, 0),
+            "submitted_on": [f"{month}-{d:02d}" for d in rng.integers(1, 29, size=n)],
+        }
+    )
+
+
+def generate_team_submission(
+    registry: pd.DataFrame,
+    month: str,
+    team_name: str,
+    rows_per_file: int | None = None,
+    mess: Mess = Mess(),
+) -> pd.DataFrame:
+    if rows_per_file is None:
+        df = pd.DataFrame(_sample_rows(registry, month, team_name))
+    else:
+        df = _scaled_rows(registry, month, team_name, rows_per_file)
 
     # Inject realistic mess:
     # 1) inconsistent column naming by team
@@ -146,20 +231,21 @@ def generate_team_submission(registry: pd.DataFrame, month: str, team_name: str)
         df = df.rename(columns={"value": "reported_value", "age_band": "age_group"})
 
     # 2) missing values
-    if random.random() < 0.5:
-        ix = df.sample(frac=0.03, random_state=random.randint(1, 999)).index
+    if random.random() < mess.missing_region_p:
+        ix = df.sample(frac=mess.missing_region_frac, random_state=random.randint(1, 999)).index
         df.loc[ix, "region"] = None
 
     # 3) duplicate rows
-    if random.random() < 0.5 and len(df) > 10:
-        df = pd.concat([df, df.sample(5, random_state=random.randint(1, 999))], ignore_index=True)
+    if random.random() < mess.duplicates_p and len(df) > 10:
+        n_dup = min(len(df), round(max(5, len(df) * mess.duplicates_frac)))
+        df = pd.concat([df, df.sample(n_dup, random_state=random.randint(1, 999))], ignore_index=True)
 
     # 4) odd date formats
-    if "submission_date" in df.columns and random.random() < 0.7:
+    if "submission_date" in df.columns and random.random() < mess.odd_dates_p:
         df["submission_date"] = df["submission_date"].astype(str).str.replace("-", "/")
 
     # 5) spelling inconsistencies
-    if "region" in df.columns and random.random() < 0.6:
+    if "region" in df.columns and random.random() < mess.misspelled_region_p:
         df.loc[df["region"] == "North", "region"] = random.choice(["NORTH", "Nrth", "North "])
 
     return df
@@ -171,26 +257,67 @@ def save_team_excel(df: pd.DataFrame, out_file: Path):
         df.to_excel(writer, index=False, sheet_name="submission")
 
 
-def main():
-    random.seed(42)
-
-    months = make_months()
-    teams = ["Team_A", "Team_B", "Team_C", "Team_D", "Team_E"]
-
-    ensure_dirs(months)
+def generate(
+    teams: int = 5,
+    months: int = 3,
+    rows_per_file: int | None = None,
+    mess: float = 1.0,
+    fmt: str = "xlsx",
+    seed: int = 42,
+    out_dir: str | None = None,
+    registry_path: str | None = None,
+) -> list[str]:
+    """Write the registry and teams x months submission files; returns the months."""
+    random.seed(seed)
+    out_dir = out_dir or settings.raw_submissions_dir
+    registry_path = registry_path or settings.indicator_registry_path
+
+    month_list = make_months(months)
+    ensure_dirs(month_list, out_dir)
 
     registry = build_indicator_registry()
-    save_registry_xlsx(registry, settings.indicator_registry_path)
-    print(f"Saved indicator registry: {settings.indicator_registry_path}")
+    save_registry_xlsx(registry, registry_path)
+    print(f"Saved indicator registry: {registry_path}")
+
+    file_mess = Mess().scaled(mess)
+    for month in month_list:
+        for i, t in enumerate(team_names(teams)):
+            df = generate_team_submission(registry, month, t, rows_per_file, file_mess)
+            # "mixed" alternates the formats across teams
+            ext = fmt if fmt != "mixed" else ("xlsx", "csv")[i % 2]
+            out_path = Path(out_dir) / month / f"{t}_submission_{month}.{ext}"
+            if ext == "csv":
+                out_path.parent.mkdir(parents=True, exist_ok=True)
+                df.to_csv(out_path, index=False)
+            else:
+                save_team_excel(df, out_path)
+    return month_list
 
-    for month in months:
-        for t in teams:
-            df = generate_team_submission(registry, month, t)
-            fname = f"{t}_submission_{month}.xlsx"
-            out_path = Path(settings.raw_submissions_dir) / month / fname
-            save_team_excel(df, out_path)
 
-    print(f"Generated messy submissions for months: {months} in {settings.raw_submissions_dir}")
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--teams", type=int, default=5)
+    parser.add_argument("--months", type=int, default=3, help="months ending at REPORT_MONTH")
+    parser.add_argument("--rows-per-file", type=int, default=None, help="default: ~10-20 rows per indicator mix, as in the sample data")
+    parser.add_argument("--mess", type=float, default=1.0, help="scales every mess probability and ratio (0 = clean)")
+    parser.add_argument("--format", choices=["xlsx", "csv", "mixed"], default="xlsx")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default=None, help="submissions folder (default: RAW_SUBMISSIONS_DIR)")
+    parser.add_argument("--registry", default=None, help="registry workbook (default: INDICATOR_REGISTRY_PATH)")
+    args = parser.parse_args()
+
+    out_dir = args.out or settings.raw_submissions_dir
+    months = generate(
+        teams=args.teams,
+        months=args.months,
+        rows_per_file=args.rows_per_file,
+        mess=args.mess,
+        fmt=args.format,
+        seed=args.seed,
+        out_dir=out_dir,
+        registry_path=args.registry,
+    )
+    print(f"Generated messy submissions for months: {months} in {out_dir}")
     print("Done.")
 
 
@@ -0,0 +1,25 @@
+"""
+Create the database from the numbered scripts in sql/, or sql/postgres/ with DB_TYPE=postgres
+(00_schema.sql drops and re-creates the tables). Pass script names to apply only those, e.g. to add the managed indexes to an
+existing database:
+
+    python scripts/init_db.py 05_indexes.sql
+"""
+import argparse
+
+from src.db import get_backend, run_sql_file, schema_files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scripts", nargs="*", help="script names under sql/ (sql/postgres/ for DB_TYPE=postgres; default: all, in order)")
+    args = parser.parse_args()
+
+    paths = [get_backend().sql_dir / name for name in args.scripts] if args.scripts else schema_files()
+    for path in paths:
+        run_sql_file(str(path))
+        print(f"Applied: {path.name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,5 +4,5 @@ param(
 )
 
 $env:PYTHONPATH="."
-python src\etl_run.py $Month
-python scripts\export_powerbi_datasets.py
\ No newline at end of file
+python -m src.cli ingest $Month
+python -m src.cli export
\ No newline at end of file
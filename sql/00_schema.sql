@@ -1,17 +1,45 @@
 -- SQLite schema for WGYD Monitoring Pack (raw -> clean -> gold)
 
+-- DIMENSIONS: each distinct team / region / gender / age band once; the raw, clean and
+-- gold tables store their integer key (src/dimensions.py assigns keys during a load).
+-- The vw_*_submissions / vw_gold_indicator_mart views show the text values.
+DROP TABLE IF EXISTS dim_team;
+CREATE TABLE dim_team (
+  team_id INTEGER PRIMARY KEY,
+  team TEXT NOT NULL UNIQUE
+);
+
+DROP TABLE IF EXISTS dim_region;
+CREATE TABLE dim_region (
+  region_id INTEGER PRIMARY KEY,
+  region TEXT NOT NULL UNIQUE
+);
+
+DROP TABLE IF EXISTS dim_gender;
+CREATE TABLE dim_gender (
+  gender_id INTEGER PRIMARY KEY,
+  gender TEXT NOT NULL UNIQUE
+);
+
+DROP TABLE IF EXISTS dim_age_band;
+CREATE TABLE dim_age_band (
+  age_band_id INTEGER PRIMARY KEY,
+  age_band TEXT NOT NULL UNIQUE
+);
+
 -- RAW: store ingested submissions (as standardized fields)
 DROP TABLE IF EXISTS raw_submissions;
 CREATE TABLE raw_submissions (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   report_month TEXT NOT NULL,
-  team TEXT NOT NULL,
+  team_id INTEGER NOT NULL,
   indicator_code TEXT NOT NULL,
-  region TEXT,
-  gender TEXT,
-  age_band TEXT,
+  region_id INTEGER,
+  gender_id INTEGER,
+  age_band_id INTEGER,
   value REAL,
   submitted_on TEXT,
+  submitted_date DATE,  -- submitted_on parsed by one of the configured date formats; NULL if none fits
   source_file TEXT NOT NULL,
   loaded_at TEXT NOT NULL
 );
@@ -51,15 +79,18 @@ DROP TABLE IF EXISTS clean_submissions;
 CREATE TABLE clean_submissions (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
   report_month TEXT NOT NULL,
-  team TEXT NOT NULL,
+  team_id INTEGER NOT NULL,
   indicator_code TEXT NOT NULL,
-  region TEXT,
-  gender TEXT,
-  age_band TEXT,
+  region_id INTEGER,
+  gender_id INTEGER,
+  age_band_id INTEGER,
   value REAL,
   submitted_on TEXT,
+  submitted_date DATE,  -- submitted_on parsed by one of the configured date formats; NULL if none fits
   source_file TEXT NOT NULL,
-  loaded_at TEXT NOT NULL
+  loaded_at TEXT NOT NULL,
+  natural_key INTEGER NOT NULL,  -- hash of report_month..age_band, one row per key in use (src/duplicates.py)
+  superseded INTEGER NOT NULL DEFAULT 0  -- 1 while another row with this natural_key is the one in use
 );
 
 -- GOLD: indicator mart aggregated for reporting
@@ -67,29 +98,14 @@ DROP TABLE IF EXISTS gold_indicator_mart;
 CREATE TABLE gold_indicator_mart (
   report_month TEXT NOT NULL,
   indicator_code TEXT NOT NULL,
-  region TEXT,
-  gender TEXT,
-  age_band TEXT,
+  region_id INTEGER,
+  gender_id INTEGER,
+  age_band_id INTEGER,
   actual_value REAL NOT NULL,
   baseline REAL,
   target REAL,
   progress_to_target REAL,
-  PRIMARY KEY (report_month, indicator_code, region, gender, age_band)
+  PRIMARY KEY (report_month, indicator_code, region_id, gender_id, age_band_id)
 );
 
--- Helpful view: indicator summary at national level (no disagg)
-DROP VIEW IF EXISTS vw_indicator_summary_national;
-CREATE VIEW vw_indicator_summary_national AS
-SELECT
-  g.report_month,
-  g.indicator_code,
-  r.indicator_name,
-  SUM(g.actual_value) AS actual_value,
-  MAX(g.baseline) AS baseline,
-  MAX(g.target) AS target,
-  CASE WHEN MAX(g.target) IS NULL OR MAX(g.target)=0 THEN NULL
-       ELSE ROUND(SUM(g.actual_value) * 1.0 / MAX(g.target), 4)
-  END AS progress_to_target
-FROM gold_indicator_mart g
-JOIN dim_indicator_registry r USING (indicator_code)
-GROUP BY g.report_month, g.indicator_code, r.indicator_name;
+-- National summary/trend views: see 07_national_rollup.sql
@@ -1,18 +1,4 @@
--- Trend: indicator totals by month (national)
-DROP VIEW IF EXISTS vw_indicator_trend_national;
-CREATE VIEW vw_indicator_trend_national AS
-SELECT
-  g.report_month,
-  g.indicator_code,
-  r.indicator_name,
-  SUM(g.actual_value) AS actual_value,
-  MAX(g.target) AS target,
-  CASE WHEN MAX(g.target) IS NULL OR MAX(g.target)=0 THEN NULL
-       ELSE ROUND(SUM(g.actual_value) * 1.0 / MAX(g.target), 4)
-  END AS progress_to_target
-FROM gold_indicator_mart g
-JOIN dim_indicator_registry r USING (indicator_code)
-GROUP BY g.report_month, g.indicator_code, r.indicator_name;
+-- Trend (national): see 07_national_rollup.sql
 
 -- Data quality counts by month
 DROP VIEW IF EXISTS vw_dq_exceptions_monthly;
@@ -24,13 +10,66 @@ SELECT
 FROM dq_exceptions
 GROUP BY report_month, severity;
 
--- Suspected late/invalid submission dates by month and team
-DROP VIEW IF EXISTS vw_late_reporting_flags;
-CREATE VIEW vw_late_reporting_flags AS
+-- Late reporting by month and team: see 11_team_timeliness.sql
+
+-- raw / clean / gold with their dimension keys resolved to text: the columns these
+-- tables had before they were keyed (see the dim_* tables in 00_schema.sql)
+DROP VIEW IF EXISTS vw_raw_submissions;
+CREATE VIEW vw_raw_submissions AS
 SELECT
-  report_month,
-  team,
-  COUNT(*) AS flagged_rows
-FROM raw_submissions
-WHERE submitted_on IS NULL OR LENGTH(submitted_on) < 10
-GROUP BY report_month, team;
\ No newline at end of file
+  s.id,
+  s.report_month,
+  t.team,
+  s.indicator_code,
+  rg.region,
+  g.gender,
+  a.age_band,
+  s.value,
+  s.submitted_on,
+  s.submitted_date,
+  s.source_file,
+  s.loaded_at
+FROM raw_submissions s
+JOIN dim_team t ON t.team_id = s.team_id
+LEFT JOIN dim_region rg ON rg.region_id = s.region_id
+LEFT JOIN dim_gender g ON g.gender_id = s.gender_id
+LEFT JOIN dim_age_band a ON a.age_band_id = s.age_band_id;
+
+DROP VIEW IF EXISTS vw_clean_submissions;
+CREATE VIEW vw_clean_submissions AS
+SELECT
+  s.id,
+  s.report_month,
+  t.team,
+  s.indicator_code,
+  rg.region,
+  g.gender,
+  a.age_band,
+  s.value,
+  s.submitted_on,
+  s.submitted_date,
+  s.source_file,
+  s.loaded_at
+FROM clean_submissions s
+JOIN dim_team t ON t.team_id = s.team_id
+LEFT JOIN dim_region rg ON rg.region_id = s.region_id
+LEFT JOIN dim_gender g ON g.gender_id = s.gender_id
+LEFT JOIN dim_age_band a ON a.age_band_id = s.age_band_id
+WHERE s.superseded = 0;
+
+DROP VIEW IF EXISTS vw_gold_indicator_mart;
+CREATE VIEW vw_gold_indicator_mart AS
+SELECT
+  m.report_month,
+  m.indicator_code,
+  rg.region,
+  g.gender,
+  a.age_band,
+  m.actual_value,
+  m.baseline,
+  m.target,
+  m.progress_to_target
+FROM gold_indicator_mart m
+LEFT JOIN dim_region rg ON rg.region_id = m.region_id
+LEFT JOIN dim_gender g ON g.gender_id = m.gender_id
+LEFT JOIN dim_age_band a ON a.age_band_id = m.age_band_id;
\ No newline at end of file
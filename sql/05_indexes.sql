@@ -0,0 +1,18 @@
+-- Managed index set for report_month-scoped workloads (safe to re-run on an existing database).
+-- scripts/check_query_plans.py fails if a pipeline query stops using these.
+
+-- raw: per-month clear, brief intake counts and team timeliness (covering)
+CREATE INDEX IF NOT EXISTS ix_raw_month_team ON raw_submissions (report_month, team_id, region_id, submitted_date, source_file);
+-- raw: dropping the rows of a file that failed part-way through streaming
+CREATE INDEX IF NOT EXISTS ix_raw_file ON raw_submissions (source_file, loaded_at);
+
+-- clean: per-month clear and gold re-aggregation (covering the GROUP BY + SUM)
+CREATE INDEX IF NOT EXISTS ix_clean_month_grain ON clean_submissions (report_month, indicator_code, region_id, gender_id, age_band_id, value, superseded);
+-- clean: months affected by a registry baseline/target change
+CREATE INDEX IF NOT EXISTS ix_clean_indicator_month ON clean_submissions (indicator_code, report_month);
+CREATE INDEX IF NOT EXISTS ix_clean_file ON clean_submissions (source_file, loaded_at);
+-- clean: natural keys loaded more than once in a month, and which row is in use (src/duplicates.py)
+CREATE INDEX IF NOT EXISTS ix_clean_month_key ON clean_submissions (report_month, natural_key, superseded);
+
+-- exceptions: per-month clear and severity counts
+CREATE INDEX IF NOT EXISTS ix_dq_month_severity ON dq_exceptions (report_month, severity);
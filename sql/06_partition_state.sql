@@ -0,0 +1,17 @@
+-- Per-month change counter read by incremental consumers (scripts/export_powerbi_datasets.py --incremental).
+-- The ETL bumps version for every report_month whose rows it rewrites.
+-- Re-running this script rebuilds it from the months present, which forces a full re-export.
+DROP TABLE IF EXISTS partition_state;
+CREATE TABLE partition_state (
+  report_month TEXT PRIMARY KEY,
+  version INTEGER NOT NULL,
+  refreshed_at TEXT NOT NULL
+);
+
+INSERT INTO partition_state (report_month, version, refreshed_at)
+SELECT report_month, 1, strftime('%Y-%m-%dT%H:%M:%S', 'now')
+FROM (
+  SELECT report_month FROM raw_submissions
+  UNION SELECT report_month FROM dq_exceptions WHERE report_month IS NOT NULL
+  UNION SELECT report_month FROM gold_indicator_mart
+);
@@ -0,0 +1,43 @@
+-- National rollup of gold_indicator_mart, maintained by etl_run.rebuild_gold for the months it
+-- re-aggregates. The national views are thin selects over it, so a dashboard or brief read is
+-- a keyed lookup instead of a GROUP BY over the mart.
+-- Safe to re-run on an existing database: the table is rebuilt from the current gold mart.
+DROP VIEW IF EXISTS vw_indicator_summary_national;
+DROP VIEW IF EXISTS vw_indicator_trend_national;
+DROP TABLE IF EXISTS gold_indicator_national;
+CREATE TABLE gold_indicator_national (
+  report_month TEXT NOT NULL,
+  indicator_code TEXT NOT NULL,
+  indicator_name TEXT NOT NULL,
+  actual_value REAL NOT NULL,
+  baseline REAL,
+  target REAL,
+  progress_to_target REAL,
+  PRIMARY KEY (report_month, indicator_code)
+);
+
+INSERT INTO gold_indicator_national
+  (report_month, indicator_code, indicator_name, actual_value, baseline, target, progress_to_target)
+SELECT
+  g.report_month,
+  g.indicator_code,
+  r.indicator_name,
+  SUM(g.actual_value) AS actual_value,
+  MAX(g.baseline) AS baseline,
+  MAX(g.target) AS target,
+  CASE WHEN MAX(g.target) IS NULL OR MAX(g.target)=0 THEN NULL
+       ELSE ROUND(SUM(g.actual_value) * 1.0 / MAX(g.target), 4)
+  END AS progress_to_target
+FROM gold_indicator_mart g
+JOIN dim_indicator_registry r ON g.indicator_code = r.indicator_code
+GROUP BY g.report_month, g.indicator_code, r.indicator_name;
+
+-- Helpful view: indicator summary at national level (no disagg)
+CREATE VIEW vw_indicator_summary_national AS
+SELECT report_month, indicator_code, indicator_name, actual_value, baseline, target, progress_to_target
+FROM gold_indicator_national;
+
+-- Trend: indicator totals by month (national)
+CREATE VIEW vw_indicator_trend_national AS
+SELECT report_month, indicator_code, indicator_name, actual_value, target, progress_to_target
+FROM gold_indicator_national;
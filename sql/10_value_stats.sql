@@ -0,0 +1,18 @@
+-- Monthly total of each (indicator, team, region) and the history baseline it was checked
+-- against (src/anomalies.py). Every load replaces the rows of the months it touched; a later
+-- month's baseline is recomputed when that month is loaded again or by `python -m src.cli rebuild-gold`.
+DROP TABLE IF EXISTS indicator_value_stats;
+CREATE TABLE indicator_value_stats (
+  report_month TEXT NOT NULL,
+  indicator_code TEXT NOT NULL,
+  team_id INTEGER NOT NULL,
+  region_id INTEGER,  -- NULL: rows without a region
+  row_count INTEGER NOT NULL,
+  total REAL NOT NULL,
+  history_months INTEGER NOT NULL,  -- earlier months in the rolling window with a total
+  baseline REAL,  -- median the total was compared with; NULL with too little history
+  spread REAL,  -- robust standard deviation (1.4826 x MAD) of the rolling window
+  z REAL,  -- (total - baseline) / spread
+  seasonal INTEGER NOT NULL  -- 1 when baseline is the median of the same month in earlier years
+);
+CREATE INDEX ix_value_stats_month ON indicator_value_stats (report_month, indicator_code);
@@ -0,0 +1,120 @@
+-- Postgres schema for WGYD Monitoring Pack (raw -> clean -> gold)
+-- Same tables and columns as sql/00_schema.sql; kept in step with it.
+
+-- The shared pipeline SQL calls ROUND(<double>, 4) as SQLite allows; Postgres only
+-- defines the two-argument form for numeric.
+CREATE OR REPLACE FUNCTION round(double precision, integer) RETURNS double precision
+  AS $$ SELECT round($1::numeric, $2)::double precision $$
+  LANGUAGE sql IMMUTABLE STRICT;
+
+-- DIMENSIONS: each distinct team / region / gender / age band once; the raw, clean and
+-- gold tables store their integer key (src/dimensions.py assigns keys during a load).
+-- The vw_*_submissions / vw_gold_indicator_mart views show the text values.
+DROP TABLE IF EXISTS dim_team CASCADE;
+CREATE TABLE dim_team (
+  team_id SERIAL PRIMARY KEY,
+  team TEXT NOT NULL UNIQUE
+);
+
+DROP TABLE IF EXISTS dim_region CASCADE;
+CREATE TABLE dim_region (
+  region_id SERIAL PRIMARY KEY,
+  region TEXT NOT NULL UNIQUE
+);
+
+DROP TABLE IF EXISTS dim_gender CASCADE;
+CREATE TABLE dim_gender (
+  gender_id SERIAL PRIMARY KEY,
+  gender TEXT NOT NULL UNIQUE
+);
+
+DROP TABLE IF EXISTS dim_age_band CASCADE;
+CREATE TABLE dim_age_band (
+  age_band_id SERIAL PRIMARY KEY,
+  age_band TEXT NOT NULL UNIQUE
+);
+
+-- RAW: store ingested submissions (as standardized fields)
+DROP TABLE IF EXISTS raw_submissions CASCADE;
+CREATE TABLE raw_submissions (
+  id BIGSERIAL PRIMARY KEY,
+  report_month TEXT NOT NULL,
+  team_id INTEGER NOT NULL,
+  indicator_code TEXT NOT NULL,
+  region_id INTEGER,
+  gender_id INTEGER,
+  age_band_id INTEGER,
+  value DOUBLE PRECISION,
+  submitted_on TEXT,
+  submitted_date DATE,  -- submitted_on parsed by one of the configured date formats; NULL if none fits
+  source_file TEXT NOT NULL,
+  loaded_at TEXT NOT NULL
+);
+
+-- INDICATOR REGISTRY
+DROP TABLE IF EXISTS dim_indicator_registry CASCADE;
+CREATE TABLE dim_indicator_registry (
+  indicator_code TEXT PRIMARY KEY,
+  indicator_name TEXT NOT NULL,
+  definition TEXT,
+  unit TEXT,
+  disagg_required TEXT,
+  data_source TEXT,
+  baseline DOUBLE PRECISION,
+  target DOUBLE PRECISION,
+  frequency TEXT,
+  owner TEXT
+);
+
+-- EXCEPTIONS LOG (validation issues)
+DROP TABLE IF EXISTS dq_exceptions CASCADE;
+CREATE TABLE dq_exceptions (
+  id BIGSERIAL PRIMARY KEY,
+  report_month TEXT,
+  team TEXT,
+  indicator_code TEXT,
+  field TEXT,
+  issue TEXT,
+  severity TEXT,
+  source_file TEXT,
+  row_ref TEXT,
+  created_at TEXT NOT NULL
+);
+
+-- CLEAN: validated/standardized rows (only “accepted” records)
+DROP TABLE IF EXISTS clean_submissions CASCADE;
+CREATE TABLE clean_submissions (
+  id BIGSERIAL PRIMARY KEY,
+  report_month TEXT NOT NULL,
+  team_id INTEGER NOT NULL,
+  indicator_code TEXT NOT NULL,
+  region_id INTEGER,
+  gender_id INTEGER,
+  age_band_id INTEGER,
+  value DOUBLE PRECISION,
+  submitted_on TEXT,
+  submitted_date DATE,  -- submitted_on parsed by one of the configured date formats; NULL if none fits
+  source_file TEXT NOT NULL,
+  loaded_at TEXT NOT NULL,
+  natural_key BIGINT NOT NULL,  -- hash of report_month..age_band, one row per key in use (src/duplicates.py)
+  superseded SMALLINT NOT NULL DEFAULT 0  -- 1 while another row with this natural_key is the one in use
+);
+
+-- GOLD: indicator mart aggregated for reporting
+-- Disaggregations may be NULL (e.g. missing region), which a Postgres PRIMARY KEY
+-- forbids; a NULLS NOT DISTINCT unique constraint gives the SQLite key's behaviour.
+DROP TABLE IF EXISTS gold_indicator_mart CASCADE;
+CREATE TABLE gold_indicator_mart (
+  report_month TEXT NOT NULL,
+  indicator_code TEXT NOT NULL,
+  region_id INTEGER,
+  gender_id INTEGER,
+  age_band_id INTEGER,
+  actual_value DOUBLE PRECISION NOT NULL,
+  baseline DOUBLE PRECISION,
+  target DOUBLE PRECISION,
+  progress_to_target DOUBLE PRECISION,
+  CONSTRAINT gold_indicator_mart_grain UNIQUE NULLS NOT DISTINCT (report_month, indicator_code, region_id, gender_id, age_band_id)
+);
+
+-- National summary/trend views: see 07_national_rollup.sql
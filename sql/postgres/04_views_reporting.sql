@@ -0,0 +1,75 @@
+-- Trend (national): see 07_national_rollup.sql
+
+-- Data quality counts by month
+DROP VIEW IF EXISTS vw_dq_exceptions_monthly;
+CREATE VIEW vw_dq_exceptions_monthly AS
+SELECT
+  report_month,
+  severity,
+  COUNT(*) AS n
+FROM dq_exceptions
+GROUP BY report_month, severity;
+
+-- Late reporting by month and team: see 11_team_timeliness.sql
+
+-- raw / clean / gold with their dimension keys resolved to text: the columns these
+-- tables had before they were keyed (see the dim_* tables in 00_schema.sql)
+DROP VIEW IF EXISTS vw_raw_submissions;
+CREATE VIEW vw_raw_submissions AS
+SELECT
+  s.id,
+  s.report_month,
+  t.team,
+  s.indicator_code,
+  rg.region,
+  g.gender,
+  a.age_band,
+  s.value,
+  s.submitted_on,
+  s.submitted_date,
+  s.source_file,
+  s.loaded_at
+FROM raw_submissions s
+JOIN dim_team t ON t.team_id = s.team_id
+LEFT JOIN dim_region rg ON rg.region_id = s.region_id
+LEFT JOIN dim_gender g ON g.gender_id = s.gender_id
+LEFT JOIN dim_age_band a ON a.age_band_id = s.age_band_id;
+
+DROP VIEW IF EXISTS vw_clean_submissions;
+CREATE VIEW vw_clean_submissions AS
+SELECT
+  s.id,
+  s.report_month,
+  t.team,
+  s.indicator_code,
+  rg.region,
+  g.gender,
+  a.age_band,
+  s.value,
+  s.submitted_on,
+  s.submitted_date,
+  s.source_file,
+  s.loaded_at
+FROM clean_submissions s
+JOIN dim_team t ON t.team_id = s.team_id
+LEFT JOIN dim_region rg ON rg.region_id = s.region_id
+LEFT JOIN dim_gender g ON g.gender_id = s.gender_id
+LEFT JOIN dim_age_band a ON a.age_band_id = s.age_band_id
+WHERE s.superseded = 0;
+
+DROP VIEW IF EXISTS vw_gold_indicator_mart;
+CREATE VIEW vw_gold_indicator_mart AS
+SELECT
+  m.report_month,
+  m.indicator_code,
+  rg.region,
+  g.gender,
+  a.age_band,
+  m.actual_value,
+  m.baseline,
+  m.target,
+  m.progress_to_target
+FROM gold_indicator_mart m
+LEFT JOIN dim_region rg ON rg.region_id = m.region_id
+LEFT JOIN dim_gender g ON g.gender_id = m.gender_id
+LEFT JOIN dim_age_band a ON a.age_band_id = m.age_band_id;
\ No newline at end of file
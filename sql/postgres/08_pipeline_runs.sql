@@ -0,0 +1,18 @@
+-- One row per etl_run invocation, written when the run ends (ok or failed).
+-- The per-month / per-file stage breakdown is in the JSON run log at log_path.
+-- Kept across re-runs of this script, unlike the data tables.
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+  run_id TEXT PRIMARY KEY,
+  started_at TEXT NOT NULL,
+  finished_at TEXT NOT NULL,
+  status TEXT NOT NULL,
+  months TEXT NOT NULL,
+  seconds DOUBLE PRECISION NOT NULL,
+  raw_rows INTEGER,
+  clean_rows INTEGER,
+  exceptions INTEGER,
+  peak_rss_mb DOUBLE PRECISION,
+  stage_seconds TEXT,  -- JSON object: stage -> total seconds
+  log_path TEXT,
+  error TEXT
+);
@@ -0,0 +1,14 @@
+-- Submission files as last loaded, per month folder: what src/watch.py compares the folder
+-- against to find new, changed and removed files. Every load (month or single file) updates it.
+-- Re-running this script empties it, so the watcher re-checks every file once.
+DROP TABLE IF EXISTS ingest_files;
+CREATE TABLE ingest_files (
+  report_month TEXT NOT NULL,  -- the month folder
+  source_file TEXT NOT NULL,
+  sha256 TEXT NOT NULL,
+  size_bytes BIGINT NOT NULL,
+  mtime_ns BIGINT NOT NULL,
+  loaded_at TEXT NOT NULL,
+  error TEXT,  -- why the file could not be ingested; it is tried again once it changes
+  PRIMARY KEY (report_month, source_file)
+);
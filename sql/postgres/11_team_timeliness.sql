@@ -0,0 +1,31 @@
+-- When each team's rows for a report month were submitted, against the deadline (day
+-- SUBMISSION_DEADLINE_DAY of the following month). Every load replaces the rows of the months
+-- it touched from raw_submissions (src/timeliness.py), so lateness reads are keyed lookups.
+DROP VIEW IF EXISTS vw_late_reporting_flags;
+DROP TABLE IF EXISTS team_timeliness;
+CREATE TABLE team_timeliness (
+  report_month TEXT NOT NULL,
+  team_id INTEGER NOT NULL,
+  row_count INTEGER NOT NULL,
+  dated_rows INTEGER NOT NULL,  -- rows with a submitted_date
+  first_submitted DATE,
+  last_submitted DATE,
+  deadline DATE NOT NULL,
+  days_after_deadline INTEGER,  -- last_submitted - deadline; NULL when no row is dated
+  PRIMARY KEY (report_month, team_id)
+);
+
+-- Teams that submitted after the deadline or sent rows without a recognisable date; the first
+-- three columns are the ones the view had before team_timeliness (Power BI reports bind to them)
+CREATE VIEW vw_late_reporting_flags AS
+SELECT
+  tt.report_month,
+  t.team,
+  tt.row_count - tt.dated_rows AS flagged_rows,  -- rows without a recognisable submission date
+  tt.deadline,
+  tt.last_submitted,
+  tt.days_after_deadline,
+  tt.row_count
+FROM team_timeliness tt
+JOIN dim_team t ON t.team_id = tt.team_id
+WHERE tt.days_after_deadline > 0 OR tt.dated_rows < tt.row_count;
@@ -0,0 +1,188 @@
+"""
+Anomaly checks of monthly totals against their own history, in place of the single IQR fence
+validation used to draw over every value of a file.
+
+What is checked is the month's total for one (indicator_code, team, region). Each load
+re-aggregates only the months it touched from clean_submissions (one GROUP BY over the
+report_month index) into indicator_value_stats, one row per group and month, and takes each
+group's history from that table:
+
+- baseline: the median total of the same calendar month in up to three earlier years when at
+  least two of them have one (seasonal), otherwise the median over the previous
+  ANOMALY_WINDOW_MONTHS months
+- spread: 1.4826 x the median absolute deviation over those previous months (the mean absolute
+  deviation when that is 0), and at least 5% of the baseline
+
+A total whose robust z-score, (total - baseline) / spread, is beyond ANOMALY_THRESHOLD either
+way is logged to dq_exceptions as a warning against each file with rows in it. Groups with
+fewer than ANOMALY_MIN_HISTORY months in the window are recorded but not judged. Only the
+months a load touched get new baselines: after loading an earlier month again, `python -m
+src.cli rebuild-gold` recomputes the later ones.
+"""
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+from src.db import bulk_insert, execute, read_sql
+from src.validate import EXCEPTION_COLUMNS
+
+STATS_COLUMNS = [
+    "report_month",
+    "indicator_code",
+    "team_id",
+    "region_id",
+    "row_count",
+    "total",
+    "history_months",
+    "baseline",
+    "spread",
+    "z",
+    "seasonal",
+]
+
+# one row per group and source file, so a flagged total can be logged against its files
+MONTH_TOTALS_SQL = """
+    SELECT c.report_month, c.indicator_code, c.team_id, t.team, c.region_id, g.region, c.source_file,
+           COUNT(*) AS row_count, SUM(c.value) AS total
+    FROM clean_submissions c
+    JOIN dim_team t ON t.team_id = c.team_id
+    LEFT JOIN dim_region g ON g.region_id = c.region_id
+    WHERE c.report_month IN ({placeholders}) AND c.superseded = 0
+    GROUP BY c.report_month, c.indicator_code, c.team_id, t.team, c.region_id, g.region, c.source_file;
+"""
+HISTORY_SQL = """
+    SELECT report_month, indicator_code, team_id, region_id, total
+    FROM indicator_value_stats
+    WHERE report_month IN ({placeholders});
+"""
+DELETE_STATS_SQL = "DELETE FROM indicator_value_stats WHERE report_month IN ({placeholders});"
+
+_KEYS = ["indicator_code", "team_id", "region_id"]
+_SEASONAL_YEARS = 3
+_MIN_SEASONAL = 2
+_MIN_RELATIVE_SPREAD = 0.05
+
+
+def _shift(month: str, months: int) -> str:
+    return str(pd.Period(month, freq="M") - months)
+
+
+def _window(month: str, window: int) -> list[str]:
+    return [_shift(month, k) for k in range(1, window + 1)]
+
+
+def _same_month(month: str) -> list[str]:
+    return [_shift(month, 12 * k) for k in range(1, _SEASONAL_YEARS + 1)]
+
+
+def _read_months(conn: Any, sql: str, months: list[str]) -> pd.DataFrame:
+    df = read_sql(conn, sql.format(placeholders=",".join("?" * len(months))), months)
+    # 0 stands in for "no region" so it groups and joins like any other key
+    df["region_id"] = df["region_id"].fillna(0).astype("int64")
+    return df
+
+
+def _baselines(history: pd.DataFrame, month: str, window: int) -> pd.DataFrame:
+    """Baseline, spread and history size per group for `month`, from the other months' totals."""
+    rolling = history[history["report_month"].isin(_window(month, window))]
+    grouped = rolling.groupby(_KEYS)["total"]
+    deviation = (rolling["total"] - grouped.transform("median")).abs().groupby([rolling[k] for k in _KEYS])
+    out = pd.DataFrame(
+        {
+            "history_months": grouped.size(),
+            "median": grouped.median(),
+            "mad": deviation.median(),
+            "mean_ad": deviation.mean(),
+        }
+    )
+    seasonal = history[history["report_month"].isin(_same_month(month))].groupby(_KEYS)["total"]
+    out = out.join(seasonal.agg(seasonal_median="median", seasonal_years="size"))
+
+    out["seasonal"] = out["seasonal_years"].fillna(0) >= _MIN_SEASONAL
+    out["baseline"] = out["seasonal_median"].where(out["seasonal"], out["median"])
+    spread = (1.4826 * out["mad"]).where(out["mad"] > 0, 1.2533 * out["mean_ad"])
+    out["spread"] = np.maximum(spread, _MIN_RELATIVE_SPREAD * out["baseline"].abs())
+    return out[["history_months", "baseline", "spread", "seasonal"]]
+
+
+def refresh_value_stats(conn: Any, months: Iterable[str]) -> pd.DataFrame:
+    """
+    Replace these months' rows of indicator_value_stats with fresh totals and baselines.
+    Returns the totals per group and source file with their baseline and z, for
+    anomaly_exceptions. Does not commit.
+    """
+    months = sorted(set(months))
+    if not months:
+        return pd.DataFrame()
+    window = settings.anomaly_window_months
+
+    by_file = _read_months(conn, MONTH_TOTALS_SQL, months)
+    totals = by_file.groupby(["report_month", *_KEYS], as_index=False).agg(
+        row_count=("row_count", "sum"), total=("total", "sum")
+    )
+    history = totals.drop(columns="row_count")
+    earlier = sorted({m for month in months for m in _window(month, window) + _same_month(month)} - set(months))
+    if earlier:
+        loaded = _read_months(conn, HISTORY_SQL, earlier)
+        if not loaded.empty:
+            history = pd.concat([loaded, history], ignore_index=True)
+
+    stats = pd.concat(
+        [
+            totals[totals["report_month"] == month].join(_baselines(history, month, window), on=_KEYS)
+            for month in months
+        ],
+        ignore_index=True,
+    )
+    stats["history_months"] = stats["history_months"].fillna(0).astype("int64")
+    judged = stats["history_months"] >= settings.anomaly_min_history
+    stats["baseline"] = stats["baseline"].where(judged)
+    stats["spread"] = stats["spread"].where(judged & (stats["spread"] > 0))
+    stats["z"] = (stats["total"] - stats["baseline"]) / stats["spread"]
+    stats["seasonal"] = (stats["seasonal"].eq(True) & judged).astype("int64")
+
+    execute(conn, DELETE_STATS_SQL.format(placeholders=",".join("?" * len(months))), months)
+    region_id = pd.array(stats["region_id"].where(stats["region_id"] != 0), dtype="Int64")
+    bulk_insert(conn, "indicator_value_stats", stats[STATS_COLUMNS].assign(region_id=region_id))
+
+    return by_file.drop(columns=["row_count", "total"]).merge(stats, on=["report_month", *_KEYS])
+
+
+def anomaly_exceptions(groups: pd.DataFrame, report_month: str, source_file: str | None = None) -> pd.DataFrame:
+    """
+    dq_exceptions rows for the report_month totals in `groups` (from refresh_value_stats) that
+    are beyond ANOMALY_THRESHOLD, one per file with rows in the total; only source_file's if given.
+    """
+    if groups.empty:
+        return pd.DataFrame(columns=EXCEPTION_COLUMNS)
+    flagged = groups[(groups["report_month"] == report_month) & (groups["z"].abs() > settings.anomaly_threshold)]
+    if source_file is not None:
+        flagged = flagged[flagged["source_file"] == source_file]
+
+    issues = [
+        f"Monthly total {round(float(total), 2)} for region {region if isinstance(region, str) else '(none)'} is "
+        f"{'above' if z > 0 else 'below'} its {'seasonal ' if seasonal else ''}baseline {round(float(baseline), 2)} "
+        f"(robust z {z:+.1f} over {n} months of history)"
+        for total, region, z, seasonal, baseline, n in zip(
+            flagged["total"], flagged["region"], flagged["z"], flagged["seasonal"], flagged["baseline"], flagged["history_months"]
+        )
+    ]
+    return pd.DataFrame(
+        {
+            "report_month": flagged["report_month"].to_numpy(),
+            "team": flagged["team"].to_numpy(),
+            "indicator_code": flagged["indicator_code"].to_numpy(),
+            "field": "value",
+            "issue": issues,
+            "severity": "warning",
+            "source_file": flagged["source_file"].to_numpy(),
+            "row_ref": None,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        },
+        columns=EXCEPTION_COLUMNS,
+    )
@@ -0,0 +1,310 @@
+"""
+Read-only HTTP/JSON query service over the reporting views, for dashboards and analysts that
+would otherwise pull whole CSV exports or open the database file.
+
+    python -m src.cli serve                  # http://127.0.0.1:8765 (API_HOST, API_PORT)
+
+    GET /months[?from=&to=]                          loaded months and their partition versions
+    GET /summary?month=2025-12[&indicator=]          national totals against target
+    GET /trend?indicator=YTH_EMP_001[&from=&to=]     national totals by month
+    GET /results?month=2025-12[&indicator=&region=&team=]   clean totals by team and region
+    GET /dq?month=2025-12[&team=&severity=]          exception counts
+    GET /late?month=2025-12[&team=]                  teams reporting late (vw_late_reporting_flags)
+
+A result is {"columns": [...], "rows": [[...], ...]}. Results are kept in an in-memory LRU
+(API_CACHE_ENTRIES) together with the partition_state versions of the months they cover, read
+with every request: a load or rebuild bumps those, so the next request for a reloaded month
+runs its query again while results for other months are still served from memory. The ETag
+is derived from the same versions, so a client sending If-None-Match gets 304 Not Modified
+without any query running. Requests are served on threads that share DB_POOL_SIZE read-only
+connections; concurrent requests for the same uncached result wait for one query.
+"""
+from __future__ import annotations
+
+import json
+import queue
+import re
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from hashlib import sha256
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator
+from urllib.parse import parse_qs, urlsplit
+
+from src.config import settings
+from src.db import connect_readonly, execute
+
+PARTITION_VERSIONS_SQL = "SELECT report_month, version, refreshed_at FROM partition_state;"
+
+MONTH = re.compile(r"\d{4}-(0[1-9]|1[0-2])")
+
+# query parameter -> (column, comparison)
+_MONTH_FILTERS = {"month": ("report_month", "="), "from": ("report_month", ">="), "to": ("report_month", "<=")}
+
+
+@dataclass(frozen=True)
+class Endpoint:
+    sql: str  # with {where} where the filters go
+    filters: dict[str, tuple[str, str]]
+    required: tuple[str, ...] = ()  # parameters without which the query would read whole tables
+    description: str = ""
+
+
+ENDPOINTS = {
+    "months": Endpoint(
+        "SELECT report_month, version, refreshed_at FROM partition_state {where} ORDER BY report_month",
+        {k: v for k, v in _MONTH_FILTERS.items() if k != "month"},
+        description="loaded months and their partition versions",
+    ),
+    "summary": Endpoint(
+        """
+        SELECT report_month, indicator_code, indicator_name, actual_value, baseline, target, progress_to_target
+        FROM vw_indicator_summary_national {where}
+        ORDER BY report_month, indicator_code
+        """,
+        {**_MONTH_FILTERS, "indicator": ("indicator_code", "=")},
+        description="national totals against target",
+    ),
+    "trend": Endpoint(
+        """
+        SELECT report_month, indicator_code, indicator_name, actual_value, target, progress_to_target
+        FROM vw_indicator_trend_national {where}
+        ORDER BY indicator_code, report_month
+        """,
+        {**_MONTH_FILTERS, "indicator": ("indicator_code", "=")},
+        description="national totals by month",
+    ),
+    "results": Endpoint(
+        """
+        SELECT report_month, team, region, indicator_code, COUNT(*) AS clean_rows, SUM(value) AS actual_value
+        FROM vw_clean_submissions {where}
+        GROUP BY report_month, team, region, indicator_code
+        ORDER BY report_month, team, region, indicator_code
+        """,
+        {**_MONTH_FILTERS, "indicator": ("indicator_code", "="), "region": ("region", "="), "team": ("team", "=")},
+        required=("month",),
+        description="clean totals by team, region and indicator",
+    ),
+    "dq": Endpoint(
+        """
+        SELECT report_month, team, severity, COUNT(*) AS n
+        FROM dq_exceptions {where}
+        GROUP BY report_month, team, severity
+        ORDER BY report_month, team, severity
+        """,
+        {**_MONTH_FILTERS, "team": ("team", "="), "severity": ("severity", "=")},
+        required=("month",),
+        description="exception counts by team and severity",
+    ),
+    "late": Endpoint(
+        "SELECT * FROM vw_late_reporting_flags {where} ORDER BY report_month, team",
+        {**_MONTH_FILTERS, "team": ("team", "=")},
+        description="teams that reported after the deadline or without recognisable dates",
+    ),
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes = b""
+    etag: str | None = None
+
+
+def build_query(name: str, params: dict[str, str]) -> tuple[str, list[str]]:
+    """SQL and qmark parameters of an endpoint for the given query parameters; ApiError if they don't fit."""
+    endpoint = ENDPOINTS.get(name)
+    if endpoint is None:
+        raise ApiError(404, f"Unknown endpoint /{name} (expected one of: {', '.join('/' + n for n in ENDPOINTS)})")
+    unknown = sorted(set(params) - set(endpoint.filters))
+    if unknown:
+        raise ApiError(400, f"Unknown parameter(s) for /{name}: {', '.join(unknown)} (expected: {', '.join(endpoint.filters)})")
+    missing = [p for p in endpoint.required if p not in params]
+    if missing:
+        raise ApiError(400, f"/{name} needs {', '.join(missing)}")
+    for p in _MONTH_FILTERS:
+        if p in params and not MONTH.fullmatch(params[p]):
+            raise ApiError(400, f"{p} must be a month, YYYY-MM (got {params[p]!r})")
+
+    clauses = [f"{endpoint.filters[p][0]} {endpoint.filters[p][1]} ?" for p in params]
+    where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+    return endpoint.sql.format(where=where), list(params.values())
+
+
+def _months_covered(params: dict[str, str], versions: dict[str, tuple]) -> list[str]:
+    if "month" in params:
+        return [params["month"]]
+    return [m for m in versions if params.get("from", m) <= m <= params.get("to", m)]
+
+
+class ReadPool:
+    """At most `size` read-only connections, shared by the request threads."""
+
+    def __init__(self, size: int):
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle: queue.LifoQueue = queue.LifoQueue()
+
+    @contextmanager
+    def connection(self) -> Iterator[Any]:
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = connect_readonly()
+            try:
+                yield conn
+            except BaseException:
+                conn.close()  # may be mid-statement; the next request opens a fresh one
+                raise
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+
+@dataclass
+class ResultCache:
+    """LRU of encoded results: key -> (versions token, body)."""
+
+    entries: int
+    _items: OrderedDict = field(default_factory=OrderedDict)
+    _lock: threading.Lock = field(default_factory=threading.Lock)
+    # one lock per key being computed, so concurrent misses run the query once
+    _loading: dict = field(default_factory=dict)
+
+    def get(self, key: tuple, token: str) -> bytes | None:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[0] != token:
+                return None
+            self._items.move_to_end(key)
+            return item[1]
+
+    def put(self, key: tuple, token: str, body: bytes) -> None:
+        with self._lock:
+            self._items[key] = (token, body)
+            self._items.move_to_end(key)
+            while len(self._items) > self.entries:
+                self._items.popitem(last=False)
+
+    @contextmanager
+    def loading(self, key: tuple) -> Iterator[None]:
+        with self._lock:
+            lock = self._loading.setdefault(key, threading.Lock())
+        with lock:
+            yield
+        with self._lock:
+            if not lock.locked():
+                self._loading.pop(key, None)
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _encode(payload: dict) -> bytes:
+    # default=str: Postgres returns DATE columns as datetime.date
+    return json.dumps(payload, default=str, separators=(",", ":")).encode("utf-8")
+
+
+class QueryService:
+    """Answers endpoint queries from the cache or the database; independent of HTTP."""
+
+    def __init__(self, pool_size: int | None = None, cache_entries: int | None = None):
+        self.pool = ReadPool(pool_size or settings.db_pool_size)
+        self.cache = ResultCache(cache_entries or settings.api_cache_entries)
+
+    def _query(self, conn: Any, sql: str, args: list[str]) -> bytes:
+        cur = execute(conn, sql, args)
+        columns = [d[0] for d in cur.description]
+        return _encode({"columns": columns, "rows": [list(r) for r in cur.fetchall()]})
+
+    def get(self, name: str, params: dict[str, str], if_none_match: str | None = None) -> Response:
+        if name == "":
+            index = {
+                n: {"description": e.description, "parameters": list(e.filters), "required": list(e.required)}
+                for n, e in ENDPOINTS.items()
+            }
+            return Response(200, _encode({"endpoints": index}))
+        sql, args = build_query(name, params)
+        key = (name, tuple(sorted(params.items())))
+
+        with self.pool.connection() as conn:
+            versions = {m: (v, at) for m, v, at in execute(conn, PARTITION_VERSIONS_SQL).fetchall()}
+            # a month not loaded yet is part of the token too, so loading it changes the ETag
+            token = json.dumps([[m, *versions.get(m, (0, ""))] for m in _months_covered(params, versions)])
+            etag = '"' + sha256(repr((key, token)).encode("utf-8")).hexdigest()[:32] + '"'
+            if _etag_matches(if_none_match, etag):
+                return Response(304, etag=etag)
+
+            body = self.cache.get(key, token)
+            if body is None:
+                with self.cache.loading(key):
+                    body = self.cache.get(key, token)
+                    if body is None:
+                        body = self._query(conn, sql, args)
+                        self.cache.put(key, token, body)
+        return Response(200, body, etag)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "wgyd-api/1"
+    service: QueryService  # set by make_server
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            response = self.service.get(url.path.strip("/"), params, self.headers.get("If-None-Match"))
+        except ApiError as exc:
+            response = Response(exc.status, _encode({"error": str(exc)}))
+        except Exception as exc:  # keep serving; the client gets the reason
+            self.log_error("%s failed: %r", self.path, exc)
+            response = Response(500, _encode({"error": f"{type(exc).__name__}: {exc}"}))
+
+        self.send_response(response.status)
+        if response.etag:
+            self.send_header("ETag", response.etag)
+            # cached copies are fine as long as the client revalidates them
+            self.send_header("Cache-Control", "no-cache")
+        if response.status != 304:
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(response.body)))
+        self.end_headers()
+        if response.status != 304:
+            self.wfile.write(response.body)
+
+
+def make_server(host: str | None = None, port: int | None = None, service: QueryService | None = None) -> ThreadingHTTPServer:
+    handler = type("BoundHandler", (Handler,), {"service": service or QueryService()})
+    server = ThreadingHTTPServer((host or settings.api_host, settings.api_port if port is None else port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def serve(host: str | None = None, port: int | None = None) -> None:
+    service = QueryService()
+    server = make_server(host, port, service)
+    print(f"Serving the query API on http://{server.server_address[0]}:{server.server_address[1]}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
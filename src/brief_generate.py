@@ -1,169 +1,372 @@
 from __future__ import annotations
 
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+from hashlib import sha256
 from pathlib import Path
-import sqlite3
+from typing import Iterable
 
 import pandas as pd
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
 
 from src.config import settings
-from src.db import sqlite_connect
+from src.db import connect, read_sql
+from src.registry import Registry, load_registry
+from src.timeliness import deadline
 
+TEMPLATES_DIR = Path(__file__).resolve().parents[1] / "templates" / "briefs"
+MANIFEST_NAME = "_manifest.json"
+# Bump when the rendering code (not a template) changes what a brief looks like
+BRIEF_FORMAT_VERSION = "1"
 
-def _fetch_df(conn: sqlite3.Connection, query: str, params=()) -> pd.DataFrame:
-    return pd.read_sql_query(query, conn, params=params)
+SCOPES = ("national", "region", "team")
 
+# One query per metric family for a whole batch of months; every brief is sliced from these.
+INTAKE_SQL = """
+    SELECT report_month, team, region, source_file, COUNT(*) AS raw_rows
+    FROM vw_raw_submissions
+    WHERE report_month IN ({placeholders})
+    GROUP BY report_month, team, region, source_file
+    """
 
-def generate_monthly_brief(report_month: str) -> Path:
-    out_dir = Path(settings.output_briefs_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / f"monthly_brief_{report_month}.pdf"
+CLEAN_SQL = """
+    SELECT report_month, team, region, indicator_code,
+           COUNT(*) AS clean_rows,
+           SUM(COALESCE(value, 0)) AS actual_value
+    FROM vw_clean_submissions
+    WHERE report_month IN ({placeholders})
+    GROUP BY report_month, team, region, indicator_code
+    """
 
-    conn = sqlite_connect()
-    try:
-        summary = _fetch_df(
-            conn,
-            """
-            SELECT report_month, indicator_code, indicator_name, actual_value, target, progress_to_target
-            FROM vw_indicator_summary_national
-            WHERE report_month = ?
-            ORDER BY progress_to_target DESC
-            """,
-            (report_month,),
-        )
+DQ_SQL = """
+    SELECT report_month, team, severity, COUNT(*) AS n
+    FROM dq_exceptions
+    WHERE report_month IN ({placeholders})
+    GROUP BY report_month, team, severity
+    """
 
-        dq = _fetch_df(
-            conn,
-            """
-            SELECT severity, COUNT(*) AS n
-            FROM dq_exceptions
-            WHERE report_month = ?
-            GROUP BY severity
-            ORDER BY severity
-            """,
-            (report_month,),
-        )
+SUMMARY_SQL = """
+    SELECT report_month, indicator_code, indicator_name, actual_value, target, progress_to_target
+    FROM vw_indicator_summary_national
+    WHERE report_month IN ({placeholders})
+    """
 
-        intake = _fetch_df(
-            conn,
-            """
-            SELECT COUNT(DISTINCT team) AS teams_reporting,
-                   COUNT(DISTINCT source_file) AS files_received,
-                   COUNT(*) AS raw_rows
-            FROM raw_submissions
-            WHERE report_month = ?
-            """,
-            (report_month,),
-        )
+LATE_SQL = """
+    SELECT report_month, team, days_after_deadline, flagged_rows
+    FROM vw_late_reporting_flags
+    WHERE report_month IN ({placeholders})
+    """
 
-        clean_stats = _fetch_df(
-            conn,
-            """
-            SELECT COUNT(*) AS clean_rows
-            FROM clean_submissions
-            WHERE report_month = ?
-            """,
-            (report_month,),
-        )
 
-        late = _fetch_df(
-            conn,
-            """
-            SELECT team, COUNT(*) AS rows_submitted
-            FROM raw_submissions
-            WHERE report_month = ? AND (submitted_on IS NULL OR LENGTH(submitted_on) < 10)
-            GROUP BY team
-            ORDER BY rows_submitted DESC
-            """,
-            (report_month,),
+@dataclass
+class BriefData:
+    intake: pd.DataFrame
+    clean: pd.DataFrame
+    dq: pd.DataFrame
+    summary: pd.DataFrame
+    late: pd.DataFrame
+
+
+@dataclass(frozen=True)
+class BriefSpec:
+    report_month: str
+    scope: str = "national"
+    name: str | None = None  # the region or team; None for the national brief
+
+    @property
+    def filename(self) -> str:
+        if self.scope == "national":
+            return f"monthly_brief_{self.report_month}.pdf"
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", str(self.name)).strip("_") or "blank"
+        return f"monthly_brief_{self.report_month}_{self.scope}_{slug}.pdf"
+
+
+@dataclass
+class BriefResult:
+    spec: BriefSpec
+    path: Path
+    seconds: float
+    rendered: bool  # False when the inputs were unchanged and the existing PDF was kept
+
+
+def fetch_brief_data(conn, months: Iterable[str]) -> BriefData:
+    params = sorted(set(months))
+    placeholders = ",".join("?" * len(params))
+    frames = [read_sql(conn, q.format(placeholders=placeholders), params) for q in (INTAKE_SQL, CLEAN_SQL, DQ_SQL, SUMMARY_SQL, LATE_SQL)]
+    return BriefData(*frames)
+
+
+def _blank(s: pd.Series) -> pd.Series:
+    return s.isna() | (s.astype("string").str.strip() == "")
+
+
+def brief_specs(data: BriefData, months: Iterable[str], scopes: Iterable[str]) -> list[BriefSpec]:
+    scopes = set(scopes)
+    unknown = scopes - set(SCOPES)
+    if unknown:
+        raise ValueError(f"Unknown brief scope(s): {', '.join(sorted(unknown))} (expected {', '.join(SCOPES)})")
+    specs = []
+    for m in sorted(set(months)):
+        if "national" in scopes:
+            specs.append(BriefSpec(m))
+        intake = data.intake[data.intake["report_month"] == m]
+        for scope in ("region", "team"):
+            if scope in scopes:
+                values = intake.loc[~_blank(intake[scope]), scope].astype(str).unique()
+                specs.extend(BriefSpec(m, scope, v) for v in sorted(values))
+    return specs
+
+
+def _num(v) -> float | None:
+    return None if pd.isna(v) else float(v)
+
+
+def _intake_block(intake: pd.DataFrame, clean: pd.DataFrame) -> dict:
+    return {
+        "teams_reporting": int(intake["team"].nunique()),
+        "files_received": int(intake["source_file"].nunique()),
+        "raw_rows": int(intake["raw_rows"].sum()),
+        "clean_rows": int(clean["clean_rows"].sum()),
+    }
+
+
+def _dq_block(dq: pd.DataFrame) -> list[dict]:
+    by_severity = dq.groupby("severity")["n"].sum().sort_index()
+    return [{"severity": str(sev), "n": int(n)} for sev, n in by_severity.items()]
+
+
+def _late_block(late: pd.DataFrame, top: int = 3) -> list[dict]:
+    late = late.assign(days_late=pd.to_numeric(late["days_after_deadline"]).clip(lower=0).fillna(0).astype(int))
+    late = late.sort_values(["days_late", "flagged_rows", "team"], ascending=[False, False, True]).head(top)
+    return [{"team": str(r.team), "days_late": int(r.days_late), "undated_rows": int(r.flagged_rows)} for r in late.itertuples()]
+
+
+def _actuals_block(clean: pd.DataFrame, names: dict[str, str], registry: Registry) -> list[dict]:
+    # a region's or team's totals against the indicator's national baseline and target
+    totals = clean.groupby("indicator_code")["actual_value"].sum().sort_index()
+    rows = []
+    for code, v in totals.items():
+        target = registry.targets.get(code)
+        rows.append(
+            {
+                "indicator_code": code,
+                "indicator_name": names.get(code, ""),
+                "actual_value": _num(v),
+                "baseline": registry.baselines.get(code),
+                "target": target,
+                "share_of_target": None if not target or pd.isna(v) else round(float(v) / target, 4),
+            }
         )
+    return rows
+
+
+def brief_context(data: BriefData, spec: BriefSpec, registry: Registry) -> dict:
+    """Everything a brief shows, as plain JSON-able values; its hash decides whether to re-render."""
+    month = spec.report_month
+    intake = data.intake[data.intake["report_month"] == month]
+    clean = data.clean[data.clean["report_month"] == month]
+    dq = data.dq[data.dq["report_month"] == month]
+    late = data.late[data.late["report_month"] == month]
+    ctx = {"report_month": month, "scope": spec.scope, "name": spec.name, "deadline": deadline(month).isoformat()}
+
+    if spec.scope == "national":
+        summary = data.summary[data.summary["report_month"] == month]
+        top = summary.sort_values("progress_to_target", ascending=False, na_position="last", kind="stable").head(6)
+        ctx["top_indicators"] = [
+            {
+                "indicator_code": str(r.indicator_code),
+                "indicator_name": str(r.indicator_name),
+                "actual_value": _num(r.actual_value),
+                "target": _num(r.target),
+                "progress_to_target": _num(r.progress_to_target),
+            }
+            for r in top.itertuples()
+        ]
+        ctx["not_reported"] = sorted(registry.codes - set(summary["indicator_code"].astype(str)))
+    else:
+        intake = intake[intake[spec.scope].astype(str) == spec.name]
+        clean = clean[clean[spec.scope].astype(str) == spec.name]
+        if spec.scope == "team":
+            dq = dq[dq["team"].astype(str) == spec.name]
+        late = late[late["team"].astype(str).isin(intake["team"].astype(str))]
+        names = dict(zip(registry.frame["indicator_code"].astype(str), registry.frame["indicator_name"].astype(str)))
+        ctx["results"] = _actuals_block(clean, names, registry)
+
+    ctx["intake"] = _intake_block(intake, clean)
+    if spec.scope != "region":
+        # region briefs don't show exception counts, so they stay out of a region's digest
+        ctx["dq"] = _dq_block(dq)
+    ctx["late"] = _late_block(late)
+    return ctx
+
+
+@lru_cache(maxsize=1)
+def _templates_digest() -> str:
+    h = sha256()
+    for p in sorted(TEMPLATES_DIR.glob("*.j2")):
+        h.update(p.name.encode("utf-8"))
+        h.update(p.read_bytes())
+    return h.hexdigest()
+
+
+def _brief_digest(context: dict) -> str:
+    payload = {"format": BRIEF_FORMAT_VERSION, "templates": _templates_digest(), "context": context}
+    return sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+@lru_cache(maxsize=1)
+def _jinja_env():
+    from jinja2 import Environment, FileSystemLoader, StrictUndefined
+
+    env = Environment(
+        loader=FileSystemLoader(str(TEMPLATES_DIR)),
+        autoescape=True,
+        lstrip_blocks=True,
+        undefined=StrictUndefined,
+    )
+    env.filters["num"] = lambda v: "N/A" if v is None else v
+    env.filters["pct"] = lambda v: "N/A" if v is None else f"{float(v) * 100:.1f}%"
+    return env
+
+
+@lru_cache(maxsize=1)
+def _styles() -> dict:
+    from reportlab.lib.styles import ParagraphStyle
+
+    return {
+        "title": ParagraphStyle("title", fontName="Helvetica-Bold", fontSize=14, leading=18),
+        "meta": ParagraphStyle("meta", fontName="Helvetica", fontSize=10, leading=14, spaceAfter=11),
+        "h": ParagraphStyle("h", fontName="Helvetica-Bold", fontSize=11, leading=14, spaceBefore=8),
+        "p": ParagraphStyle("p", fontName="Helvetica", fontSize=10, leading=14),
+        "small": ParagraphStyle("small", fontName="Helvetica", fontSize=9, leading=12),
+        "note": ParagraphStyle("note", fontName="Helvetica-Oblique", fontSize=9, leading=12, spaceBefore=4),
+        "bullet": ParagraphStyle("bullet", fontName="Helvetica", fontSize=9, leading=12, leftIndent=10),
+    }
+
+
+_LINE = re.compile(r"^\[(\w+)\]\s?(.*)$")
+
+
+def _build_pdf(markup: str, out_path: Path) -> None:
+    from reportlab.lib.pagesizes import A4
+    from reportlab.platypus import Paragraph, SimpleDocTemplate
+
+    styles = _styles()
+    story, footer = [], []
+    for line in markup.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        m = _LINE.match(line)
+        if not m or (m.group(1) not in styles and m.group(1) != "footer"):
+            raise ValueError(f"Brief template line without a known [style]: {line!r}")
+        style, text = m.groups()
+        if style == "footer":
+            footer.append(text)
+        else:
+            story.append(Paragraph(text, styles[style]))
+
+    def draw_footer(c, doc):
+        c.saveState()
+        c.setFont("Helvetica-Oblique", 8)
+        for i, text in enumerate(footer):
+            c.drawString(50, 40 - 10 * i, text)
+        c.restoreState()
+
+    tmp = out_path.with_name(f"{out_path.name}.tmp{os.getpid()}")
+    doc = SimpleDocTemplate(str(tmp), pagesize=A4, leftMargin=50, rightMargin=50, topMargin=40, bottomMargin=60)
+    try:
+        doc.build(story, onFirstPage=draw_footer, onLaterPages=draw_footer)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    os.replace(tmp, out_path)
+
+
+def render_brief(out_path: str | Path, scope: str, context: dict) -> float:
+    """Render one brief from its template and context; returns the seconds it took."""
+    started = time.perf_counter()
+    markup = _jinja_env().get_template(f"{scope}.j2").render(
+        **context, generated_on=datetime.utcnow().strftime("%Y-%m-%d %H:%M UTC")
+    )
+    _build_pdf(markup, Path(out_path))
+    return time.perf_counter() - started
+
+
+def _render_job(job: tuple[str, str, dict]) -> float:
+    return render_brief(*job)
+
+
+def _load_manifest(out_dir: Path) -> dict:
+    p = out_dir / MANIFEST_NAME
+    return json.loads(p.read_text(encoding="utf-8")) if p.exists() else {}
+
+
+def _save_manifest(out_dir: Path, manifest: dict) -> None:
+    p = out_dir / MANIFEST_NAME
+    tmp = p.with_name(f"{p.name}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def generate_briefs(
+    months: Iterable[str],
+    registry: Registry | None = None,
+    scopes: Iterable[str] = ("national",),
+    workers: int = 1,
+    force: bool = False,
+) -> list[BriefResult]:
+    """
+    Render the briefs for a batch of months and scopes (national, region, team).
+
+    All metrics come from one set of queries over the batch. A brief is re-rendered only when
+    the hash of its inputs (data, templates, format version) differs from the one recorded in
+    the output folder's manifest, or force=True. Rendering uses `workers` processes.
+    """
+    months = list(months)
+    registry = registry or load_registry()
+    out_dir = Path(settings.output_briefs_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    conn = connect()
+    try:
+        data = fetch_brief_data(conn, months)
     finally:
         conn.close()
 
-    c = canvas.Canvas(str(out_path), pagesize=A4)
-    width, height = A4
-    y = height - 50
-
-    # Header
-    c.setFont("Helvetica-Bold", 14)
-    c.drawString(50, y, f"WGYD Monthly M&E Brief — {report_month}")
-    y -= 18
-    c.setFont("Helvetica", 10)
-    c.drawString(50, y, f"Auto-generated on: {datetime.utcnow().strftime('%Y-%m-%d %H:%M UTC')}")
-    y -= 25
-
-    # Intake section
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(50, y, "1) Reporting Intake & Data Volume")
-    y -= 14
-
-    t = intake.iloc[0].to_dict() if not intake.empty else {}
-    cs = clean_stats.iloc[0].to_dict() if not clean_stats.empty else {}
-    c.setFont("Helvetica", 10)
-    c.drawString(50, y, f"Teams reporting: {int(t.get('teams_reporting', 0))} | Files received: {int(t.get('files_received', 0))}")
-    y -= 14
-    c.drawString(50, y, f"Rows loaded — Raw: {int(t.get('raw_rows', 0))} | Clean: {int(cs.get('clean_rows', 0))}")
-    y -= 22
-
-    # Data quality section
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(50, y, "2) Data Quality Summary (Exceptions Log)")
-    y -= 14
-
-    c.setFont("Helvetica", 10)
-    if dq.empty:
-        c.drawString(50, y, "No exceptions recorded for this month.")
-        y -= 14
-    else:
-        for _, row in dq.iterrows():
-            c.drawString(50, y, f"{str(row['severity']).title()}: {int(row['n'])}")
-            y -= 14
-    y -= 8
-
-    if not late.empty:
-        c.setFont("Helvetica-Oblique", 9)
-        c.drawString(50, y, "Note: Some submissions have missing/short submission dates (possible late/invalid reporting).")
-        y -= 14
-        c.setFont("Helvetica", 9)
-        for _, row in late.head(3).iterrows():
-            c.drawString(60, y, f"- {row['team']}: {int(row['rows_submitted'])} rows flagged")
-            y -= 12
-        y -= 8
-
-    # Results section
-    c.setFont("Helvetica-Bold", 11)
-    c.drawString(50, y, "3) Results Framework Summary (National Totals)")
-    y -= 14
-
-    c.setFont("Helvetica", 9)
-    c.drawString(50, y, "Top indicators by progress-to-target:")
-    y -= 14
-
-    top_n = summary.head(6) if not summary.empty else pd.DataFrame()
-    if top_n.empty:
-        c.drawString(50, y, "No summary rows available.")
-        y -= 14
+    manifest = _load_manifest(out_dir)
+    results: dict[BriefSpec, BriefResult] = {}
+    jobs = []
+    specs = brief_specs(data, months, scopes)
+    for spec in specs:
+        context = brief_context(data, spec, registry)
+        digest = _brief_digest(context)
+        path = out_dir / spec.filename
+        if not force and manifest.get(spec.filename) == digest and path.exists():
+            results[spec] = BriefResult(spec, path, 0.0, False)
+        else:
+            jobs.append((spec, path, digest, context))
+
+    args = [(str(path), spec.scope, context) for spec, path, _, context in jobs]
+    if workers > 1 and len(jobs) > 1:
+        workers = min(workers, len(jobs))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            seconds = list(pool.map(_render_job, args, chunksize=max(1, len(jobs) // (workers * 4))))
     else:
-        for _, r in top_n.iterrows():
-            prog = r["progress_to_target"]
-            prog_txt = "N/A" if pd.isna(prog) else f"{float(prog)*100:.1f}%"
-            line = (
-                f"{r['indicator_code']} — {str(r['indicator_name'])[:52]} | "
-                f"Actual: {r['actual_value']} | Target: {r['target']} | Progress: {prog_txt}"
-            )
-            c.drawString(50, y, line)
-            y -= 12
-
-    # Footer
-    c.setFont("Helvetica-Oblique", 8)
-    c.drawString(
-        50,
-        40,
-        "Auto-generated from standardized monthly submissions. Use the exceptions report for follow-up and remediation.",
-    )
+        seconds = [_render_job(a) for a in args]
+
+    for (spec, path, digest, _), secs in zip(jobs, seconds):
+        manifest[spec.filename] = digest
+        results[spec] = BriefResult(spec, path, secs, True)
+    _save_manifest(out_dir, manifest)
+    return [results[s] for s in specs]
+
 
-    c.showPage()
-    c.save()
-    return out_path
\ No newline at end of file
+def generate_monthly_brief(report_month: str, registry: Registry | None = None) -> Path:
+    """Render the national brief for one month, whether or not its inputs changed."""
+    return generate_briefs([report_month], registry, force=True)[0].path
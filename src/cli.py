@@ -0,0 +1,252 @@
+"""
+One entry point for the pipeline commands.
+
+    python -m src.cli ingest 2025-12 [2026-02]       # load a month or range (as src/etl_run.py)
+    python -m src.cli rebuild-gold [2025-10 2025-12] # re-aggregate gold without re-ingesting
+    python -m src.cli brief 2025-12 --scopes national,region
+    python -m src.cli export [--incremental] [--dataset NAME ...]
+    python -m src.cli status                         # months loaded, last run, job queue
+    python -m src.cli serve [--port 8765]            # read-only JSON query API (src/api.py)
+
+Subcommands import what they use when they run: nothing here pulls in pandas, ReportLab or
+the database drivers at import, so `status` and `--help` start in a fraction of the time of
+a load. scripts/check_import_time.py keeps it that way.
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import sys
+from pathlib import Path
+
+from src.config import settings
+
+STATUS_MONTHS_SQL = """
+SELECT
+  p.report_month,
+  p.version,
+  p.refreshed_at,
+  (SELECT COUNT(*) FROM ingest_files f WHERE f.report_month = p.report_month) AS files,
+  (SELECT COUNT(*) FROM ingest_files f WHERE f.report_month = p.report_month AND f.error IS NOT NULL) AS failed,
+  (SELECT COUNT(*) FROM clean_submissions c WHERE c.report_month = p.report_month AND c.superseded = 0) AS clean_rows,
+  (SELECT COUNT(*) FROM gold_indicator_mart g WHERE g.report_month = p.report_month) AS gold_rows,
+  (SELECT COUNT(*) FROM dq_exceptions d WHERE d.report_month = p.report_month) AS exceptions
+FROM partition_state p
+ORDER BY p.report_month DESC
+LIMIT ?;
+"""
+LAST_RUN_SQL = """
+SELECT run_id, finished_at, status, months, seconds, error
+FROM pipeline_runs
+ORDER BY finished_at DESC
+LIMIT 1;
+"""
+JOB_COUNTS_SQL = "SELECT status, COUNT(*) FROM job_queue GROUP BY status ORDER BY status;"
+
+
+def _months(start: str | None, end: str | None) -> list[str] | None:
+    from src.utils import month_range
+
+    return month_range(start, end or start) if start else None
+
+
+def _scopes(value: str | None) -> list[str] | None:
+    return value.split(",") if value else None
+
+
+def cmd_ingest(args: argparse.Namespace) -> int:
+    from src.etl_run import run_months
+
+    run_months(
+        _months(args.month, args.end_month),
+        full_rebuild=args.full_rebuild,
+        verify_gold=args.verify_gold,
+        workers=args.workers,
+        use_cache=False if args.no_cache else None,
+        brief_workers=args.brief_workers,
+        brief_scopes=_scopes(args.brief_scopes),
+        export=args.export,
+        wait_for_jobs=not args.no_wait,
+        job_workers=args.job_workers,
+        profile_stages=args.profile.split(",") if args.profile else None,
+    )
+    return 0
+
+
+def cmd_rebuild_gold(args: argparse.Namespace) -> int:
+    from src.etl_run import rebuild_gold_months
+
+    months = rebuild_gold_months(_months(args.month, args.end_month), verify_gold=args.verify_gold)
+    print(f"Gold mart rebuilt for {len(months)} month(s)" + (f": {', '.join(sorted(months))}" if months else ""))
+    if args.verify_gold:
+        print("Gold mart verified against full rebuild")
+    return 0
+
+
+def cmd_brief(args: argparse.Namespace) -> int:
+    from src.brief_generate import generate_briefs
+
+    results = generate_briefs(
+        _months(args.month, args.end_month),
+        scopes=_scopes(args.scopes) or settings.brief_scopes,
+        workers=args.workers or settings.brief_workers,
+        force=args.force,
+    )
+    for r in results:
+        if r.rendered:
+            print(f"Brief rendered: {r.path}")
+    rendered = sum(r.rendered for r in results)
+    print(f"Briefs rendered: {rendered}, unchanged: {len(results) - rendered}")
+    return 0
+
+
+def cmd_export(args: argparse.Namespace) -> int:
+    from src.powerbi_export import export_flat, export_incremental
+
+    if args.incremental:
+        if args.dataset:
+            raise SystemExit("--dataset applies to the flat export only")
+        summary = export_incremental(args.out, fmt=args.format, chunk_rows=args.chunk_rows, full=args.full)
+        print(
+            f"Partitions written: {summary.written} ({summary.rows} rows), "
+            f"unchanged: {summary.skipped}, removed: {summary.removed}"
+        )
+    else:
+        try:
+            written = export_flat(args.out, args.dataset)
+        except ValueError as exc:
+            raise SystemExit(str(exc))
+        for name, rows in written.items():
+            print(f"Exported: {args.out / f'{name}.csv'} ({rows} rows)")
+    print("Power BI exports ready:", args.out.resolve())
+    return 0
+
+
+def _job_counts() -> dict[str, int]:
+    path = Path(settings.job_queue_path)
+    if not path.exists():
+        return {}
+    # read-only, so looking does not create the queue file or its schema
+    conn = sqlite3.connect(f"{path.resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        return dict(conn.execute(JOB_COUNTS_SQL).fetchall())
+    except sqlite3.OperationalError:
+        return {}
+    finally:
+        conn.close()
+
+
+def cmd_status(args: argparse.Namespace) -> int:
+    from src.db import connect, execute
+
+    if settings.db_type == "sqlite":
+        if not Path(settings.sqlite_path).exists():
+            print(f"No database at {settings.sqlite_path}; create it with: python scripts/init_db.py")
+            return 1
+        print(f"Database: sqlite {Path(settings.sqlite_path).resolve()}")
+    else:
+        print(f"Database: postgres {settings.db_name} on {settings.db_host}:{settings.db_port}")
+
+    conn = connect()
+    try:
+        months = execute(conn, STATUS_MONTHS_SQL, (args.months,)).fetchall()
+        last_run = execute(conn, LAST_RUN_SQL).fetchone()
+    finally:
+        conn.close()
+
+    if months:
+        header = ("month", "version", "refreshed_at", "files", "failed", "clean_rows", "gold_rows", "exceptions")
+        rows = [header] + [tuple(str(v) for v in r) for r in months]
+        widths = [max(len(r[i]) for r in rows) for i in range(len(header))]
+        for r in rows:
+            print("  ".join(v.rjust(w) if i > 0 and i != 2 else v.ljust(w) for i, (v, w) in enumerate(zip(r, widths))))
+    else:
+        print("No months loaded")
+
+    if last_run:
+        run_id, finished_at, status, run_months, seconds, error = last_run
+        print(f"Last run: {run_id} {status} ({run_months}, {seconds:.1f}s, finished {finished_at})")
+        if error:
+            print(f"  {error.strip().splitlines()[-1]}")
+
+    jobs = _job_counts()
+    print("Jobs: " + (", ".join(f"{s} {n}" for s, n in jobs.items()) if jobs else "queue empty"))
+    return 0
+
+
+def cmd_serve(args: argparse.Namespace) -> int:
+    from src.api import serve
+
+    serve(args.host, args.port)
+    return 0
+
+
+def _add_month_range(p: argparse.ArgumentParser, required: bool) -> None:
+    if required:
+        p.add_argument("month", nargs="?", default=settings.report_month, help="report month, YYYY-MM (default: REPORT_MONTH)")
+    else:
+        p.add_argument("month", nargs="?", default=None, help="report month, YYYY-MM (default: every month)")
+    p.add_argument("end_month", nargs="?", default=None, help="last month of an inclusive range, YYYY-MM")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("ingest", help="run the monthly ETL for a month or range of months")
+    _add_month_range(p, required=True)
+    p.add_argument("--full-rebuild", action="store_true", help="re-aggregate the whole gold mart")
+    p.add_argument("--verify-gold", action="store_true", help="fail if the gold mart differs from a full rebuild")
+    p.add_argument("--workers", type=int, default=None, help="ingest worker processes (default: INGEST_WORKERS)")
+    p.add_argument("--no-cache", action="store_true", help="re-parse every file, bypassing the ingest cache")
+    p.add_argument("--brief-workers", type=int, default=None, help="brief rendering processes (default: BRIEF_WORKERS)")
+    p.add_argument("--brief-scopes", default=None, help="comma-separated brief scopes: national, region, team (default: BRIEF_SCOPES)")
+    p.add_argument("--export", action="store_true", help="also queue an incremental Power BI export (POWERBI_EXPORT_DIR)")
+    p.add_argument("--no-wait", action="store_true", help="queue the post-load jobs without running them")
+    p.add_argument("--job-workers", type=int, default=None, help="job worker processes (default: JOB_WORKERS)")
+    p.add_argument(
+        "--profile",
+        default=None,
+        help="comma-separated stages to cProfile, e.g. read,validate,gold_rebuild or all (default: PROFILE_STAGES)",
+    )
+    p.set_defaults(func=cmd_ingest)
+
+    p = sub.add_parser("rebuild-gold", help="re-aggregate gold and anomaly baselines from clean_submissions, for a month range or everything")
+    _add_month_range(p, required=False)
+    p.add_argument("--verify-gold", action="store_true", help="fail if the gold mart differs from a full rebuild")
+    p.set_defaults(func=cmd_rebuild_gold)
+
+    p = sub.add_parser("brief", help="render the monthly briefs for a month or range of months")
+    _add_month_range(p, required=True)
+    p.add_argument("--scopes", default=None, help="comma-separated brief scopes: national, region, team (default: BRIEF_SCOPES)")
+    p.add_argument("--workers", type=int, default=None, help="rendering processes (default: BRIEF_WORKERS)")
+    p.add_argument("--force", action="store_true", help="re-render briefs whose inputs did not change")
+    p.set_defaults(func=cmd_brief)
+
+    p = sub.add_parser("export", help="write the Power BI datasets")
+    p.add_argument("--out", type=Path, default=Path(settings.powerbi_export_dir))
+    p.add_argument("--dataset", action="append", default=None, help="flat export of this dataset only (repeatable)")
+    p.add_argument("--incremental", action="store_true", help="write changed month partitions only")
+    p.add_argument("--format", choices=["parquet", "csv"], help="incremental file format (default: parquet if pyarrow is installed)")
+    p.add_argument("--full", action="store_true", help="with --incremental, rewrite every partition")
+    p.add_argument("--chunk-rows", type=int, default=50_000, help="rows fetched per chunk in incremental mode")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("status", help="show loaded months, the last run and the job queue")
+    p.add_argument("--months", type=int, default=12, help="most recent months to list")
+    p.set_defaults(func=cmd_status)
+
+    p = sub.add_parser("serve", help="serve the reporting views as a read-only JSON API with cached results")
+    p.add_argument("--host", default=None, help="address to listen on (default: API_HOST)")
+    p.add_argument("--port", type=int, default=None, help="port to listen on (default: API_PORT)")
+    p.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
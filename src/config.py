@@ -16,16 +16,79 @@ class Settings:
     db_name: str = os.getenv("DB_NAME", "wgyd_monitoring")
     db_user: str = os.getenv("DB_USER", "postgres")
     db_password: str = os.getenv("DB_PASSWORD", "postgres")
+    # Postgres connection pool; also the read-only connections the query API shares (src/api.py)
+    db_pool_size: int = int(os.getenv("DB_POOL_SIZE", "5"))
 
     raw_submissions_dir: str = os.getenv("RAW_SUBMISSIONS_DIR", "./data/submissions_raw")
     indicator_registry_path: str = os.getenv("INDICATOR_REGISTRY_PATH", "./data/indicator_registry/indicator_registry.xlsx")
+    # Header aliases, region/gender/age band spellings and accepted date formats (src/standardize.py)
+    normalization_path: str = os.getenv("NORMALIZATION_PATH", "./config/normalization.json")
 
     output_exceptions_dir: str = os.getenv("OUTPUT_EXCEPTIONS_DIR", "./data/outputs/exceptions")
     output_briefs_dir: str = os.getenv("OUTPUT_BRIEFS_DIR", "./data/outputs/briefs")
     output_logs_dir: str = os.getenv("OUTPUT_LOGS_DIR", "./data/outputs/logs")
+    # Pipeline stages to cProfile into OUTPUT_LOGS_DIR/profiles (comma-separated, or "all")
+    profile_stages: tuple[str, ...] = tuple(s.strip() for s in os.getenv("PROFILE_STAGES", "").split(",") if s.strip())
 
     report_month: str = os.getenv("REPORT_MONTH", "2025-12")
 
+    # Workbook parser: auto (calamine when python-calamine is installed, else openpyxl), calamine or openpyxl
+    excel_engine: str = os.getenv("EXCEL_ENGINE", "auto")
+
+    # Worker processes for per-file read -> standardize -> validate (1 = sequential)
+    ingest_workers: int = int(os.getenv("INGEST_WORKERS", "1"))
+
+    # CSVs at least this large are read in chunks of csv_chunk_rows rows (0 disables streaming)
+    csv_chunk_rows: int = int(os.getenv("CSV_CHUNK_ROWS", "100000"))
+    stream_csv_min_mb: float = float(os.getenv("STREAM_CSV_MIN_MB", "50"))
+
+    # Processes used to render briefs
+    brief_workers: int = int(os.getenv("BRIEF_WORKERS", "4"))
+    # Briefs rendered per month: national, region and/or team (comma-separated)
+    brief_scopes: tuple[str, ...] = tuple(s.strip() for s in os.getenv("BRIEF_SCOPES", "national").split(",") if s.strip())
+
+    # Post-load job queue (briefs, exceptions reports, exports); see src/jobs.py
+    job_queue_path: str = os.getenv("JOB_QUEUE_PATH", "./data/jobs.sqlite")
+    job_workers: int = int(os.getenv("JOB_WORKERS", "2"))
+    job_max_attempts: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    job_retry_seconds: float = float(os.getenv("JOB_RETRY_SECONDS", "10"))
+    # A running job not finished within this long is assumed lost and handed to another worker
+    job_lease_seconds: float = float(os.getenv("JOB_LEASE_SECONDS", "3600"))
+
+    powerbi_export_dir: str = os.getenv("POWERBI_EXPORT_DIR", "./data/outputs/powerbi")
+
+    # Read-only JSON query API over the reporting views (src/api.py); results cached per
+    # query until a month they cover is reloaded
+    api_host: str = os.getenv("API_HOST", "127.0.0.1")
+    api_port: int = int(os.getenv("API_PORT", "8765"))
+    api_cache_entries: int = int(os.getenv("API_CACHE_ENTRIES", "256"))
+
+    # src/watch.py: how often RAW_SUBMISSIONS_DIR is scanned, and how long a new or changed
+    # file must stay unmodified before it is loaded (so half-copied files are not read)
+    watch_poll_seconds: float = float(os.getenv("WATCH_POLL_SECONDS", "5"))
+    watch_debounce_seconds: float = float(os.getenv("WATCH_DEBOUNCE_SECONDS", "10"))
+
+    # Which clean row survives when the same natural key (report_month, team, indicator,
+    # region, gender, age_band) arrives more than once: latest, first or off; see src/duplicates.py
+    duplicate_policy: str = os.getenv("DUPLICATE_POLICY", "latest").lower()
+
+    # Anomaly checks of monthly totals per indicator, team and region against their own
+    # history; see src/anomalies.py. A total is flagged when its robust z-score exceeds the
+    # threshold, once at least min_history of the last window_months months have a total.
+    anomaly_window_months: int = int(os.getenv("ANOMALY_WINDOW_MONTHS", "12"))
+    anomaly_min_history: int = int(os.getenv("ANOMALY_MIN_HISTORY", "6"))
+    anomaly_threshold: float = float(os.getenv("ANOMALY_THRESHOLD", "3.5"))
+
+    # A month's submissions are due by this day of the following month; lateness per team and
+    # month is kept in team_timeliness (src/timeliness.py)
+    submission_deadline_day: int = int(os.getenv("SUBMISSION_DEADLINE_DAY", "10"))
+
+    # Content-hash cache of standardized/validated submission files
+    ingest_cache_enabled: bool = os.getenv("INGEST_CACHE", "1") != "0"
+    ingest_cache_dir: str = os.getenv("INGEST_CACHE_DIR", "./data/cache/ingest")
+    ingest_cache_max_age_days: float = float(os.getenv("INGEST_CACHE_MAX_AGE_DAYS", "30"))
+    ingest_cache_max_mb: int = int(os.getenv("INGEST_CACHE_MAX_MB", "1024"))
+
     @property
     def sqlalchemy_url(self) -> str:
         if self.db_type == "sqlite":
@@ -1,9 +1,250 @@
+from __future__ import annotations
+
+import csv
+import io
+import os
 import sqlite3
+import uuid
+import warnings
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Any, Iterator, Sequence
 
 from src.config import settings
 
+if TYPE_CHECKING:
+    import pandas as pd
+
+SQL_DIR = Path(__file__).resolve().parents[1] / "sql"
+
+# Applied on top of the connection defaults for the duration of a batch load
+BULK_LOAD_PRAGMAS = [
+    "PRAGMA synchronous = NORMAL;",  # safe with WAL; fsync at checkpoints rather than every commit
+    "PRAGMA cache_size = -65536;",  # 64 MiB page cache
+    "PRAGMA temp_store = MEMORY;",
+]
+
+# COPY ... (FORMAT csv) marker for NULL, so NULL and '' stay distinct
+_COPY_NULL = r"\N"
+
+
+class Backend(ABC):
+    """
+    What differs between the supported databases. Pipeline SQL is written once with
+    qmark (?) parameters and standard SQL; each backend adapts placeholders, transactions,
+    bulk loading and the DDL directory.
+    """
+
+    name = ""
+    sql_dir = SQL_DIR
+
+    @abstractmethod
+    def connect(self) -> Any:
+        raise NotImplementedError
+
+    @abstractmethod
+    def connect_readonly(self) -> Any:
+        raise NotImplementedError
+
+    def sql(self, query: str) -> str:
+        return query
+
+    @abstractmethod
+    def in_transaction(self, conn: Any) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def begin(self, conn: Any) -> None:
+        raise NotImplementedError
+
+    def commit(self, conn: Any) -> None:
+        conn.commit()
+
+    def rollback(self, conn: Any) -> None:
+        conn.rollback()
+
+    def tune_for_bulk_load(self, conn: Any) -> None:
+        pass
+
+    @abstractmethod
+    def bulk_insert(self, conn: Any, table: str, df: pd.DataFrame, batch_rows: int) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def executescript(self, conn: Any, script: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def fetch_chunks(self, conn: Any, query: str, params: Sequence, chunksize: int) -> Iterator[tuple[list[str], list]]:
+        raise NotImplementedError
+
+
+class SqliteBackend(Backend):
+    name = "sqlite"
+
+    def connect(self) -> sqlite3.Connection:
+        ensure_sqlite_parent_dir()
+        conn = sqlite3.connect(settings.sqlite_path)
+        conn.execute("PRAGMA foreign_keys = ON;")
+        # WAL lets dashboard readers keep reading the previous month while a refresh is loading
+        conn.execute("PRAGMA journal_mode = WAL;")
+        conn.execute("PRAGMA busy_timeout = 5000;")
+        return conn
+
+    def connect_readonly(self) -> sqlite3.Connection:
+        # mode=ro: never creates the file or takes a write lock; shareable between threads
+        uri = f"{Path(settings.sqlite_path).resolve().as_uri()}?mode=ro"
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.execute("PRAGMA busy_timeout = 5000;")
+        return conn
+
+    def in_transaction(self, conn: sqlite3.Connection) -> bool:
+        return conn.in_transaction
+
+    def begin(self, conn: sqlite3.Connection) -> None:
+        conn.execute("BEGIN IMMEDIATE;")
+
+    def tune_for_bulk_load(self, conn: sqlite3.Connection) -> None:
+        for pragma in BULK_LOAD_PRAGMAS:
+            conn.execute(pragma)
+
+    def bulk_insert(self, conn: sqlite3.Connection, table: str, df: pd.DataFrame, batch_rows: int) -> None:
+        cols = ", ".join(df.columns)
+        placeholders = ", ".join("?" * len(df.columns))
+        sql = f"INSERT INTO {table} ({cols}) VALUES ({placeholders})"
+        for start in range(0, len(df), batch_rows):
+            conn.executemany(sql, _records(df.iloc[start : start + batch_rows]))
+
+    def executescript(self, conn: sqlite3.Connection, script: str) -> None:
+        conn.executescript(script)
+
+    def fetch_chunks(self, conn: sqlite3.Connection, query: str, params: Sequence, chunksize: int):
+        cur = conn.execute(query, tuple(params))
+        columns = [d[0] for d in cur.description]
+        while rows := cur.fetchmany(chunksize):
+            yield columns, rows
+
+
+class PostgresBackend(Backend):
+    name = "postgres"
+    sql_dir = SQL_DIR / "postgres"
+
+    def connect(self) -> Any:
+        # a pooled psycopg2 connection; close() hands it back to the pool
+        return _engine().raw_connection()
+
+    def connect_readonly(self) -> Any:
+        # for processes that only read: the session setting stays with the pooled connection
+        conn = self.connect()
+        conn.set_session(readonly=True)
+        return conn
+
+    def sql(self, query: str) -> str:
+        # psycopg2 uses pyformat, so literal % must be doubled
+        return query.replace("%", "%%").replace("?", "%s")
+
+    def in_transaction(self, conn: Any) -> bool:
+        from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+        return conn.get_transaction_status() != TRANSACTION_STATUS_IDLE
+
+    def begin(self, conn: Any) -> None:
+        with conn.cursor() as cur:
+            cur.execute("BEGIN;")
+
+    # connection.commit()/rollback() do nothing in autocommit mode
+    def commit(self, conn: Any) -> None:
+        with conn.cursor() as cur:
+            cur.execute("COMMIT;")
+
+    def rollback(self, conn: Any) -> None:
+        with conn.cursor() as cur:
+            cur.execute("ROLLBACK;")
+
+    def bulk_insert(self, conn: Any, table: str, df: pd.DataFrame, batch_rows: int) -> None:
+        copy_sql = f"COPY {table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv, NULL '{_COPY_NULL}')"
+        with conn.cursor() as cur:
+            for start in range(0, len(df), batch_rows):
+                buf = io.StringIO()
+                df.iloc[start : start + batch_rows].to_csv(
+                    buf, index=False, header=False, na_rep=_COPY_NULL, quoting=csv.QUOTE_MINIMAL
+                )
+                buf.seek(0)
+                cur.copy_expert(copy_sql, buf)
+
+    def executescript(self, conn: Any, script: str) -> None:
+        with conn.cursor() as cur:
+            cur.execute(script)
+
+    def fetch_chunks(self, conn: Any, query: str, params: Sequence, chunksize: int):
+        query, args = (self.sql(query), tuple(params)) if params else (query, None)
+        if self.in_transaction(conn):
+            # autocommit can't be switched mid-transaction, so the result is buffered client-side
+            with conn.cursor() as cur:
+                cur.execute(query, args)
+                while rows := cur.fetchmany(chunksize):
+                    yield [d[0] for d in cur.description], rows
+            return
+        # a named (server-side) cursor keeps the result on the server; psycopg2 only allows
+        # one outside autocommit, in the transaction it then opens implicitly
+        raw = getattr(conn, "dbapi_connection", conn)
+        raw.autocommit = False
+        try:
+            with raw.cursor(name=f"chunks_{uuid.uuid4().hex}") as cur:
+                cur.itersize = chunksize
+                cur.execute(query, args)
+                while rows := cur.fetchmany(chunksize):
+                    yield [d[0] for d in cur.description], rows
+        finally:
+            raw.rollback()  # read-only: just ends that transaction
+            raw.autocommit = True
+
+
+_BACKENDS = {b.name: b for b in (SqliteBackend(), PostgresBackend())}
+
+
+def get_backend() -> Backend:
+    try:
+        return _BACKENDS[settings.db_type]
+    except KeyError:
+        raise ValueError(f"Unsupported DB_TYPE {settings.db_type!r} (expected one of: {', '.join(_BACKENDS)})")
+
+
+@lru_cache(maxsize=1)
+def _engine():
+    from sqlalchemy import create_engine
+    from sqlalchemy.engine import URL
+
+    # URL.create rather than settings.sqlalchemy_url so DB_HOST may also be a unix socket directory
+    url = URL.create(
+        "postgresql+psycopg2",
+        username=settings.db_user,
+        password=settings.db_password,
+        host=settings.db_host,
+        port=settings.db_port,
+        database=settings.db_name,
+    )
+    # autocommit, as with sqlite3: reads never hold a transaction open and
+    # transaction() issues an explicit BEGIN for each write block
+    return create_engine(
+        url,
+        isolation_level="AUTOCOMMIT",
+        pool_size=settings.db_pool_size,
+        max_overflow=2,
+        pool_pre_ping=True,
+    )
+
+
+def _drop_inherited_pool() -> None:
+    # a forked worker (brief rendering, ingest) must not share the parent's pooled sockets
+    if _engine.cache_info().currsize:
+        _engine().dispose(close=False)
+
+
+os.register_at_fork(after_in_child=_drop_inherited_pool)
+
 
 def ensure_sqlite_parent_dir():
     if settings.db_type != "sqlite":
@@ -13,20 +254,108 @@ def ensure_sqlite_parent_dir():
         p.parent.mkdir(parents=True, exist_ok=True)
 
 
+def connect() -> Any:
+    """A DB-API connection to the configured database (DB_TYPE)."""
+    return get_backend().connect()
+
+
+def connect_readonly() -> Any:
+    """A connection to the configured database that refuses writes (src/api.py)."""
+    return get_backend().connect_readonly()
+
+
 def sqlite_connect() -> sqlite3.Connection:
-    ensure_sqlite_parent_dir()
-    conn = sqlite3.connect(settings.sqlite_path)
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+    return _BACKENDS["sqlite"].connect()
+
+
+def execute(conn: Any, query: str, params: Sequence = ()) -> Any:
+    """Run one qmark-style statement on any backend and return its cursor."""
+    cur = conn.cursor()
+    if params:
+        cur.execute(get_backend().sql(query), tuple(params))
+    else:
+        cur.execute(query)
+    return cur
+
+
+def read_sql(conn: Any, query: str, params: Sequence = ()) -> pd.DataFrame:
+    """pd.read_sql_query for a qmark-style query on a raw DB-API connection of any backend."""
+    # pandas is imported on first use, so commands that only run SQL start without it
+    import pandas as pd
+
+    with warnings.catch_warnings():
+        # pandas warns for DB-API connections other than sqlite3; psycopg2 works fine here
+        warnings.filterwarnings("ignore", message="pandas only supports SQLAlchemy", category=UserWarning)
+        if params:
+            return pd.read_sql_query(get_backend().sql(query), conn, params=tuple(params))
+        return pd.read_sql_query(query, conn)
+
+
+def read_sql_chunks(conn: Any, query: str, params: Sequence = (), chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+    """
+    Stream a qmark-style query as DataFrames of at most chunksize rows, so a large table
+    is never materialized at once. Yields nothing for an empty result.
+    """
+    import pandas as pd
+
+    for columns, rows in get_backend().fetch_chunks(conn, query, params, chunksize):
+        yield pd.DataFrame.from_records(rows, columns=columns)
+
+
+def tune_for_bulk_load(conn: Any) -> None:
+    get_backend().tune_for_bulk_load(conn)
+
+
+@contextmanager
+def transaction(conn: Any) -> Iterator[Any]:
+    """
+    Run the block in one write transaction, committed on success and rolled back on error.
+
+    Nested use joins the outer transaction, which then owns the commit.
+    """
+    backend = get_backend()
+    if backend.in_transaction(conn):
+        yield conn
+        return
+    backend.begin(conn)
+    try:
+        yield conn
+    except BaseException:
+        backend.rollback(conn)
+        raise
+    backend.commit(conn)
+
+
+def _records(df: pd.DataFrame) -> Iterator[tuple]:
+    # column-wise conversion to plain Python values, with None for NaN / pd.NA
+    cols = [df[c].to_numpy(dtype=object, na_value=None) for c in df.columns]
+    return zip(*cols)
+
+
+def bulk_insert(conn: Any, table: str, df: pd.DataFrame, batch_rows: int = 50_000) -> int:
+    """
+    Append df's columns to table: executemany over one prepared INSERT on SQLite,
+    COPY FROM STDIN on Postgres. Does not commit.
+    """
+    if df.empty:
+        return 0
+    get_backend().bulk_insert(conn, table, df, batch_rows)
+    return len(df)
+
+
+def schema_files() -> list[Path]:
+    # numbered scripts for the configured backend in apply order, without the teardown
+    sql_dir = get_backend().sql_dir
+    return [p for p in sorted(sql_dir.glob("[0-9][0-9]_*.sql")) if not p.name.startswith("99_")]
 
 
 def run_sql_file(path: str) -> None:
-    if settings.db_type != "sqlite":
-        raise RuntimeError("run_sql_file currently implemented for sqlite only in this MVP.")
+    backend = get_backend()
     sql = Path(path).read_text(encoding="utf-8")
-    conn = sqlite_connect()
+    conn = backend.connect()
     try:
-        conn.executescript(sql)
+        # a multi-statement script runs as one implicit transaction on Postgres
+        backend.executescript(conn, sql)
         conn.commit()
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from src.db import execute
+
+
+@dataclass(frozen=True)
+class Dimension:
+    column: str  # text column of the standardized frame
+    table: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.column}_id"
+
+
+# Repeated text columns of raw_submissions / clean_submissions / gold_indicator_mart, stored as
+# integer keys into these lookup tables. The vw_* views in 04_views_reporting.sql join them back.
+DIMENSIONS = [
+    Dimension("team", "dim_team"),
+    Dimension("region", "dim_region"),
+    Dimension("gender", "dim_gender"),
+    Dimension("age_band", "dim_age_band"),
+]
+
+
+class DimensionKeys:
+    """
+    Text value -> integer key for each dimension, read from the dim_* tables once and
+    extended as new values arrive. Use one per load transaction: keys added by a load
+    that rolls back are gone from the database but would still be cached here.
+    """
+
+    def __init__(self, conn: Any):
+        self.conn = conn
+        self._keys = {d.column: self._fetch(d) for d in DIMENSIONS}
+
+    def _fetch(self, d: Dimension) -> dict[str, int]:
+        rows = execute(self.conn, f"SELECT {d.column}, {d.key} FROM {d.table};").fetchall()
+        return {value: int(key) for value, key in rows}
+
+    def _keys_for(self, d: Dimension, values: list[str]) -> dict[str, int]:
+        keys = self._keys[d.column]
+        new = sorted(set(values) - keys.keys())
+        if new:
+            # another load may be adding the same value; either way it ends up with one key
+            sql = f"INSERT INTO {d.table} ({d.column}) VALUES (?) ON CONFLICT ({d.column}) DO NOTHING;"
+            for value in new:
+                execute(self.conn, sql, (value,))
+            keys = self._keys[d.column] = self._fetch(d)
+        return keys
+
+    def encode(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        df with each dimension column swapped for its key column (nullable Int64, NULL for a
+        missing value), ready for bulk_insert. New values are added to the dim tables; does not commit.
+        """
+        out = df.drop(columns=[d.column for d in DIMENSIONS if d.column in df.columns])
+        for d in DIMENSIONS:
+            if d.column not in df.columns:
+                continue
+            cat = df[d.column].astype("category")
+            # stored as text, as the old TEXT columns did with e.g. a numeric team name
+            values = [str(v) for v in cat.cat.categories]
+            keys = self._keys_for(d, values)
+            codes = cat.cat.codes.to_numpy()
+            by_code = np.array([keys[v] for v in values] + [0], dtype="int64")
+            out[d.key] = pd.arrays.IntegerArray(by_code[codes], codes < 0)
+        return out
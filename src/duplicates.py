@@ -0,0 +1,159 @@
+"""
+One clean row per natural key (report_month, team, indicator_code, region, gender, age_band),
+however many files or loads it arrived in.
+
+Every clean_submissions row carries natural_key, a 64-bit hash of those columns
+(validate.key_hashes), indexed with report_month. Once a load has appended (or a removed
+file has deleted) its rows, resolve_duplicates finds the keys of the months it touched that
+occur more than once or lost their row in use, with one GROUP BY over that index, reads only
+those rows and marks all but one superseded, per DUPLICATE_POLICY:
+
+- latest (default): the row with the latest submitted_date wins; a missing date counts as
+  oldest, and on a tie the row loaded last wins
+- first: the row loaded first wins and resubmissions are superseded
+- off: every row stays in use (validation still flags duplicates within a file)
+
+Superseded rows stay in clean_submissions but gold, the anomaly totals and
+vw_clean_submissions leave them out. Each run decides a key afresh from all its rows, so
+when the file of the row in use is removed or reloaded without it, the next best row is
+back in use. A row superseded by a row from another file or an earlier load is logged to
+dq_exceptions against its own file, and those warnings are rewritten with every run;
+within a file, validation's duplicate warning already covers it.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+import numpy as np
+import pandas as pd
+
+from src.config import settings
+from src.db import execute, read_sql
+from src.validate import EXCEPTION_COLUMNS, KEY_COLS, key_hashes
+
+DUPLICATE_POLICIES = ("latest", "first", "off")
+
+# keys without exactly one row in use: loaded again, or the row in use is gone
+DUPLICATE_KEYS_SQL = """
+    SELECT natural_key FROM clean_submissions WHERE report_month = ?
+    GROUP BY natural_key HAVING COUNT(*) - SUM(superseded) <> 1;
+"""
+DUPLICATE_ROWS_SQL = """
+    SELECT c.id, c.natural_key, t.team, c.indicator_code, c.submitted_date, c.source_file, c.loaded_at, c.superseded
+    FROM clean_submissions c
+    JOIN dim_team t ON t.team_id = c.team_id
+    WHERE c.report_month = ? AND c.natural_key IN ({placeholders});
+"""
+SET_SUPERSEDED_SQL = "UPDATE clean_submissions SET superseded = ? WHERE id IN ({placeholders});"
+
+ISSUE_PREFIX = "Duplicate record superseded by the row from"
+# the warnings of the previous run over a month, replaced by this one's
+DELETE_EXCEPTIONS_SQL = (
+    "DELETE FROM dq_exceptions WHERE report_month = ? AND severity = 'warning' AND field = 'record' AND issue LIKE ?;"
+)
+
+# parameters per IN (...) list
+_BATCH = 500
+
+
+@dataclass
+class Resolution:
+    superseded: int  # clean rows newly marked superseded
+    restored: int  # superseded rows back in use, their key's row in use being gone
+    exceptions: pd.DataFrame  # dq_exceptions rows for every superseded row of the months, not inserted
+
+
+def natural_keys(df: pd.DataFrame) -> np.ndarray:
+    """The natural_key of each row of a standardized frame, as stored (signed 64-bit)."""
+    return key_hashes(df[KEY_COLS]).view(np.int64)
+
+
+def duplicate_policy(policy: str | None = None) -> str:
+    policy = (policy or settings.duplicate_policy).lower()
+    if policy not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown DUPLICATE_POLICY {policy!r} (expected one of: {', '.join(DUPLICATE_POLICIES)})")
+    return policy
+
+
+def _batches(values: list) -> Iterable[list]:
+    for i in range(0, len(values), _BATCH):
+        yield values[i : i + _BATCH]
+
+
+def _kept(rows: pd.DataFrame, policy: str) -> pd.Series:
+    # True for the one row per natural_key that stays in use (every row with policy off)
+    if policy == "off":
+        return pd.Series(True, index=rows.index)
+    if policy == "first":
+        ordered = rows.sort_values("id")
+        return ~ordered.duplicated("natural_key", keep="first").reindex(rows.index)
+    # ISO dates (text on SQLite, datetime.date on Postgres) sort as strings
+    dated = rows["submitted_date"].astype("string").fillna("")
+    ordered = rows.assign(_date=dated).sort_values(["_date", "id"])
+    return ~ordered.duplicated("natural_key", keep="last").reindex(rows.index)
+
+
+def _set_superseded(conn: Any, ids: pd.Series, flag: int) -> None:
+    for batch in _batches([int(i) for i in ids]):
+        execute(conn, SET_SUPERSEDED_SQL.format(placeholders=",".join("?" * len(batch))), (flag, *batch))
+
+
+def resolve_duplicates(conn: Any, months: Iterable[str], policy: str | None = None) -> Resolution:
+    """
+    Keep one clean row in use for each natural key that occurs more than once in these
+    report months, marking the others superseded, and replace the months' duplicate
+    warnings in dq_exceptions (the new ones are returned). Does not commit.
+    """
+    policy = duplicate_policy(policy)
+    created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    superseded = restored = 0
+    frames = []
+    for month in sorted(months):
+        execute(conn, DELETE_EXCEPTIONS_SQL, (month, ISSUE_PREFIX + "%"))
+        keys = [r[0] for r in execute(conn, DUPLICATE_KEYS_SQL, (month,)).fetchall()]
+        if not keys:
+            continue
+        rows = pd.concat(
+            [
+                read_sql(conn, DUPLICATE_ROWS_SQL.format(placeholders=",".join("?" * len(batch))), (month, *batch))
+                for batch in _batches(keys)
+            ],
+            ignore_index=True,
+        )
+        kept = _kept(rows, policy)
+        was_superseded = rows["superseded"].astype(bool)
+        _set_superseded(conn, rows.loc[~kept & ~was_superseded, "id"], 1)
+        _set_superseded(conn, rows.loc[kept & was_superseded, "id"], 0)
+        superseded += int((~kept & ~was_superseded).sum())
+        restored += int((kept & was_superseded).sum())
+
+        losers = rows.loc[~kept]
+        winner = rows.loc[kept].set_index("natural_key").loc[losers["natural_key"]]
+        other = (winner["source_file"].to_numpy() != losers["source_file"].to_numpy()) | (
+            winner["loaded_at"].to_numpy() != losers["loaded_at"].to_numpy()
+        )
+        losers, winner = losers.loc[other], winner.loc[other]
+        submitted = winner["submitted_date"].fillna("no date").astype(str).to_numpy()
+        frames.append(
+            pd.DataFrame(
+                {
+                    "report_month": month,
+                    "team": losers["team"].to_numpy(),
+                    "indicator_code": losers["indicator_code"].to_numpy(),
+                    "field": "record",
+                    "issue": [
+                        f"{ISSUE_PREFIX} {f} (submitted {d}; DUPLICATE_POLICY={policy})"
+                        for f, d in zip(winner["source_file"].to_numpy(), submitted)
+                    ],
+                    "severity": "warning",
+                    "source_file": losers["source_file"].to_numpy(),
+                    "row_ref": None,
+                    "created_at": created_at,
+                },
+                columns=EXCEPTION_COLUMNS,
+            )
+        )
+    exceptions = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=EXCEPTION_COLUMNS)
+    return Resolution(superseded, restored, exceptions)
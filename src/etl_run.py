@@ -1,42 +1,50 @@
 from __future__ import annotations
 
+from dataclasses import asdict, dataclass
 from datetime import datetime
 from pathlib import Path
+import json
+import os
 
 import pandas as pd
 
+from src.anomalies import anomaly_exceptions, refresh_value_stats
 from src.config import settings
-from src.db import sqlite_connect
-from src.io_inputs import list_submission_files, read_submission
-from src.standardize import standardize_submission
-from src.validate import validate
-from src.brief_generate import generate_monthly_brief
-
-def read_registry_codes() -> set[str]:
-    reg = pd.read_excel(Path(settings.indicator_registry_path), sheet_name="indicator_registry")
-    return set(reg["indicator_code"].astype(str).tolist())
-
-def load_registry(conn):
-    reg_path = Path(settings.indicator_registry_path)
-    registry = pd.read_excel(reg_path, sheet_name="indicator_registry")
-    registry.to_sql("dim_indicator_registry", conn, if_exists="replace", index=False)
-
-def append_df(conn, table: str, df: pd.DataFrame):
-    df.to_sql(table, conn, if_exists="append", index=False)
-
-def rebuild_gold(conn):
-    # Clear gold mart and rebuild from clean + registry
-    conn.execute("DELETE FROM gold_indicator_mart;")
-
-    query = """
-    INSERT INTO gold_indicator_mart
-    (report_month, indicator_code, region, gender, age_band, actual_value, baseline, target, progress_to_target)
+from src.db import bulk_insert, connect, execute, read_sql_chunks, transaction, tune_for_bulk_load
+from src.dimensions import DimensionKeys
+from src.duplicates import Resolution, natural_keys, resolve_duplicates
+from src.ingest import FileResult, file_error_exceptions, iter_ingest
+from src.ingest_cache import IngestCache
+from src.instrument import RunLog
+from src.io_inputs import list_submission_files
+from src.jobs import connect_queue, enqueue, job_rows, work
+from src.registry import load_registry, sync_registry
+from src.standardize import load_normalization
+from src.timeliness import refresh_timeliness
+from src.utils import FileSignature, file_signature
+from src.validate import EXCEPTION_COLUMNS
+
+GOLD_COLUMNS = [
+    "report_month",
+    "indicator_code",
+    "region_id",
+    "gender_id",
+    "age_band_id",
+    "actual_value",
+    "baseline",
+    "target",
+    "progress_to_target",
+]
+
+# {where} is empty for a full rebuild or a report_month filter for an incremental one;
+# superseded duplicates (src/duplicates.py) never count
+GOLD_SELECT = """
     SELECT
       c.report_month,
       c.indicator_code,
-      c.region,
-      c.gender,
-      c.age_band,
+      c.region_id,
+      c.gender_id,
+      c.age_band_id,
       SUM(COALESCE(c.value,0)) AS actual_value,
       r.baseline,
       r.target,
@@ -46,79 +54,800 @@ def rebuild_gold(conn):
     FROM clean_submissions c
     LEFT JOIN dim_indicator_registry r
       ON c.indicator_code = r.indicator_code
-    GROUP BY c.report_month, c.indicator_code, c.region, c.gender, c.age_band, r.baseline, r.target;
+    WHERE c.superseded = 0 {where}
+    GROUP BY c.report_month, c.indicator_code, c.region_id, c.gender_id, c.age_band_id, r.baseline, r.target
+"""
+
+NATIONAL_COLUMNS = [
+    "report_month",
+    "indicator_code",
+    "indicator_name",
+    "actual_value",
+    "baseline",
+    "target",
+    "progress_to_target",
+]
+
+# National rollup of the gold mart (behind vw_indicator_summary_national / _trend_national)
+NATIONAL_SELECT = """
+    SELECT
+      g.report_month,
+      g.indicator_code,
+      r.indicator_name,
+      SUM(g.actual_value) AS actual_value,
+      MAX(g.baseline) AS baseline,
+      MAX(g.target) AS target,
+      CASE WHEN MAX(g.target) IS NULL OR MAX(g.target)=0 THEN NULL
+           ELSE ROUND(SUM(g.actual_value) * 1.0 / MAX(g.target), 4)
+      END AS progress_to_target
+    FROM gold_indicator_mart g
+    JOIN dim_indicator_registry r
+      ON g.indicator_code = r.indicator_code
+    {where}
+    GROUP BY g.report_month, g.indicator_code, r.indicator_name
+"""
+
+# Month-scoped statements issued by the load; scripts/check_query_plans.py keeps them off full scans
+CLEAR_MONTH_SQL = [
+    "DELETE FROM raw_submissions WHERE report_month = ?;",
+    "DELETE FROM clean_submissions WHERE report_month = ?;",
+    "DELETE FROM dq_exceptions WHERE report_month = ?;",
+    "DELETE FROM ingest_files WHERE report_month = ?;",
+]
+DROP_FILE_ROWS_SQL = [
+    "DELETE FROM raw_submissions WHERE source_file = ? AND loaded_at = ?;",
+    "DELETE FROM clean_submissions WHERE source_file = ? AND loaded_at = ?;",
+]
+# Single-file loads (refresh_files): a file's rows are those of its month folder and name
+CLEAR_FILE_SQL = [
+    "DELETE FROM raw_submissions WHERE report_month = ? AND source_file = ?;",
+    "DELETE FROM clean_submissions WHERE report_month = ? AND source_file = ?;",
+    "DELETE FROM dq_exceptions WHERE report_month = ? AND source_file = ?;",
+]
+FORGET_FILE_SQL = "DELETE FROM ingest_files WHERE report_month = ? AND source_file = ?;"
+INGEST_FILES_SQL = "SELECT report_month, source_file, sha256, size_bytes, mtime_ns FROM ingest_files;"
+RECORD_FILE_SQL = """
+    INSERT INTO ingest_files (report_month, source_file, sha256, size_bytes, mtime_ns, loaded_at, error)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (report_month, source_file) DO UPDATE
+    SET sha256 = excluded.sha256, size_bytes = excluded.size_bytes, mtime_ns = excluded.mtime_ns,
+        loaded_at = excluded.loaded_at, error = excluded.error
+"""
+FILE_STAT_SQL = "UPDATE ingest_files SET size_bytes = ?, mtime_ns = ? WHERE report_month = ? AND source_file = ?;"
+MONTHS_FOR_INDICATORS_SQL = "SELECT DISTINCT report_month FROM clean_submissions WHERE indicator_code IN ({placeholders});"
+GOLD_MONTHS_SQL = "SELECT DISTINCT report_month FROM gold_indicator_mart;"
+GOLD_DELETE_MONTHS_SQL = "DELETE FROM gold_indicator_mart WHERE report_month IN ({placeholders});"
+GOLD_INSERT_MONTHS_SQL = (
+    f"INSERT INTO gold_indicator_mart ({', '.join(GOLD_COLUMNS)}) "
+    + GOLD_SELECT.format(where="AND c.report_month IN ({placeholders})")
+)
+NATIONAL_DELETE_MONTHS_SQL = "DELETE FROM gold_indicator_national WHERE report_month IN ({placeholders});"
+NATIONAL_INSERT_MONTHS_SQL = (
+    f"INSERT INTO gold_indicator_national ({', '.join(NATIONAL_COLUMNS)}) "
+    + NATIONAL_SELECT.format(where="WHERE g.report_month IN ({placeholders})")
+)
+
+MAX_EXCEPTION_ID_SQL = "SELECT MAX(id) FROM dq_exceptions;"
+EXCEPTIONS_REPORT_SQL = f"SELECT {', '.join(EXCEPTION_COLUMNS)} FROM dq_exceptions WHERE id BETWEEN ? AND ? ORDER BY id;"
+EXCEPTIONS_MONTH_REPORT_SQL = f"SELECT {', '.join(EXCEPTION_COLUMNS)} FROM dq_exceptions WHERE report_month = ? ORDER BY id;"
+
+# version is what incremental exports compare against; refreshed_at is informational
+TOUCH_PARTITION_SQL = """
+    INSERT INTO partition_state (report_month, version, refreshed_at) VALUES (?, 1, ?)
+    ON CONFLICT (report_month) DO UPDATE
+    SET version = partition_state.version + 1, refreshed_at = excluded.refreshed_at
+"""
+
+def months_for_indicators(conn, codes: set[str]) -> set[str]:
+    if not codes:
+        return set()
+    placeholders = ",".join("?" * len(codes))
+    rows = execute(conn, MONTHS_FOR_INDICATORS_SQL.format(placeholders=placeholders), sorted(codes)).fetchall()
+    return {r[0] for r in rows}
+
+def rebuild_gold(conn, months: set[str] | None = None):
     """
-    conn.execute(query)
-    conn.commit()
+    Rebuild gold_indicator_mart from clean + registry, then its national rollup
+    gold_indicator_national from gold + registry.
 
-def run_month(report_month: str):
-    loaded_at = datetime.utcnow().isoformat(timespec="seconds")
-    valid_codes = read_registry_codes()
-    
+    months=None clears and re-aggregates both tables. Otherwise only the given
+    report_month partitions are deleted and re-aggregated.
+    """
+    with transaction(conn):
+        if months is None:
+            execute(conn, "DELETE FROM gold_indicator_mart;")
+            execute(conn, f"INSERT INTO gold_indicator_mart ({', '.join(GOLD_COLUMNS)}) {GOLD_SELECT.format(where='')}")
+            execute(conn, "DELETE FROM gold_indicator_national;")
+            execute(
+                conn,
+                f"INSERT INTO gold_indicator_national ({', '.join(NATIONAL_COLUMNS)}) {NATIONAL_SELECT.format(where='')}",
+            )
+        elif months:
+            params = sorted(months)
+            placeholders = ",".join("?" * len(params))
+            execute(conn, GOLD_DELETE_MONTHS_SQL.format(placeholders=placeholders), params)
+            execute(conn, GOLD_INSERT_MONTHS_SQL.format(placeholders=placeholders), params)
+            execute(conn, NATIONAL_DELETE_MONTHS_SQL.format(placeholders=placeholders), params)
+            execute(conn, NATIONAL_INSERT_MONTHS_SQL.format(placeholders=placeholders), params)
+
+def touch_partitions(conn, months: set[str], refreshed_at: str):
+    """Record that these report_month partitions changed. Does not commit."""
+    for m in sorted(months):
+        execute(conn, TOUCH_PARTITION_SQL, (m, refreshed_at))
 
+def gold_mismatch_count(conn) -> int:
+    # rows present on only one side of (stored table) vs (full re-aggregation), summed over
+    # the mart and its national rollup; 0 means identical
+    total = 0
+    for table, columns, select in [
+        ("gold_indicator_mart", GOLD_COLUMNS, GOLD_SELECT),
+        ("gold_indicator_national", NATIONAL_COLUMNS, NATIONAL_SELECT),
+    ]:
+        cols = ", ".join(columns)
+        full = select.format(where="")
+        query = f"""
+        SELECT
+          (SELECT COUNT(*) FROM (SELECT {cols} FROM {table} EXCEPT {full}) AS only_stored)
+          + (SELECT COUNT(*) FROM ({full} EXCEPT SELECT {cols} FROM {table}) AS only_rebuilt)
+        """
+        total += int(execute(conn, query).fetchone()[0])
+    return total
+
+@dataclass
+class MonthStats:
+    report_month: str
+    files_read: int = 0
+    files_failed: int = 0
+    files_cached: int = 0
+    raw_rows: int = 0
+    clean_rows: int = 0  # clean rows in use, net of the duplicates superseded and restored
+    exceptions: int = 0
+    duplicates: int = 0  # clean rows superseded for a natural key loaded again (DUPLICATE_POLICY)
+    anomalies: int = 0  # monthly totals flagged against their history (src/anomalies.py)
+    load_seconds: float = 0.0  # read + standardize + validate + DB append
+    exceptions_report: Path | None = None
+    # dq_exceptions ids written by this load; the report job reads them back
+    exception_ids: tuple[int, int] | None = None
+
+
+def _clear_month(conn, report_month: str):
+    # clear month data to make reruns idempotent
+    for sql in CLEAR_MONTH_SQL:
+        execute(conn, sql, (report_month,))
+
+
+def _record_file(conn, report_month: str, name: str, sig: FileSignature, loaded_at: str, error: str | None = None):
+    execute(conn, RECORD_FILE_SQL, (report_month, name, sig.sha256, sig.size_bytes, sig.mtime_ns, loaded_at, error))
+
+
+def _load_month(
+    conn,
+    report_month: str,
+    registry,
+    loaded_at: str,
+    workers: int,
+    cache: IngestCache | None,
+    run: RunLog,
+) -> tuple[MonthStats, set[str]]:
+    """
+    Ingest a month's files and append each file (or CSV chunk) to the DB as soon as it is
+    ready, so memory is bounded by the largest file/chunk rather than the month. Returns
+    the stats and the report months seen in the clean rows.
+
+    Runs as one transaction: the month's old raw/clean/exception rows are swapped for the
+    new ones atomically, so readers never see a half-loaded or empty month.
+    """
     files = list_submission_files(report_month)
-    if not files:
-        raise FileNotFoundError(f"No submissions found in {Path(settings.raw_submissions_dir)/report_month}")
+    # taken before reading, so a file replaced mid-load is seen as changed afterwards
+    signatures = {f: file_signature(f) for f in files}
+    stats = MonthStats(report_month)
+    months_seen: set[str] = set()
+    loaded_paths: set[Path] = set()
+    cached_paths: set[Path] = set()
+    rows_by_path: dict[Path, tuple[int, int]] = {}
+    failed = []
+
+    def add_exceptions(exc_df: pd.DataFrame):
+        if exc_df.empty:
+            return
+        bulk_insert(conn, "dq_exceptions", exc_df)
+        stats.exceptions += len(exc_df)
+
+    with transaction(conn):
+        _clear_month(conn, report_month)
+        dims = DimensionKeys(conn)
+        # ids only grow (AUTOINCREMENT / sequence), so this load's exceptions are the ids after it
+        first_exception_id = (execute(conn, MAX_EXCEPTION_ID_SQL).fetchone()[0] or 0) + 1
+        ingest = iter_ingest(files, set(registry.codes), loaded_at, workers=workers, cache=cache, profiling=run.profiling)
+        for r in ingest:
+            run.add(r.stages, report_month=report_month)
+            if not r.ok:
+                print(f"WARNING: skipped {r.path.name} ({r.error})")
+                failed.append(r)
+                if r.path in loaded_paths:
+                    # a streamed file failed part-way: drop the chunks already appended
+                    for sql in DROP_FILE_ROWS_SQL:
+                        execute(conn, sql, (r.path.name, loaded_at))
+                    raw_rows, clean_rows = rows_by_path.pop(r.path)
+                    stats.raw_rows -= raw_rows
+                    stats.clean_rows -= clean_rows
+                continue
+
+            with run.stage("db_append", report_month=report_month, file=r.path.name, chunk=r.chunk) as rec:
+                bulk_insert(conn, "raw_submissions", dims.encode(r.raw))
+                bulk_insert(conn, "clean_submissions", dims.encode(r.clean.assign(natural_key=natural_keys(r.clean))))
+                add_exceptions(r.exceptions)
+                rec.rows_in, rec.rows_out, rec.exceptions = len(r.raw), len(r.clean), len(r.exceptions)
+
+            stats.raw_rows += len(r.raw)
+            stats.clean_rows += len(r.clean)
+            prev = rows_by_path.get(r.path, (0, 0))
+            rows_by_path[r.path] = (prev[0] + len(r.raw), prev[1] + len(r.clean))
+            months_seen |= set(r.clean["report_month"].dropna().astype(str))
+            loaded_paths.add(r.path)
+            if r.cached:
+                cached_paths.add(r.path)
+
+        failed_paths = {r.path for r in failed}
+        if not loaded_paths - failed_paths:
+            # rolls back, leaving the previously loaded month in place
+            raise RuntimeError(f"None of the {len(files)} submission files for {report_month} could be ingested")
+        with run.stage("resolve_duplicates", report_month=report_month) as rec:
+            resolved = resolve_duplicates(conn, {report_month} | months_seen)
+            rec.rows_out, rec.exceptions = resolved.superseded, len(resolved.exceptions)
+        stats.duplicates = resolved.superseded
+        stats.clean_rows += resolved.restored - resolved.superseded
+        add_exceptions(resolved.exceptions)
+        with run.stage("anomalies", report_month=report_month) as rec:
+            groups = refresh_value_stats(conn, {report_month} | months_seen)
+            flagged = anomaly_exceptions(groups, report_month)
+            rec.rows_in, rec.exceptions = len(groups), len(flagged)
+        stats.anomalies = len(flagged)
+        add_exceptions(flagged)
+        with run.stage("timeliness", report_month=report_month) as rec:
+            rec.rows_out = refresh_timeliness(conn, {report_month} | months_seen)
+        if failed:
+            add_exceptions(file_error_exceptions(failed, report_month))
+        errors = {r.path: r.error for r in failed}
+        for f in files:
+            _record_file(conn, report_month, f.name, signatures[f], loaded_at, errors.get(f))
+        last_exception_id = execute(conn, MAX_EXCEPTION_ID_SQL).fetchone()[0] or 0
+
+    stats.files_read = len(loaded_paths - failed_paths)
+    stats.files_failed = len(failed_paths)
+    stats.files_cached = len(cached_paths)
+    stats.exceptions_report = exceptions_report_path(report_month)
+    stats.exception_ids = (first_exception_id, last_exception_id)
+    return stats, months_seen
+
+
+def exceptions_report_path(report_month: str) -> Path:
+    return Path(settings.output_exceptions_dir) / f"exceptions_{report_month}.csv"
+
+
+def write_exceptions_report(
+    report_month: str,
+    first_id: int | None = None,
+    last_id: int | None = None,
+    rows: int | None = None,
+) -> Path | None:
+    """
+    Write exceptions_<month>.csv from the dq_exceptions rows a month load inserted (ids
+    first_id..last_id). Returns None, leaving the current file alone, if those rows are no
+    longer all there because the month has been reloaded since; that load queued its own report.
+
+    Without an id range (after single-file loads, which leave the month's rows scattered
+    across ids) the report is every exception whose report_month is the month.
+    """
+    out_path = exceptions_report_path(report_month)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(f"{out_path.name}.tmp{os.getpid()}")
+    pd.DataFrame(columns=EXCEPTION_COLUMNS).to_csv(tmp_path, index=False)
+    written = 0
+    conn = connect()
+    if first_id is None:
+        query, params = EXCEPTIONS_MONTH_REPORT_SQL, (report_month,)
+    else:
+        query, params = EXCEPTIONS_REPORT_SQL, (first_id, last_id)
+    try:
+        if rows != 0:
+            for chunk in read_sql_chunks(conn, query, params):
+                chunk.to_csv(tmp_path, mode="a", header=False, index=False)
+                written += len(chunk)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    finally:
+        conn.close()
+
+    if rows is not None and written != rows:
+        tmp_path.unlink(missing_ok=True)
+        return None
+    os.replace(tmp_path, out_path)
+    return out_path
+
+
+def _report_payload(stats: MonthStats) -> dict:
+    if stats.exception_ids is None:
+        return {"report_month": stats.report_month}
+    first_id, last_id = stats.exception_ids
+    return {"report_month": stats.report_month, "first_id": first_id, "last_id": last_id, "rows": stats.exceptions}
+
+
+def enqueue_post_load_jobs(
+    stats: list[MonthStats],
+    brief_scopes: list[str],
+    brief_workers: int,
+    export: bool = False,
+) -> list[int]:
+    """Queue the work that follows a committed load; returns the job ids."""
+    queue = connect_queue()
+    try:
+        ids = [
+            enqueue(
+                queue,
+                "exceptions_report",
+                _report_payload(s),
+                # a newer load of the month replaces a report still waiting to be written
+                dedup_key=f"exceptions_report:{s.report_month}",
+            )
+            for s in stats
+        ]
+        months = [s.report_month for s in stats]
+        ids.append(enqueue(queue, "briefs", {"months": months, "scopes": list(brief_scopes), "workers": brief_workers}))
+        if export:
+            ids.append(enqueue(queue, "powerbi_export", {"out_dir": settings.powerbi_export_dir}))
+    finally:
+        queue.close()
+    return ids
+
+
+def run_months(
+    months: list[str],
+    full_rebuild: bool = False,
+    verify_gold: bool = False,
+    workers: int | None = None,
+    use_cache: bool | None = None,
+    brief_workers: int | None = None,
+    brief_scopes: list[str] | None = None,
+    export: bool = False,
+    wait_for_jobs: bool = True,
+    job_workers: int | None = None,
+    profile_stages: list[str] | None = None,
+) -> list[MonthStats]:
+    """
+    Ingest and load several report months through one registry load and one connection,
+    then rebuild the gold mart once.
+
+    Exceptions reports, briefs (national, or per brief_scopes) and, with export=True, the
+    incremental Power BI export are queued as jobs once the data is committed (src/jobs.py).
+    With wait_for_jobs the queue is then drained here; a failed job is reported but does
+    not fail the refresh.
+
+    Every stage is timed per file and per month into a JSON run log under OUTPUT_LOGS_DIR
+    and a pipeline_runs row; stages named in profile_stages (or "all") also get a cProfile dump.
+    """
+    missing = [m for m in months if not list_submission_files(m)]
+    if missing:
+        raise FileNotFoundError(
+            f"No submissions found in {', '.join(str(Path(settings.raw_submissions_dir) / m) for m in missing)}"
+        )
+
+    run = RunLog(months, frozenset(settings.profile_stages if profile_stages is None else profile_stages))
+    all_stats: list[MonthStats] = []
+    try:
+        _refresh(
+            run,
+            all_stats,
+            months,
+            full_rebuild=full_rebuild,
+            verify_gold=verify_gold,
+            workers=workers,
+            use_cache=use_cache,
+            brief_workers=brief_workers,
+            brief_scopes=brief_scopes,
+            export=export,
+            wait_for_jobs=wait_for_jobs,
+            job_workers=job_workers,
+        )
+    except BaseException as exc:
+        run.finish("failed", [asdict(s) for s in all_stats], error=f"{type(exc).__name__}: {exc}")
+        raise
+    log_path = run.finish("ok", [asdict(s) for s in all_stats])
 
-    all_raw = []
-    all_clean = []
-    all_exceptions = []
+    if len(all_stats) > 1:
+        summary = pd.DataFrame([asdict(s) for s in all_stats]).drop(columns=["exceptions_report", "exception_ids"])
+        print(summary.round(2).to_string(index=False))
+    print("Stage seconds: " + ", ".join(f"{k} {v:.2f}" for k, v in run.stage_seconds().items()))
+    print(f"Run log: {log_path}")
+    return all_stats
 
-    for f in files:
-        df = read_submission(f)
-        std = standardize_submission(df, f)
-        std["loaded_at"] = loaded_at
 
-        # validate
-        res = validate(std, valid_codes)
+def _refresh(
+    run: RunLog,
+    all_stats: list[MonthStats],
+    months: list[str],
+    full_rebuild: bool,
+    verify_gold: bool,
+    workers: int | None,
+    use_cache: bool | None,
+    brief_workers: int | None,
+    brief_scopes: list[str] | None,
+    export: bool,
+    wait_for_jobs: bool,
+    job_workers: int | None,
+):
+    loaded_at = datetime.utcnow().isoformat(timespec="seconds")
+    with run.stage("load_registry") as rec:
+        registry = load_registry()
+        rec.rows_out = len(registry.frame)
+    workers = settings.ingest_workers if workers is None else workers
+    brief_workers = settings.brief_workers if brief_workers is None else brief_workers
+    brief_scopes = settings.brief_scopes if brief_scopes is None else brief_scopes
 
-        all_raw.append(std)
-        all_clean.append(res.clean)
-        if not res.exceptions.empty:
-            all_exceptions.append(res.exceptions)
+    use_cache = settings.ingest_cache_enabled if use_cache is None else use_cache
+    cache = None
+    if use_cache:
+        cache = IngestCache(settings.ingest_cache_dir, registry.sha256, load_normalization().sha256)
 
-    raw_df = pd.concat(all_raw, ignore_index=True)
-    clean_df = pd.concat(all_clean, ignore_index=True)
-    exc_df = pd.concat(all_exceptions, ignore_index=True) if all_exceptions else pd.DataFrame(
-        columns=["report_month","team","indicator_code","field","issue","severity","source_file","row_ref","created_at"]
-    )
+    gold_months: set[str] = set()
 
     # persist to DB
-    conn = sqlite_connect()
+    conn = connect()
+    try:
+        tune_for_bulk_load(conn)
+
+        for report_month in months:
+            with run.stage("load_month", report_month=report_month) as rec:
+                stats, months_seen = _load_month(conn, report_month, registry, loaded_at, workers, cache, run)
+                rec.rows_in, rec.rows_out, rec.exceptions = stats.raw_rows, stats.clean_rows, stats.exceptions
+            stats.load_seconds = rec.seconds
+
+            # the month itself and any other months its rows were reported against
+            gold_months |= {report_month} | months_seen
+            all_stats.append(stats)
+
+            print(f"Month processed: {report_month}")
+            print(f"Files read: {stats.files_read} of {stats.files_read + stats.files_failed} ({stats.files_cached} from ingest cache)")
+            print(f"Raw rows loaded: {stats.raw_rows}")
+            print(f"Clean rows loaded: {stats.clean_rows}")
+            print(f"Duplicates superseded: {stats.duplicates}")
+            print(f"Anomalies flagged: {stats.anomalies}")
+            print(f"Exceptions logged: {stats.exceptions}")
+
+        if cache is not None:
+            with run.stage("cache_evict"):
+                cache.evict(settings.ingest_cache_max_age_days, settings.ingest_cache_max_mb * 1024 * 1024)
+
+        _update_gold(conn, run, registry, gold_months, loaded_at, full_rebuild, verify_gold)
+    finally:
+        conn.close()
+
+    _post_load_jobs(run, all_stats, brief_scopes, brief_workers, export, wait_for_jobs, job_workers)
+
+
+def _update_gold(conn, run: RunLog, registry, gold_months: set[str], loaded_at: str, full_rebuild: bool, verify_gold: bool):
+    # registry sync and gold rebuild commit together, so a registry change can't be
+    # recorded without the gold months it affects being rebuilt
+    with run.stage("gold_rebuild") as rec, transaction(conn):
+        changed_codes = sync_registry(conn, registry)
+        if full_rebuild or changed_codes is None:
+            rebuild_gold(conn)
+            touched = gold_months | {r[0] for r in execute(conn, GOLD_MONTHS_SQL).fetchall()}
+        else:
+            # plus every month touched by a registry name/baseline/target change
+            touched = gold_months | months_for_indicators(conn, changed_codes)
+            rebuild_gold(conn, touched)
+        touch_partitions(conn, touched, loaded_at)
+    print(f"Gold mart rebuilt in {rec.seconds:.2f}s")
+
+    if verify_gold:
+        with run.stage("verify_gold"):
+            mismatches = gold_mismatch_count(conn)
+        if mismatches:
+            raise RuntimeError(f"Gold mart differs from a full rebuild ({mismatches} mismatched rows)")
+        print("Gold mart verified against full rebuild")
+
+
+def _post_load_jobs(
+    run: RunLog,
+    all_stats: list[MonthStats],
+    brief_scopes: list[str],
+    brief_workers: int,
+    export: bool,
+    wait_for_jobs: bool,
+    job_workers: int | None,
+):
+    with run.stage("post_load_jobs") as rec:
+        job_ids = enqueue_post_load_jobs(all_stats, brief_scopes, brief_workers, export=export)
+        if wait_for_jobs:
+            work(job_workers)
+    if wait_for_jobs:
+        print(f"Post-load jobs finished in {rec.seconds:.2f}s")
+        _print_jobs(job_ids)
+    else:
+        print(f"Queued {len(job_ids)} post-load jobs; run them with: python src/jobs.py work")
+
+
+def _print_jobs(job_ids: list[int]):
+    queue = connect_queue()
+    try:
+        jobs = job_rows(queue, job_ids)
+    finally:
+        queue.close()
+    for job in jobs.itertuples():
+        if job.status != "done":
+            print(f"WARNING: {job.kind} job {job.id} {job.status} (see: python src/jobs.py status)")
+            continue
+        result = json.loads(job.result)
+        if job.kind == "exceptions_report":
+            print(f"Exceptions report: {result['path']}" if "path" in result else "Exceptions report: superseded by a newer load")
+        elif job.kind == "briefs":
+            for path in result["national"]:
+                print(f"Monthly brief: {path}")
+            print(f"Briefs rendered: {result['rendered']}, unchanged: {result['unchanged']}")
+        else:
+            print(f"Power BI partitions written: {result['written']} ({result['rows']} rows), unchanged: {result['skipped']}")
+
+
+def run_month(
+    report_month: str,
+    full_rebuild: bool = False,
+    verify_gold: bool = False,
+    workers: int | None = None,
+    use_cache: bool | None = None,
+) -> MonthStats:
+    return run_months(
+        [report_month],
+        full_rebuild=full_rebuild,
+        verify_gold=verify_gold,
+        workers=workers,
+        use_cache=use_cache,
+    )[0]
+
+
+def rebuild_gold_months(months: list[str] | None = None, verify_gold: bool = False) -> set[str]:
+    """
+    Re-aggregate gold from what is already in clean_submissions, nothing is re-ingested: the
+    given months (plus any a registry change affects), or the whole mart for months=None.
+    Those months' anomaly baselines (indicator_value_stats) and team_timeliness rows are
+    recomputed too, without flagging anything again. Returns the months whose partitions
+    were refreshed.
+    """
+    registry = load_registry()
+    refreshed_at = datetime.utcnow().isoformat(timespec="seconds")
+    conn = connect()
+    try:
+        with transaction(conn):
+            changed_codes = sync_registry(conn, registry)
+            if months is None or changed_codes is None:
+                rebuild_gold(conn)
+                touched = set(months or ()) | {r[0] for r in execute(conn, GOLD_MONTHS_SQL).fetchall()}
+            else:
+                touched = set(months) | months_for_indicators(conn, changed_codes)
+                rebuild_gold(conn, touched)
+            refresh_value_stats(conn, touched)
+            refresh_timeliness(conn, touched)
+            touch_partitions(conn, touched, refreshed_at)
+        if verify_gold:
+            mismatches = gold_mismatch_count(conn)
+            if mismatches:
+                raise RuntimeError(f"Gold mart differs from a full rebuild ({mismatches} mismatched rows)")
+    finally:
+        conn.close()
+    return touched
+
+
+def _load_file(conn, path: Path, sig: FileSignature, registry, loaded_at: str, run: RunLog, stats: MonthStats) -> set[str]:
+    """
+    Swap one submission file's rows (same month folder and file name) for a fresh ingest of
+    it, in one transaction, adding its counts to the month's stats. A file that can't be
+    ingested is left with no rows and a file error exception, as in a month load. Returns
+    the report months seen in its clean rows.
+    """
+    report_month = stats.report_month
+    months_seen: set[str] = set()
+    raw_rows = clean_rows = exceptions = 0
+    error = None
+    with transaction(conn):
+        for sql in CLEAR_FILE_SQL:
+            execute(conn, sql, (report_month, path.name))
+        dims = DimensionKeys(conn)
+        for r in iter_ingest([path], set(registry.codes), loaded_at, profiling=run.profiling):
+            run.add(r.stages, report_month=report_month)
+            if not r.ok:
+                error = r.error
+                break
+            with run.stage("db_append", report_month=report_month, file=path.name, chunk=r.chunk) as rec:
+                bulk_insert(conn, "raw_submissions", dims.encode(r.raw))
+                bulk_insert(conn, "clean_submissions", dims.encode(r.clean.assign(natural_key=natural_keys(r.clean))))
+                bulk_insert(conn, "dq_exceptions", r.exceptions)
+                rec.rows_in, rec.rows_out, rec.exceptions = len(r.raw), len(r.clean), len(r.exceptions)
+            raw_rows += len(r.raw)
+            clean_rows += len(r.clean)
+            exceptions += len(r.exceptions)
+            months_seen |= set(r.clean["report_month"].dropna().astype(str))
+
+        if error is not None:
+            print(f"WARNING: skipped {path.name} ({error})")
+            # a streamed file can fail part-way: drop the chunks already appended
+            for sql in CLEAR_FILE_SQL:
+                execute(conn, sql, (report_month, path.name))
+            raw_rows = clean_rows = 0
+            months_seen = set()
+            exceptions = bulk_insert(conn, "dq_exceptions", file_error_exceptions([FileResult(path, error=error)], report_month))
+        # also when it failed: rows its old content superseded are back in use
+        with run.stage("resolve_duplicates", report_month=report_month, file=path.name) as rec:
+            resolved = resolve_duplicates(conn, {report_month} | months_seen)
+            rec.rows_out, rec.exceptions = resolved.superseded, len(resolved.exceptions)
+        stats.duplicates += resolved.superseded
+        clean_rows += resolved.restored - resolved.superseded
+        exceptions += bulk_insert(conn, "dq_exceptions", resolved.exceptions)
+        with run.stage("anomalies", report_month=report_month, file=path.name) as rec:
+            groups = refresh_value_stats(conn, {report_month} | months_seen)
+            rec.rows_in = len(groups)
+            if error is None:
+                flagged = anomaly_exceptions(groups, report_month, source_file=path.name)
+                rec.exceptions = len(flagged)
+                stats.anomalies += len(flagged)
+                exceptions += bulk_insert(conn, "dq_exceptions", flagged)
+        with run.stage("timeliness", report_month=report_month, file=path.name) as rec:
+            rec.rows_out = refresh_timeliness(conn, {report_month} | months_seen)
+        _record_file(conn, report_month, path.name, sig, loaded_at, error)
+
+    stats.files_read += error is None
+    stats.files_failed += error is not None
+    stats.raw_rows += raw_rows
+    stats.clean_rows += clean_rows
+    stats.exceptions += exceptions
+    return months_seen
+
+
+def remove_file(conn, report_month: str, name: str) -> Resolution:
+    """
+    Delete a submission file's rows (month folder and file name) and forget it, putting
+    back in use the duplicates its rows had superseded. Inserts the month's new duplicate
+    warnings and refreshes its anomaly totals and timeliness; gold is left to the caller.
+    Does not commit.
+    """
+    for sql in CLEAR_FILE_SQL:
+        execute(conn, sql, (report_month, name))
+    execute(conn, FORGET_FILE_SQL, (report_month, name))
+    resolved = resolve_duplicates(conn, {report_month})
+    bulk_insert(conn, "dq_exceptions", resolved.exceptions)
+    refresh_value_stats(conn, {report_month})
+    refresh_timeliness(conn, {report_month})
+    return resolved
+
+
+def refresh_files(
+    changed: list[Path],
+    removed: list[tuple[str, str]] | None = None,
+    brief_workers: int | None = None,
+    brief_scopes: list[str] | None = None,
+    export: bool = False,
+    wait_for_jobs: bool = True,
+    job_workers: int | None = None,
+) -> list[MonthStats]:
+    """
+    Load individual submission files instead of whole months (src/watch.py).
+
+    `changed` are files under RAW_SUBMISSIONS_DIR/YYYY-MM/. Each one whose content differs
+    from what ingest_files recorded replaces its own rows, in its own transaction; `removed`
+    are (month folder, file name) pairs of files gone from disk, whose rows are deleted.
+    Then only the gold partitions of the months touched are re-aggregated, and those
+    months' exceptions reports and briefs are queued, as in run_months. Returns per-month
+    stats, or an empty list when nothing had actually changed.
+    """
+    conn = connect()
     try:
-        load_registry(conn)
+        known = {(r[0], r[1]): r[2] for r in execute(conn, INGEST_FILES_SQL).fetchall()}
+        to_load = []
+        for path in changed:
+            key = (path.parent.name, path.name)
+            try:
+                sig = file_signature(path)
+            except FileNotFoundError:
+                continue  # gone again; a later scan reports it as removed
+            if known.get(key) == sig.sha256:
+                # touched, or copied over with identical content: only the recorded stat moves
+                with transaction(conn):
+                    execute(conn, FILE_STAT_SQL, (sig.size_bytes, sig.mtime_ns, *key))
+                continue
+            to_load.append((path, sig))
+        removed = [key for key in removed or [] if key in known]
+    finally:
+        conn.close()
+    if not to_load and not removed:
+        return []
 
-        # clear month data to make reruns idempotent
-        conn.execute("DELETE FROM raw_submissions WHERE report_month = ?;", (report_month,))
-        conn.execute("DELETE FROM clean_submissions WHERE report_month = ?;", (report_month,))
-        conn.execute("DELETE FROM dq_exceptions WHERE report_month = ?;", (report_month,))
-        conn.commit()
+    months = sorted({p.parent.name for p, _ in to_load} | {m for m, _ in removed})
+    run = RunLog(months)
+    all_stats: list[MonthStats] = []
+    try:
+        _refresh_files(
+            run,
+            all_stats,
+            to_load,
+            removed,
+            brief_workers=settings.brief_workers if brief_workers is None else brief_workers,
+            brief_scopes=settings.brief_scopes if brief_scopes is None else brief_scopes,
+            export=export,
+            wait_for_jobs=wait_for_jobs,
+            job_workers=job_workers,
+        )
+    except BaseException as exc:
+        run.finish("failed", [asdict(s) for s in all_stats], error=f"{type(exc).__name__}: {exc}")
+        raise
+    log_path = run.finish("ok", [asdict(s) for s in all_stats])
+    print("Stage seconds: " + ", ".join(f"{k} {v:.2f}" for k, v in run.stage_seconds().items()))
+    print(f"Run log: {log_path}")
+    return all_stats
 
-        append_df(conn, "raw_submissions", raw_df)
-        append_df(conn, "clean_submissions", clean_df)
-        if not exc_df.empty:
-            append_df(conn, "dq_exceptions", exc_df)
 
-        rebuild_gold(conn)
+def _refresh_files(
+    run: RunLog,
+    all_stats: list[MonthStats],
+    to_load: list[tuple[Path, FileSignature]],
+    removed: list[tuple[str, str]],
+    brief_workers: int,
+    brief_scopes: list[str],
+    export: bool,
+    wait_for_jobs: bool,
+    job_workers: int | None,
+):
+    loaded_at = datetime.utcnow().isoformat(timespec="seconds")
+    with run.stage("load_registry") as rec:
+        registry = load_registry()
+        rec.rows_out = len(registry.frame)
+
+    by_month: dict[str, MonthStats] = {}
+    gold_months: set[str] = set()
+    conn = connect()
+    try:
+        tune_for_bulk_load(conn)
+        for path, sig in to_load:
+            stats = by_month.setdefault(path.parent.name, MonthStats(path.parent.name))
+            before = (stats.raw_rows, stats.clean_rows, stats.exceptions)
+            failed_before = stats.files_failed
+            with run.stage("load_file", report_month=stats.report_month, file=path.name) as rec:
+                months_seen = _load_file(conn, path, sig, registry, loaded_at, run, stats)
+                rec.rows_in, rec.rows_out, rec.exceptions = (
+                    after - b for after, b in zip((stats.raw_rows, stats.clean_rows, stats.exceptions), before)
+                )
+            stats.load_seconds += rec.seconds
+            gold_months |= {stats.report_month} | months_seen
+            if stats.files_failed > failed_before:
+                print(f"File failed: {stats.report_month}/{path.name} (logged as an exceptions error)")
+            else:
+                print(
+                    f"File loaded: {stats.report_month}/{path.name} "
+                    f"({rec.rows_in} raw rows, {rec.rows_out} clean, {rec.exceptions} exceptions)"
+                )
+
+        for report_month, name in removed:
+            stats = by_month.setdefault(report_month, MonthStats(report_month))
+            with run.stage("remove_file", report_month=report_month, file=name) as rec, transaction(conn):
+                resolved = remove_file(conn, report_month, name)
+                rec.rows_out, rec.exceptions = resolved.restored, len(resolved.exceptions)
+            stats.clean_rows += resolved.restored - resolved.superseded
+            stats.exceptions += len(resolved.exceptions)
+            gold_months.add(report_month)
+            print(f"File removed: {report_month}/{name} ({resolved.restored} superseded rows back in use)")
+
+        for m in sorted(by_month):
+            by_month[m].exceptions_report = exceptions_report_path(m)
+            all_stats.append(by_month[m])
+        _update_gold(conn, run, registry, gold_months, loaded_at, full_rebuild=False, verify_gold=False)
     finally:
         conn.close()
 
-    # Write exceptions report to file
-    out_dir = Path(settings.output_exceptions_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
-    out_path = out_dir / f"exceptions_{report_month}.csv"
-    exc_df.to_csv(out_path, index=False)
-    print(f"Month processed: {report_month}")
-    print(f"Files read: {len(files)}")
-    print(f"Raw rows loaded: {len(raw_df)}")
-    print(f"Clean rows loaded: {len(clean_df)}")
-    print(f"Exceptions logged: {len(exc_df)}")
-    print(f"Exceptions report: {out_path}")
-
-    brief_path = generate_monthly_brief(report_month)
-    print(f"Monthly brief: {brief_path}")
+    _post_load_jobs(run, all_stats, brief_scopes, brief_workers, export, wait_for_jobs, job_workers)
 
 if __name__ == "__main__":
+    # kept for existing scripts; same as `python -m src.cli ingest ...`
     import sys
-    month = sys.argv[1] if len(sys.argv) > 1 else settings.report_month
-    run_month(month)
+
+    from src.cli import main
+
+    sys.exit(main(["ingest", *sys.argv[1:]]))
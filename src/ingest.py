@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional
+
+import pandas as pd
+
+from src.config import settings
+from src.ingest_cache import IngestCache
+from src.instrument import Profiling, StageRecord, measure
+from src.io_inputs import iter_submission_chunks, read_submission
+from src.standardize import standardize_submission
+from src.validate import EXCEPTION_COLUMNS, SeenKeys, validate
+
+
+@dataclass
+class FileResult:
+    path: Path
+    raw: Optional[pd.DataFrame] = None
+    clean: Optional[pd.DataFrame] = None
+    exceptions: Optional[pd.DataFrame] = None
+    error: Optional[str] = None
+    cached: bool = False
+    chunk: Optional[int] = None  # chunk number when the file was streamed
+    stages: list[StageRecord] = field(default_factory=list)  # read / standardize / validate timings
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _standardize_validate(
+    df: pd.DataFrame,
+    path: Path,
+    valid_codes: set[str],
+    loaded_at: str,
+    stages: list[StageRecord],
+    profiling: Optional[Profiling],
+    seen_keys: Optional[SeenKeys] = None,
+    chunk: Optional[int] = None,
+):
+    with measure("standardize", profiling, file=path.name, chunk=chunk, rows_in=len(df)) as rec:
+        std = standardize_submission(df, path)
+        std["loaded_at"] = loaded_at
+        rec.rows_out = len(std)
+    stages.append(rec)
+    with measure("validate", profiling, file=path.name, chunk=chunk, rows_in=len(std)) as rec:
+        res = validate(std, valid_codes, seen_keys=seen_keys)
+        rec.rows_out = len(res.clean)
+        rec.exceptions = len(res.exceptions)
+    stages.append(rec)
+    return std, res
+
+
+def ingest_file(
+    path: Path,
+    valid_codes: set[str],
+    loaded_at: str,
+    profiling: Optional[Profiling] = None,
+) -> FileResult:
+    """Read -> standardize -> validate one submission file. Never raises: failures land in .error."""
+    stages: list[StageRecord] = []
+    try:
+        with measure("read", profiling, file=path.name) as rec:
+            df = read_submission(path)
+            rec.rows_out = len(df)
+        stages.append(rec)
+        std, res = _standardize_validate(df, path, valid_codes, loaded_at, stages, profiling)
+    except Exception as exc:  # isolate one bad workbook from the rest of the batch
+        return FileResult(path, error=f"{type(exc).__name__}: {exc}", stages=stages)
+    return FileResult(path, raw=std, clean=res.clean, exceptions=res.exceptions, stages=stages)
+
+
+def _collect(path: Path, fut: Future) -> FileResult:
+    try:
+        return fut.result()
+    except Exception as exc:  # worker died (e.g. BrokenProcessPool) before returning
+        return FileResult(path, error=f"{type(exc).__name__}: {exc}")
+
+
+def stream_file(
+    path: Path,
+    valid_codes: set[str],
+    loaded_at: str,
+    chunksize: int,
+    profiling: Optional[Profiling] = None,
+) -> Iterator[FileResult]:
+    """
+    Read -> standardize -> validate a CSV in chunks of `chunksize` rows, yielding one result
+    per chunk. Duplicate detection carries across chunks. If a chunk fails, a final error
+    result is yielded and streaming stops.
+    """
+    seen = SeenKeys()
+    stages: list[StageRecord] = []
+    try:
+        chunks = iter_submission_chunks(path, chunksize)
+        i = 0
+        while True:
+            stages = []
+            # reading happens as the next chunk is pulled, so that is what gets timed
+            with measure("read", profiling, file=path.name, chunk=i) as rec:
+                df = next(chunks, None)
+                rec.rows_out = 0 if df is None else len(df)
+            if df is None:
+                break
+            stages.append(rec)
+            std, res = _standardize_validate(df, path, valid_codes, loaded_at, stages, profiling, seen, chunk=i)
+            yield FileResult(path, raw=std, clean=res.clean, exceptions=res.exceptions, chunk=i, stages=stages)
+            i += 1
+    except Exception as exc:
+        yield FileResult(path, error=f"{type(exc).__name__}: {exc}", stages=stages)
+
+
+def should_stream(path: Path) -> bool:
+    return (
+        settings.csv_chunk_rows > 0
+        and path.suffix.lower() == ".csv"
+        and path.stat().st_size >= settings.stream_csv_min_mb * 1024 * 1024
+    )
+
+
+def _set_source_file(df: pd.DataFrame, name: str) -> None:
+    dtype = "category" if isinstance(df["source_file"].dtype, pd.CategoricalDtype) else object
+    df["source_file"] = pd.Series(name, index=df.index, dtype=dtype)
+
+
+def iter_ingest(
+    files: list[Path],
+    valid_codes: set[str],
+    loaded_at: str,
+    workers: int = 1,
+    cache: Optional[IngestCache] = None,
+    profiling: Optional[Profiling] = None,
+) -> Iterator[FileResult]:
+    """
+    Yield ingest results in the order of `files`, so the caller can load each one and let
+    it go instead of holding the whole month in memory.
+
+    Large CSVs (see should_stream) are streamed chunk by chunk in this process and bypass
+    the cache. Other files are served from the cache when unchanged, otherwise parsed,
+    across a process pool when workers > 1.
+    """
+    streamed = {f for f in files if should_stream(f)}
+    keys = {f: cache.key_for(f) for f in files if f not in streamed} if cache is not None else {}
+    to_parse = []
+    for f in files:
+        if f in streamed or (f in keys and cache.contains(keys[f])):
+            continue
+        to_parse.append(f)
+
+    pool = None
+    futures: dict[Path, Future] = {}
+    if workers > 1 and len(to_parse) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(workers, len(to_parse)))
+        futures = {f: pool.submit(ingest_file, f, valid_codes, loaded_at, profiling) for f in to_parse}
+
+    try:
+        for f in files:
+            if f in streamed:
+                yield from stream_file(f, valid_codes, loaded_at, settings.csv_chunk_rows, profiling)
+                continue
+
+            hit = None
+            if f in keys and f not in to_parse:
+                with measure("cache_read", profiling, file=f.name) as rec:
+                    hit = cache.get(keys[f])
+                    rec.rows_out = None if hit is None else len(hit.clean)
+            if hit is not None:
+                # loaded_at belongs to this run, not the one that filled the cache; the key is
+                # the content only, so the entry may have been filled from a copy under another name
+                hit.raw["loaded_at"] = loaded_at
+                hit.clean["loaded_at"] = loaded_at
+                for df in (hit.raw, hit.clean, hit.exceptions):
+                    _set_source_file(df, f.name)
+                yield FileResult(f, raw=hit.raw, clean=hit.clean, exceptions=hit.exceptions, cached=True, stages=[rec])
+                continue
+
+            if f in futures:
+                r = _collect(f, futures.pop(f))
+            else:
+                r = ingest_file(f, valid_codes, loaded_at, profiling)
+            if r.ok and cache is not None:
+                cache.put(keys[f], f, r.raw, r.clean, r.exceptions)
+            yield r
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+
+def file_error_exceptions(results: list[FileResult], report_month: str) -> pd.DataFrame:
+    # one error row per file that could not be ingested, so it shows up in the exceptions report
+    created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    rows = [
+        {
+            "report_month": report_month,
+            "team": None,
+            "indicator_code": None,
+            "field": "file",
+            "issue": f"Submission file could not be ingested: {r.error}",
+            "severity": "error",
+            "source_file": r.path.name,
+            "row_ref": None,
+            "created_at": created_at,
+        }
+        for r in results
+        if not r.ok
+    ]
+    return pd.DataFrame(rows, columns=EXCEPTION_COLUMNS)
@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import time
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from src.utils import file_sha256, parquet_available
+
+# Bump when standardize/validate change what they produce for the same input file,
+# so entries written by older code are never served.
+CACHE_FORMAT_VERSION = "5"
+
+_PARTS = ("raw", "clean", "exceptions")
+
+
+@dataclass
+class CachedFile:
+    raw: pd.DataFrame
+    clean: pd.DataFrame
+    exceptions: pd.DataFrame
+
+
+class IngestCache:
+    """
+    Standardized + validated output of each submission file, keyed by file content hash,
+    registry version and normalization config version. One directory per entry holding a frame per part (Parquet when
+    pyarrow is installed, pickle otherwise) plus a small meta.json.
+    """
+
+    def __init__(self, root: str | Path, registry_version: str, normalization_version: str = ""):
+        self.root = Path(root)
+        self.registry_version = registry_version
+        self.normalization_version = normalization_version
+        self.ext = "parquet" if parquet_available() else "pkl"
+
+    def key_for(self, path: Path) -> str:
+        parts = [CACHE_FORMAT_VERSION, self.ext, self.registry_version, self.normalization_version, file_sha256(path)]
+        return sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _read(self, p: Path) -> pd.DataFrame:
+        return pd.read_parquet(p) if self.ext == "parquet" else pd.read_pickle(p)
+
+    def _write(self, df: pd.DataFrame, p: Path) -> None:
+        if self.ext == "parquet":
+            df.to_parquet(p)
+        else:
+            df.to_pickle(p)
+
+    def contains(self, key: str) -> bool:
+        return (self._entry(key) / "meta.json").exists()
+
+    def get(self, key: str) -> Optional[CachedFile]:
+        entry = self._entry(key)
+        meta = entry / "meta.json"
+        if not meta.exists():
+            return None
+        try:
+            frames = {part: self._read(entry / f"{part}.{self.ext}") for part in _PARTS}
+        except Exception:
+            # unreadable/partial entry: drop it and fall back to a fresh parse
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+        os.utime(meta)  # last-access time drives eviction
+        return CachedFile(**frames)
+
+    def put(self, key: str, source: Path, raw: pd.DataFrame, clean: pd.DataFrame, exceptions: pd.DataFrame) -> bool:
+        entry = self._entry(key)
+        tmp = entry.with_name(f"{key}.tmp{os.getpid()}")
+        try:
+            tmp.mkdir(parents=True, exist_ok=True)
+            for part, df in zip(_PARTS, (raw, clean, exceptions)):
+                self._write(df, tmp / f"{part}.{self.ext}")
+            (tmp / "meta.json").write_text(
+                json.dumps(
+                    {
+                        "source_file": str(source),
+                        "registry_version": self.registry_version,
+                        "normalization_version": self.normalization_version,
+                    }
+                ),
+                encoding="utf-8",
+            )
+            if entry.exists():
+                shutil.rmtree(entry)
+            os.replace(tmp, entry)
+        except Exception:
+            # e.g. a mixed-type column Parquet can't represent; the file is simply re-parsed next time
+            shutil.rmtree(tmp, ignore_errors=True)
+            return False
+        return True
+
+    def evict(self, max_age_days: float, max_bytes: int) -> int:
+        """Drop entries not used for max_age_days, then least recently used ones until under max_bytes."""
+        if not self.root.exists():
+            return 0
+        entries = []
+        for meta in self.root.glob("*/*/meta.json"):
+            entry = meta.parent
+            size = sum(p.stat().st_size for p in entry.iterdir())
+            entries.append((meta.stat().st_mtime, size, entry))
+        entries.sort()
+
+        cutoff = time.time() - max_age_days * 86400
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for accessed, size, entry in entries:
+            if accessed >= cutoff and total <= max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
@@ -0,0 +1,193 @@
+from __future__ import annotations
+
+import cProfile
+import json
+import os
+import re
+import sys
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+from src.config import settings
+
+PIPELINE_RUN_COLUMNS = [
+    "run_id",
+    "started_at",
+    "finished_at",
+    "status",
+    "months",
+    "seconds",
+    "raw_rows",
+    "clean_rows",
+    "exceptions",
+    "peak_rss_mb",
+    "stage_seconds",
+    "log_path",
+    "error",
+]
+
+
+def peak_rss_mb() -> Optional[float]:
+    """High-water mark of this process's resident memory, or None where it can't be read."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        try:
+            import psutil
+        except ImportError:
+            return None
+        info = psutil.Process().memory_info()
+        return round(getattr(info, "peak_wset", info.rss) / 2**20, 1)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return round(peak / (2**20 if sys.platform == "darwin" else 2**10), 1)
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    report_month: Optional[str] = None
+    file: Optional[str] = None
+    chunk: Optional[int] = None
+    seconds: float = 0.0
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    exceptions: Optional[int] = None
+    peak_rss_mb: Optional[float] = None  # of the process that ran the stage, at its end
+
+
+@dataclass(frozen=True)
+class Profiling:
+    """Which stages get a cProfile dump, and where. Picklable, so ingest workers can use it too."""
+
+    stages: frozenset[str]
+    out_dir: str
+    prefix: str
+
+    def path_for(self, rec: StageRecord) -> Optional[Path]:
+        if rec.stage not in self.stages and "all" not in self.stages:
+            return None
+        parts = [self.prefix, rec.stage, rec.report_month, rec.file, None if rec.chunk is None else str(rec.chunk)]
+        name = "_".join(re.sub(r"[^\w.-]+", "-", p) for p in parts if p)
+        return Path(self.out_dir) / f"{name}.prof"
+
+
+@contextmanager
+def measure(stage: str, profiling: Optional[Profiling] = None, **fields: Any) -> Iterator[StageRecord]:
+    """Time the block (and profile it if requested); the caller fills in row counts on the record."""
+    rec = StageRecord(stage, **fields)
+    prof_path = profiling.path_for(rec) if profiling is not None else None
+    prof = cProfile.Profile() if prof_path is not None else None
+    started = time.perf_counter()
+    if prof is not None:
+        prof.enable()
+    try:
+        yield rec
+    finally:
+        if prof is not None:
+            prof.disable()
+            prof_path.parent.mkdir(parents=True, exist_ok=True)
+            prof.dump_stats(prof_path)
+        rec.seconds = round(time.perf_counter() - started, 4)
+        rec.peak_rss_mb = peak_rss_mb()
+
+
+@dataclass
+class RunLog:
+    """
+    Stage records of one pipeline run. finish() writes them as a JSON run log to
+    settings.output_logs_dir and a summary row to pipeline_runs.
+    """
+
+    months: list[str]
+    profile_stages: frozenset[str] = frozenset()
+    run_id: str = ""
+    started_at: str = ""
+    records: list[StageRecord] = field(default_factory=list)
+
+    def __post_init__(self):
+        now = datetime.utcnow()
+        self.started_at = self.started_at or now.isoformat(timespec="seconds")
+        self.run_id = self.run_id or f"{now:%Y%m%dT%H%M%S}-{os.getpid()}"
+        self._t0 = time.perf_counter()
+
+    @property
+    def profiling(self) -> Optional[Profiling]:
+        if not self.profile_stages:
+            return None
+        return Profiling(self.profile_stages, str(Path(settings.output_logs_dir) / "profiles"), self.run_id)
+
+    @contextmanager
+    def stage(self, name: str, **fields: Any) -> Iterator[StageRecord]:
+        # recorded up front, so a stage that raises still shows in a failed run's log
+        with measure(name, self.profiling, **fields) as rec:
+            self.records.append(rec)
+            yield rec
+
+    def add(self, records: list[StageRecord], **fields: Any) -> None:
+        # records measured elsewhere (ingest workers), labelled with e.g. the report month
+        for rec in records:
+            for k, v in fields.items():
+                setattr(rec, k, v)
+            self.records.append(rec)
+
+    def stage_seconds(self) -> dict[str, float]:
+        totals: dict[str, float] = {}
+        for rec in self.records:
+            totals[rec.stage] = round(totals.get(rec.stage, 0.0) + rec.seconds, 4)
+        return totals
+
+    def finish(self, status: str, months_stats: list[dict], error: Optional[str] = None) -> Path:
+        """Write the run log and the pipeline_runs row; a failure to record never masks the run's outcome."""
+        out_dir = Path(settings.output_logs_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        log_path = out_dir / f"run_{self.run_id}.json"
+        peaks = [r.peak_rss_mb for r in self.records if r.peak_rss_mb is not None]
+        row = {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "finished_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "status": status,
+            "months": ",".join(self.months),
+            "seconds": round(time.perf_counter() - self._t0, 3),
+            "raw_rows": sum(m["raw_rows"] for m in months_stats),
+            "clean_rows": sum(m["clean_rows"] for m in months_stats),
+            "exceptions": sum(m["exceptions"] for m in months_stats),
+            "peak_rss_mb": max(peaks) if peaks else None,
+            "stage_seconds": json.dumps(self.stage_seconds()),
+            "log_path": str(log_path),
+            "error": error,
+        }
+        log = {
+            **row,
+            "stage_seconds": self.stage_seconds(),
+            "db_type": settings.db_type,
+            "month_stats": months_stats,
+            "stages": [asdict(r) for r in self.records],
+        }
+        log_path.write_text(json.dumps(log, indent=2, default=str), encoding="utf-8")
+        _record_run(row)
+        return log_path
+
+
+def _record_run(row: dict) -> None:
+    from src.db import connect, execute, transaction
+
+    placeholders = ", ".join("?" * len(PIPELINE_RUN_COLUMNS))
+    sql = f"INSERT INTO pipeline_runs ({', '.join(PIPELINE_RUN_COLUMNS)}) VALUES ({placeholders});"
+    try:
+        conn = connect()
+        try:
+            with transaction(conn):
+                execute(conn, sql, [row[c] for c in PIPELINE_RUN_COLUMNS])
+        finally:
+            conn.close()
+    except Exception as exc:
+        print(
+            f"WARNING: run not recorded in pipeline_runs ({type(exc).__name__}: {exc}); "
+            "existing databases need `python scripts/init_db.py 08_pipeline_runs.sql`"
+        )
@@ -1,6 +1,18 @@
+from __future__ import annotations
+
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Iterator
+
 import pandas as pd
 from src.config import settings
+from src.standardize import load_normalization
+
+# Only headers standardize_submission can use (a standard column or a configured alias) are
+# read; every other column is skipped. Dtypes are left to inference: forcing str on the text
+# columns measured slower for workbooks and no faster for CSV (scripts/benchmark_excel_read.py).
+
+EXCEL_ENGINES = ("calamine", "openpyxl")
 
 
 def list_submission_files(report_month: str) -> list[Path]:
@@ -10,8 +22,53 @@ def list_submission_files(report_month: str) -> list[Path]:
     return sorted(files)
 
 
+def _needed(column) -> bool:
+    return load_normalization().column(column) is not None
+
+
+@lru_cache(maxsize=None)
+def excel_engine(preference: str | None = None) -> str:
+    """
+    EXCEL_ENGINE: "auto" (default) picks calamine when python-calamine is installed, it parses
+    workbooks several times faster than openpyxl; "calamine" or "openpyxl" force one.
+    """
+    preference = (preference or settings.excel_engine).lower()
+    if preference == "auto":
+        try:
+            import python_calamine  # noqa: F401
+        except ImportError:
+            return "openpyxl"
+        return "calamine"
+    if preference not in EXCEL_ENGINES:
+        raise ValueError(f"Unknown EXCEL_ENGINE {preference!r} (expected auto or one of: {', '.join(EXCEL_ENGINES)})")
+    return preference
+
+
+def read_submission_xlsx(path: Path, engine: str | None = None) -> pd.DataFrame:
+    # the "submission" sheet, as created by the sample generator and the partner template
+    return pd.read_excel(
+        path,
+        sheet_name="submission",
+        engine=engine or excel_engine(),
+        usecols=_needed,
+    )
+
+
+def read_submission_csv(path: Path) -> pd.DataFrame:
+    return pd.read_csv(path, usecols=_needed)
+
+
+# suffix -> reader; anything else is read as a workbook
+READERS: dict[str, Callable[[Path], pd.DataFrame]] = {
+    ".csv": read_submission_csv,
+    ".xlsx": read_submission_xlsx,
+}
+
+
 def read_submission(path: Path) -> pd.DataFrame:
-    if path.suffix.lower() == ".csv":
-        return pd.read_csv(path)
-    # default: excel
-    return pd.read_excel(path, sheet_name="submission")
\ No newline at end of file
+    return READERS.get(path.suffix.lower(), read_submission_xlsx)(path)
+
+
+def iter_submission_chunks(path: Path, chunksize: int) -> Iterator[pd.DataFrame]:
+    # CSV only; chunk indexes continue across chunks, so row refs match a whole-file read
+    yield from pd.read_csv(path, chunksize=chunksize, usecols=_needed)
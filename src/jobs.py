@@ -0,0 +1,319 @@
+"""
+Local queue of post-load jobs (briefs, exceptions reports, Power BI exports).
+
+The ETL commits the data, enqueues its follow-up work here and is done; workers drain the
+queue with retries, so a slow or failing renderer never holds back the refresh. The queue
+is a small SQLite file (JOB_QUEUE_PATH) whatever the warehouse backend is.
+
+    python src/jobs.py work [--workers N] [--follow]   # drain pending jobs (--follow: keep polling)
+    python src/jobs.py status                          # recent jobs and their state
+    python src/jobs.py retry [ID ...]                  # re-queue failed jobs
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+import pandas as pd
+
+from src.config import settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_queue (
+  id INTEGER PRIMARY KEY AUTOINCREMENT,
+  kind TEXT NOT NULL,
+  dedup_key TEXT NOT NULL,
+  payload TEXT NOT NULL,
+  status TEXT NOT NULL DEFAULT 'pending',  -- pending | running | done | failed
+  attempts INTEGER NOT NULL DEFAULT 0,
+  max_attempts INTEGER NOT NULL,
+  run_after TEXT NOT NULL,
+  lease_until TEXT,
+  worker TEXT,
+  created_at TEXT NOT NULL,
+  finished_at TEXT,
+  result TEXT,
+  error TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_job_queue_status ON job_queue (status, run_after);
+CREATE INDEX IF NOT EXISTS ix_job_queue_dedup ON job_queue (dedup_key, status);
+"""
+
+# pending jobs that are due, and running jobs whose worker died without finishing them
+CLAIMABLE_WHERE = "(status = 'pending' AND run_after <= ?) OR (status = 'running' AND lease_until < ?)"
+
+
+@dataclass
+class Job:
+    id: int
+    kind: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+@dataclass
+class WorkSummary:
+    done: int = 0
+    retried: int = 0
+    failed: int = 0
+
+    def __iadd__(self, other: WorkSummary) -> WorkSummary:
+        self.done += other.done
+        self.retried += other.retried
+        self.failed += other.failed
+        return self
+
+
+def _now(offset_seconds: float = 0.0) -> str:
+    # fixed-width UTC timestamps, so text comparison orders them
+    return (datetime.now(timezone.utc) + timedelta(seconds=offset_seconds)).isoformat(timespec="seconds")
+
+
+def connect_queue(path: str | Path | None = None) -> sqlite3.Connection:
+    p = Path(path or settings.job_queue_path)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    # autocommit; claims take the write lock explicitly with BEGIN IMMEDIATE
+    conn = sqlite3.connect(p, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL;")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# --- handlers: payload -> JSON-serializable result. Imports are local so the queue itself
+# stays light and a worker only loads what its jobs need.
+
+def _run_briefs(payload: dict) -> dict:
+    from src.brief_generate import generate_briefs
+
+    results = generate_briefs(payload["months"], scopes=payload["scopes"], workers=payload["workers"])
+    rendered = sum(r.rendered for r in results)
+    return {
+        "rendered": rendered,
+        "unchanged": len(results) - rendered,
+        "national": [str(r.path) for r in results if r.spec.scope == "national"],
+    }
+
+
+def _run_exceptions_report(payload: dict) -> dict:
+    from src.etl_run import write_exceptions_report
+
+    # no id range: a month touched by single-file loads, reported whole
+    path = write_exceptions_report(
+        payload["report_month"], payload.get("first_id"), payload.get("last_id"), payload.get("rows")
+    )
+    if path is None:
+        return {"superseded": True}
+    return {"path": str(path), "rows": payload.get("rows")}
+
+
+def _run_powerbi_export(payload: dict) -> dict:
+    from src.powerbi_export import export_incremental
+
+    summary = export_incremental(payload["out_dir"], fmt=payload.get("format"))
+    return {"written": summary.written, "skipped": summary.skipped, "removed": summary.removed, "rows": summary.rows}
+
+
+HANDLERS: dict[str, Callable[[dict], Any]] = {
+    "briefs": _run_briefs,
+    "exceptions_report": _run_exceptions_report,
+    "powerbi_export": _run_powerbi_export,
+}
+
+
+def enqueue(
+    conn: sqlite3.Connection,
+    kind: str,
+    payload: dict,
+    dedup_key: str | None = None,
+    max_attempts: int | None = None,
+) -> int:
+    """
+    Queue a job and return its id. A job still pending under the same dedup_key (default:
+    kind + payload) is reused instead, with its payload replaced by this one, so repeated
+    refreshes don't pile up duplicate work.
+    """
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind {kind!r} (expected one of: {', '.join(HANDLERS)})")
+    body = json.dumps(payload, sort_keys=True)
+    dedup_key = dedup_key or f"{kind}:{body}"
+    max_attempts = max_attempts or settings.job_max_attempts
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        row = conn.execute(
+            "SELECT id FROM job_queue WHERE dedup_key = ? AND status = 'pending' ORDER BY id LIMIT 1;",
+            (dedup_key,),
+        ).fetchone()
+        if row:
+            job_id = row[0]
+            conn.execute("UPDATE job_queue SET payload = ?, max_attempts = ? WHERE id = ?;", (body, max_attempts, job_id))
+        else:
+            job_id = conn.execute(
+                "INSERT INTO job_queue (kind, dedup_key, payload, max_attempts, run_after, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?);",
+                (kind, dedup_key, body, max_attempts, _now(), _now()),
+            ).lastrowid
+    except BaseException:
+        conn.execute("ROLLBACK;")
+        raise
+    conn.execute("COMMIT;")
+    return job_id
+
+
+def claim(conn: sqlite3.Connection, worker: str) -> Job | None:
+    """Take the oldest due job for this worker, or None if nothing is due."""
+    now = _now()
+    conn.execute("BEGIN IMMEDIATE;")
+    try:
+        row = conn.execute(
+            f"SELECT id, kind, payload, attempts, max_attempts FROM job_queue WHERE {CLAIMABLE_WHERE} ORDER BY id LIMIT 1;",
+            (now, now),
+        ).fetchone()
+        if row:
+            conn.execute(
+                "UPDATE job_queue SET status = 'running', attempts = attempts + 1, worker = ?, lease_until = ? WHERE id = ?;",
+                (worker, _now(settings.job_lease_seconds), row[0]),
+            )
+    except BaseException:
+        conn.execute("ROLLBACK;")
+        raise
+    conn.execute("COMMIT;")
+    if row is None:
+        return None
+    return Job(row[0], row[1], json.loads(row[2]), row[3] + 1, row[4])
+
+
+def _finish(conn: sqlite3.Connection, job: Job, result: Any = None, error: str | None = None) -> str:
+    if error is None:
+        status, run_after = "done", None
+    elif job.attempts < job.max_attempts:
+        # exponential backoff: retry_seconds, 2x, 4x, ...
+        status, run_after = "pending", _now(settings.job_retry_seconds * 2 ** (job.attempts - 1))
+    else:
+        status, run_after = "failed", None
+    conn.execute(
+        """
+        UPDATE job_queue
+        SET status = ?, run_after = COALESCE(?, run_after), lease_until = NULL,
+            finished_at = ?, result = ?, error = ?
+        WHERE id = ?;
+        """,
+        (status, run_after, _now(), None if result is None else json.dumps(result), error, job.id),
+    )
+    return status
+
+
+def run_job(conn: sqlite3.Connection, job: Job) -> str:
+    """Run one claimed job and record the outcome; returns the job's new status."""
+    try:
+        result = HANDLERS[job.kind](job.payload)
+    except Exception as e:
+        status = _finish(conn, job, error=traceback.format_exc())
+        retry = "retrying" if status == "pending" else "giving up"
+        print(f"WARNING: job {job.id} ({job.kind}) failed, attempt {job.attempts}/{job.max_attempts}, {retry}: {e}")
+        return status
+    return _finish(conn, job, result=result)
+
+
+def _seconds_until_due(conn: sqlite3.Connection) -> float | None:
+    # None when no job is waiting for a retry
+    row = conn.execute("SELECT MIN(run_after) FROM job_queue WHERE status = 'pending';").fetchone()
+    if row[0] is None:
+        return None
+    return max(0.0, (datetime.fromisoformat(row[0]) - datetime.now(timezone.utc)).total_seconds())
+
+
+def _work_loop(worker: str, follow: bool, poll_seconds: float) -> WorkSummary:
+    summary = WorkSummary()
+    conn = connect_queue()
+    try:
+        while True:
+            job = claim(conn, worker)
+            if job is None:
+                wait = _seconds_until_due(conn)
+                if wait is None and not follow:
+                    break
+                time.sleep(poll_seconds if wait is None else min(wait, poll_seconds) or 0.05)
+                continue
+            status = run_job(conn, job)
+            if status == "done":
+                summary.done += 1
+            elif status == "pending":
+                summary.retried += 1
+            else:
+                summary.failed += 1
+    finally:
+        conn.close()
+    return summary
+
+
+def work(workers: int | None = None, follow: bool = False, poll_seconds: float = 2.0) -> WorkSummary:
+    """
+    Drain the queue with `workers` processes, including retries that come due meanwhile.
+    follow=True keeps polling for new jobs instead of returning once the queue is empty.
+    """
+    workers = settings.job_workers if workers is None else workers
+    if workers <= 1:
+        return _work_loop(f"{os.getpid()}-0", follow, poll_seconds)
+    summary = WorkSummary()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_work_loop, f"{os.getpid()}-{i}", follow, poll_seconds) for i in range(workers)]
+        for f in futures:
+            summary += f.result()
+    return summary
+
+
+def job_rows(conn: sqlite3.Connection, ids: list[int] | None = None, limit: int = 20) -> pd.DataFrame:
+    cols = "id, kind, status, attempts, max_attempts, created_at, finished_at, result, error"
+    if ids:
+        query = f"SELECT {cols} FROM job_queue WHERE id IN ({','.join('?' * len(ids))}) ORDER BY id;"
+        return pd.read_sql_query(query, conn, params=list(ids))
+    return pd.read_sql_query(f"SELECT {cols} FROM job_queue ORDER BY id DESC LIMIT ?;", conn, params=(limit,))
+
+
+def retry_failed(conn: sqlite3.Connection, ids: list[int] | None = None) -> int:
+    """Put failed jobs (all, or the given ids) back in the queue with fresh attempts."""
+    query = "UPDATE job_queue SET status = 'pending', attempts = 0, run_after = ?, error = NULL WHERE status = 'failed'"
+    params: list = [_now()]
+    if ids:
+        query += f" AND id IN ({','.join('?' * len(ids))})"
+        params += list(ids)
+    return conn.execute(query + ";", params).rowcount
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_work = sub.add_parser("work", help="drain the queue")
+    p_work.add_argument("--workers", type=int, default=None, help="worker processes (default: JOB_WORKERS)")
+    p_work.add_argument("--follow", action="store_true", help="keep polling for new jobs")
+    p_status = sub.add_parser("status", help="show recent jobs")
+    p_status.add_argument("--limit", type=int, default=20)
+    p_retry = sub.add_parser("retry", help="re-queue failed jobs")
+    p_retry.add_argument("ids", nargs="*", type=int)
+    args = parser.parse_args()
+
+    if args.command == "work":
+        s = work(args.workers, follow=args.follow)
+        print(f"Jobs done: {s.done}, failed: {s.failed}, retries: {s.retried}")
+    else:
+        queue = connect_queue()
+        try:
+            if args.command == "status":
+                rows = job_rows(queue, limit=args.limit)
+                rows["error"] = rows["error"].str.strip().str.split("\n").str[-1]
+                print(rows.drop(columns=["result"]).to_string(index=False) if len(rows) else "No jobs")
+            else:
+                print(f"Re-queued {retry_failed(queue, args.ids)} failed job(s)")
+        finally:
+            queue.close()
@@ -0,0 +1,226 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from hashlib import sha256
+from pathlib import Path
+from typing import Iterable
+
+import pandas as pd
+
+from src.db import connect, execute, read_sql, read_sql_chunks
+from src.utils import parquet_available
+
+MANIFEST_NAME = "_manifest.json"
+# Bump when the partition layout or column typing changes, so old exports are rewritten
+MANIFEST_VERSION = 2
+
+PARTITION_VERSIONS_SQL = "SELECT report_month, version FROM partition_state;"
+REGISTRY_SQL = "SELECT * FROM dim_indicator_registry ORDER BY indicator_code;"
+
+# Column types are fixed up front: a chunk whose nullable column happens to be all NULL
+# must still produce the same Parquet schema as every other chunk.
+_FLOAT_COLUMNS = {"value", "actual_value", "baseline", "target", "progress_to_target"}
+_INT_COLUMNS = {"id", "n", "flagged_rows", "row_count", "days_after_deadline"}
+
+
+@dataclass(frozen=True)
+class Dataset:
+    name: str
+    source: str  # table or view
+    partitioned: bool = True  # by report_month
+    uses_registry: bool = False  # all partitions are re-exported when dim_indicator_registry changes
+
+
+DATASETS = [
+    Dataset("gold_indicator_mart", "vw_gold_indicator_mart"),
+    Dataset("vw_indicator_summary_national", "vw_indicator_summary_national", uses_registry=True),
+    Dataset("vw_indicator_trend_national", "vw_indicator_trend_national", uses_registry=True),
+    Dataset("dq_exceptions", "dq_exceptions"),
+    Dataset("dq_exceptions_monthly", "vw_dq_exceptions_monthly"),
+    Dataset("dim_indicator_registry", "dim_indicator_registry", partitioned=False),
+    Dataset("late_reporting_flags", "vw_late_reporting_flags"),
+]
+
+
+@dataclass
+class ExportSummary:
+    written: int = 0
+    skipped: int = 0
+    removed: int = 0
+    rows: int = 0
+
+
+def partition_sql(ds: Dataset) -> str:
+    return f"SELECT * FROM {ds.source} WHERE report_month = ?;"
+
+
+def _conform(df: pd.DataFrame) -> pd.DataFrame:
+    out = {}
+    for c in df.columns:
+        if c in _FLOAT_COLUMNS:
+            out[c] = pd.to_numeric(df[c], errors="coerce").astype("float64")
+        elif c in _INT_COLUMNS:
+            out[c] = pd.to_numeric(df[c], errors="coerce").astype("Int64")
+        else:
+            out[c] = df[c].astype("string")
+    return pd.DataFrame(out, index=df.index)
+
+
+def _write_chunks(chunks: Iterable[pd.DataFrame], path: Path, fmt: str) -> int:
+    """Write the chunks to path via a temp file swapped into place; no file is left for 0 rows."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.tmp{os.getpid()}")
+    rows = 0
+    writer = None
+    try:
+        for df in chunks:
+            df = _conform(df)
+            if fmt == "parquet":
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, table.schema)
+                writer.write_table(table)
+            else:
+                df.to_csv(tmp, mode="a", header=rows == 0, index=False)
+            rows += len(df)
+        if writer is not None:
+            writer.close()
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        tmp.unlink(missing_ok=True)
+        raise
+
+    if rows == 0:
+        tmp.unlink(missing_ok=True)
+        path.unlink(missing_ok=True)
+        return 0
+    os.replace(tmp, path)
+    return rows
+
+
+def load_manifest(out_dir: Path) -> dict:
+    p = out_dir / MANIFEST_NAME
+    if not p.exists():
+        return {}
+    return json.loads(p.read_text(encoding="utf-8"))
+
+
+def _save_manifest(out_dir: Path, manifest: dict) -> None:
+    p = out_dir / MANIFEST_NAME
+    tmp = p.with_name(f"{p.name}.tmp")
+    tmp.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, p)
+
+
+def export_incremental(
+    out_dir: str | Path,
+    fmt: str | None = None,
+    chunk_rows: int = 50_000,
+    full: bool = False,
+) -> ExportSummary:
+    """
+    Write each dataset as report_month partitions (<dataset>/YYYY-MM/part-0.<ext>), rewriting
+    only partitions whose partition_state version moved since the last export. Files keep their
+    report_month column, so a folder import needs no path parsing.
+
+    fmt is "parquet" (default when pyarrow is installed) or "csv". Changing format, or full=True,
+    rewrites everything. The manifest is saved at the end, so an interrupted export redoes
+    the partitions it had not recorded.
+    """
+    out_dir = Path(out_dir)
+    fmt = fmt or ("parquet" if parquet_available() else "csv")
+    if fmt == "parquet" and not parquet_available():
+        raise RuntimeError("Parquet export needs pyarrow; install it or use the csv format")
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    manifest = load_manifest(out_dir)
+    if full or manifest.get("manifest_version") != MANIFEST_VERSION or manifest.get("format") != fmt:
+        # start over, without leaving files of another format behind
+        for ds in DATASETS:
+            shutil.rmtree(out_dir / ds.name, ignore_errors=True)
+        manifest = {}
+        full = True
+    datasets_state = manifest.setdefault("datasets", {})
+    summary = ExportSummary()
+
+    conn = connect()
+    try:
+        versions = {m: v for m, v in execute(conn, PARTITION_VERSIONS_SQL).fetchall()}
+        registry = read_sql(conn, REGISTRY_SQL)
+        registry_digest = sha256(registry.to_csv(index=False).encode("utf-8")).hexdigest()
+        registry_changed = registry_digest != manifest.get("registry_digest")
+
+        for ds in DATASETS:
+            state = datasets_state.setdefault(ds.name, {})
+            if not ds.partitioned:
+                rel = f"{ds.name}/part-0.{fmt}"
+                if full or registry_changed or not (out_dir / rel).exists():
+                    rows = _write_chunks([registry], out_dir / rel, fmt)
+                    state.update(file=rel if rows else None, rows=rows)
+                    summary.written += 1
+                    summary.rows += rows
+                else:
+                    summary.skipped += 1
+                continue
+
+            parts = state.setdefault("partitions", {})
+            force = full or (ds.uses_registry and registry_changed)
+            for month, version in sorted(versions.items()):
+                done = parts.get(month)
+                if (
+                    not force
+                    and done is not None
+                    and done["version"] == version
+                    and (done["file"] is None or (out_dir / done["file"]).exists())
+                ):
+                    summary.skipped += 1
+                    continue
+                rel = f"{ds.name}/{month}/part-0.{fmt}"
+                rows = _write_chunks(read_sql_chunks(conn, partition_sql(ds), (month,), chunk_rows), out_dir / rel, fmt)
+                parts[month] = {"version": version, "rows": rows, "file": rel if rows else None}
+                summary.written += 1
+                summary.rows += rows
+
+            # months no longer in the warehouse
+            for month in sorted(set(parts) - set(versions)):
+                shutil.rmtree(out_dir / ds.name / month, ignore_errors=True)
+                del parts[month]
+                summary.removed += 1
+    finally:
+        conn.close()
+
+    manifest.update(manifest_version=MANIFEST_VERSION, format=fmt, registry_digest=registry_digest)
+    _save_manifest(out_dir, manifest)
+    return summary
+
+
+def export_flat(out_dir: str | Path, names: Iterable[str] | None = None) -> dict[str, int]:
+    """
+    Write every dataset (or the named ones) as one full-history <name>.csv in out_dir.
+    Returns the rows written per dataset.
+    """
+    by_name = {ds.name: ds for ds in DATASETS}
+    names = list(names or by_name)
+    unknown = [n for n in names if n not in by_name]
+    if unknown:
+        raise ValueError(f"Unknown dataset(s) {', '.join(unknown)} (expected: {', '.join(by_name)})")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    rows = {}
+    conn = connect()
+    try:
+        for name in names:
+            df = read_sql(conn, f"SELECT * FROM {by_name[name].source};")
+            df.to_csv(out_dir / f"{name}.csv", index=False)
+            rows[name] = len(df)
+    finally:
+        conn.close()
+    return rows
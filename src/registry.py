@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from src.config import settings
+from src.db import bulk_insert, execute, read_sql
+from src.utils import file_sha256
+
+REGISTRY_SHEET = "indicator_registry"
+REGISTRY_COLUMNS = [
+    "indicator_code",
+    "indicator_name",
+    "definition",
+    "unit",
+    "disagg_required",
+    "data_source",
+    "baseline",
+    "target",
+    "frequency",
+    "owner",
+]
+NUMERIC_COLUMNS = ["baseline", "target"]
+# columns copied into gold_indicator_mart / gold_indicator_national; a change re-aggregates the code's months
+AGGREGATED_COLUMNS = ["indicator_name", *NUMERIC_COLUMNS]
+
+
+@dataclass(frozen=True)
+class Registry:
+    frame: pd.DataFrame
+    sha256: str
+    codes: frozenset[str]
+    targets: dict[str, Optional[float]]
+    baselines: dict[str, Optional[float]]
+
+
+# resolved path -> (mtime_ns, size, Registry)
+_memo: dict[Path, tuple[int, int, Registry]] = {}
+
+
+def _check_schema(reg: pd.DataFrame, path: Path) -> pd.DataFrame:
+    missing = [c for c in REGISTRY_COLUMNS if c not in reg.columns]
+    if missing:
+        raise ValueError(f"Indicator registry {path} is missing columns: {', '.join(missing)}")
+    reg = reg[REGISTRY_COLUMNS].copy()
+
+    codes = reg["indicator_code"].astype("string").str.strip()
+    if codes.isna().any() or (codes == "").any():
+        raise ValueError(f"Indicator registry {path} has rows without an indicator_code")
+    dupes = sorted(codes[codes.duplicated()].unique())
+    if dupes:
+        raise ValueError(f"Indicator registry {path} has duplicate indicator codes: {', '.join(dupes)}")
+    reg["indicator_code"] = codes.astype(str)
+
+    for c in NUMERIC_COLUMNS:
+        numeric = pd.to_numeric(reg[c], errors="coerce")
+        bad = numeric.isna() & reg[c].notna()
+        if bad.any():
+            raise ValueError(f"Indicator registry {path} has non-numeric {c} for: {', '.join(reg.loc[bad, 'indicator_code'])}")
+        reg[c] = numeric.astype(float)
+    return reg
+
+
+def _as_dict(s: pd.Series) -> dict[str, Optional[float]]:
+    return {k: (None if pd.isna(v) else float(v)) for k, v in s.items()}
+
+
+def _build(reg: pd.DataFrame, sha: str) -> Registry:
+    by_code = reg.set_index("indicator_code")
+    return Registry(
+        frame=reg,
+        sha256=sha,
+        codes=frozenset(by_code.index),
+        targets=_as_dict(by_code["target"]),
+        baselines=_as_dict(by_code["baseline"]),
+    )
+
+
+def load_registry(path: str | Path | None = None) -> Registry:
+    """
+    Parse and schema-check the indicator registry workbook, once per content version.
+
+    Memoized on file mtime/size; when those change the file is re-hashed and only
+    re-parsed if its content actually differs.
+    """
+    path = Path(path or settings.indicator_registry_path).resolve()
+    st = path.stat()
+    cached = _memo.get(path)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+
+    sha = file_sha256(path)
+    if cached and cached[2].sha256 == sha:
+        registry = cached[2]
+    else:
+        reg = pd.read_excel(path, sheet_name=REGISTRY_SHEET)
+        registry = _build(_check_schema(reg, path), sha)
+    _memo[path] = (st.st_mtime_ns, st.st_size, registry)
+    return registry
+
+
+def _normalized(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[REGISTRY_COLUMNS].copy()
+    for c in REGISTRY_COLUMNS:
+        if c in NUMERIC_COLUMNS:
+            df[c] = pd.to_numeric(df[c], errors="coerce").astype(float)
+        else:
+            df[c] = df[c].map(lambda v: None if pd.isna(v) else str(v))
+    return df.sort_values("indicator_code").reset_index(drop=True)
+
+
+def _changed_codes(previous: pd.DataFrame, current: pd.DataFrame) -> set[str]:
+    # codes added, removed, or whose name/baseline/target differ between registry versions
+    merged = previous.merge(current, on="indicator_code", how="outer", suffixes=("_old", "_new"), indicator=True)
+    changed = merged["_merge"] != "both"
+    for col in AGGREGATED_COLUMNS:
+        old, new = merged[f"{col}_old"], merged[f"{col}_new"]
+        changed |= ~((old == new) | (old.isna() & new.isna()))
+    return set(merged.loc[changed, "indicator_code"].tolist())
+
+
+def sync_registry(conn, registry: Registry) -> set[str] | None:
+    """
+    Bring dim_indicator_registry in line with the registry, rewriting it only if it differs.
+    Does not commit; run it inside db.transaction().
+
+    Returns the indicator codes whose name/baseline/target changed (empty when nothing did),
+    or None when there was no previous registry to compare against.
+    """
+    previous = read_sql(conn, f"SELECT {', '.join(REGISTRY_COLUMNS)} FROM dim_indicator_registry")
+
+    current = _normalized(registry.frame)
+    if not previous.empty:
+        previous = _normalized(previous)
+        if previous.equals(current):
+            return set()
+
+    execute(conn, "DELETE FROM dim_indicator_registry;")
+    bulk_insert(conn, "dim_indicator_registry", registry.frame)
+    if previous.empty:
+        return None
+    return _changed_codes(previous, current)
@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import json
+from dataclasses import dataclass
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+from src.config import settings
+from src.utils import file_sha256
+
 
 STANDARD_COLS = [
     "report_month",
@@ -16,37 +22,141 @@ STANDARD_COLS = [
 ]
 
 
-COLUMN_ALIASES = {
-    # month field
-    "month": "report_month",
-    "report_month": "report_month",
-    # indicator field
-    "indicator": "indicator_code",
-    "indicator_code": "indicator_code",
-    # value field
-    "reported_value": "value",
-    "value": "value",
-    # age
-    "age_group": "age_band",
-    "age_band": "age_band",
-    # submitted date
-    "submission_date": "submitted_on",
-    "submitted_on": "submitted_on",
-}
+# Low-cardinality columns held as pandas categoricals from here on: one small integer code
+# per row instead of a Python string. team/region/gender/age_band are also stored by key
+# (src/dimensions.py).
+CATEGORICAL_COLS = [
+    "report_month",
+    "team",
+    "indicator_code",
+    "region",
+    "gender",
+    "age_band",
+    "submitted_on",
+    "submitted_date",
+    "source_file",
+]
+
+# columns whose spelling variants the normalization config can map to canonical values
+NORMALIZED_COLS = ["region", "gender", "age_band"]
+
+# date_formats entry for day numbers as Excel stores dates: days since 1899-12-30 (Excel's
+# 1900 leap-year bug included), accepted for 1980-01-01..2099-12-31 so small counts stay invalid
+EXCEL_SERIAL = "excel_serial"
+_EXCEL_EPOCH = "1899-12-30"
+_EXCEL_SERIAL_RANGE = (29221, 73050)
+
+
+def _header_key(name) -> str:
+    # "Report Month", "report_month " and "REPORT_MONTH" are one header
+    return "_".join(str(name).split()).casefold()
+
+
+def _value_key(value: str) -> str:
+    # "North", "NORTH", "North " and "15 - 19" vs "15-19" are one value
+    return "".join(value.split()).casefold()
+
+
+@dataclass(frozen=True)
+class Normalization:
+    """
+    The normalization config (NORMALIZATION_PATH) compiled into lookups: header key -> standard
+    column, and per NORMALIZED_COLS column, value key -> canonical value.
+    """
+
+    sha256: str
+    columns: dict[str, str]
+    values: dict[str, dict[str, str]]
+    date_formats: tuple[str, ...]
+
+    def column(self, header) -> str | None:
+        return self.columns.get(_header_key(header))
+
+    def canonical(self, column: str) -> frozenset[str]:
+        return frozenset(self.values.get(column, {}).values())
+
+
+# resolved path -> (mtime_ns, size, Normalization)
+_memo: dict[Path, tuple[int, int, Normalization]] = {}
+
+
+def _compile(config: dict, sha: str, path: Path) -> Normalization:
+    columns = {_header_key(c): c for c in STANDARD_COLS}
+    for column, aliases in config.get("columns", {}).items():
+        if column not in STANDARD_COLS:
+            raise ValueError(f"Normalization config {path} maps headers to unknown column {column!r}")
+        for alias in aliases:
+            columns[_header_key(alias)] = column
+
+    values = {}
+    for column, canonical in config.get("values", {}).items():
+        if column not in NORMALIZED_COLS:
+            raise ValueError(f"Normalization config {path} has values for {column!r} (expected one of: {', '.join(NORMALIZED_COLS)})")
+        lookup: dict[str, str] = {}
+        for value, variants in canonical.items():
+            for v in [value, *variants]:
+                if lookup.setdefault(_value_key(v), value) != value:
+                    raise ValueError(f"Normalization config {path}: {column} {v!r} maps to both {lookup[_value_key(v)]!r} and {value!r}")
+        values[column] = lookup
+
+    return Normalization(sha, columns, values, tuple(config.get("date_formats", ["%Y-%m-%d"])))
+
+
+def load_normalization(path: str | Path | None = None) -> Normalization:
+    """Read and compile the normalization config, once per content version (memoized as load_registry)."""
+    path = Path(path or settings.normalization_path).resolve()
+    st = path.stat()
+    cached = _memo.get(path)
+    if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+        return cached[2]
+
+    sha = file_sha256(path)
+    if cached and cached[2].sha256 == sha:
+        normalization = cached[2]
+    else:
+        normalization = _compile(json.loads(path.read_text(encoding="utf-8")), sha, path)
+    _memo[path] = (st.st_mtime_ns, st.st_size, normalization)
+    return normalization
+
 
+def _from_categories(cat: pd.Series, mapped: np.ndarray) -> pd.Series:
+    # categorical with each row's category replaced by mapped[code]; missing rows stay missing
+    values = np.append(mapped, None)[cat.cat.codes.to_numpy()]  # code -1 picks the trailing None
+    return pd.Series(values, index=cat.index, dtype="category")
 
-def _normalize_colnames(df: pd.DataFrame) -> pd.DataFrame:
-    df = df.copy()
-    df.columns = [str(c).strip() for c in df.columns]
-    return df
 
+def _map_categories(s: pd.Series, fn) -> pd.Series:
+    """Categorical of fn applied to the distinct values of s (as strings); distinct inputs may map to one output."""
+    cat = s.astype("category")
+    return _from_categories(cat, fn(pd.Series(cat.cat.categories, dtype="string")).to_numpy(dtype=object, na_value=None))
 
-def standardize_submission(df: pd.DataFrame, source_file: Path) -> pd.DataFrame:
-    df = _normalize_colnames(df)
 
-    # rename known aliases
-    rename_map = {c: COLUMN_ALIASES[c] for c in df.columns if c in COLUMN_ALIASES}
-    df = df.rename(columns=rename_map)
+def parse_dates(values: pd.Series, formats: tuple[str, ...]) -> pd.Series:
+    """
+    Dates of string values (datetime64, NaT where nothing fits): each format in turn parses,
+    vectorized, whatever the earlier ones left, so a file may mix e.g. ISO dates and Excel serials.
+    """
+    text = values.astype("string").str.strip()
+    out = pd.Series(pd.NaT, index=text.index, dtype="datetime64[ns]")
+    for fmt in formats:
+        todo = text[out.isna() & text.notna()]
+        if todo.empty:
+            break
+        if fmt == EXCEL_SERIAL:
+            serial = pd.to_numeric(todo, errors="coerce")
+            serial = serial[serial.between(*_EXCEL_SERIAL_RANGE)] // 1  # a fraction is the time of day
+            parsed = pd.to_datetime(serial, unit="D", origin=_EXCEL_EPOCH)
+        else:
+            parsed = pd.to_datetime(todo, format=fmt, errors="coerce")
+        out = out.fillna(parsed)
+    return out
+
+
+def standardize_submission(df: pd.DataFrame, source_file: Path, normalization: Normalization | None = None) -> pd.DataFrame:
+    norm = normalization or load_normalization()
+
+    # rename known headers and aliases
+    df = df.rename(columns={c: norm.column(c) for c in df.columns if norm.column(c)})
 
     # ensure all standard columns exist
     for c in STANDARD_COLS:
@@ -56,18 +166,19 @@ def standardize_submission(df: pd.DataFrame, source_file: Path) -> pd.DataFrame:
     # keep only standard cols (in order)
     df = df[STANDARD_COLS].copy()
 
-    # clean whitespace & normalize region variants
-    df["region"] = df["region"].astype("string").str.strip()
-    df["region"] = df["region"].replace(
-        {
-            "NORTH": "North",
-            "Nrth": "North",
-            "North ": "North",
-        }
-    )
+    # spelling variants -> canonical values, once per distinct value; unmapped values are kept
+    # (stripped) for validation to report
+    for c, lookup in norm.values.items():
+        df[c] = _map_categories(df[c], lambda v: v.map(lambda x: lookup.get(_value_key(x), x.strip())))
 
-    # parse submitted_on (accept YYYY-MM-DD or YYYY/MM/DD)
-    df["submitted_on"] = df["submitted_on"].astype("string").str.replace("/", "-", regex=False)
+    # submitted_date: the date from any of the configured formats, parsed once per distinct
+    # value; submitted_on shows it as YYYY-MM-DD, or keeps an unparsed value (stripped) for
+    # validation to report
+    submitted = df["submitted_on"].astype("category")
+    text = pd.Series(submitted.cat.categories, dtype="string").str.strip()
+    dates = parse_dates(text, norm.date_formats).dt.strftime("%Y-%m-%d")
+    df["submitted_date"] = _from_categories(submitted, dates.to_numpy(dtype=object, na_value=None))
+    df["submitted_on"] = _from_categories(submitted, dates.fillna(text).to_numpy(dtype=object, na_value=None))
 
     # numeric value
     df["value"] = pd.to_numeric(df["value"], errors="coerce")
@@ -75,4 +186,4 @@ def standardize_submission(df: pd.DataFrame, source_file: Path) -> pd.DataFrame:
     # add metadata columns for loading
     df["source_file"] = source_file.name
 
-    return df
\ No newline at end of file
+    return df.astype({c: "category" for c in CATEGORICAL_COLS})
@@ -0,0 +1,70 @@
+"""
+Per-team submission timeliness, in place of counting missing or short submitted_on values in
+the raw rows at read time.
+
+Every raw row carries submitted_date, its submitted_on parsed by one of the configured date
+formats (src/standardize.py). Each load re-aggregates only the months it touched from
+raw_submissions (one GROUP BY over the ix_raw_month_team index) into team_timeliness, one row
+per report month and team: how many rows were dated, the first and last submission date and
+the days from the deadline (day SUBMISSION_DEADLINE_DAY of the following month) to the last
+one. vw_late_reporting_flags and the briefs read that table by report_month.
+"""
+from __future__ import annotations
+
+from datetime import date
+from typing import Any, Iterable
+
+import pandas as pd
+
+from src.config import settings
+from src.db import bulk_insert, execute, read_sql
+
+TIMELINESS_COLUMNS = [
+    "report_month",
+    "team_id",
+    "row_count",
+    "dated_rows",
+    "first_submitted",
+    "last_submitted",
+    "deadline",
+    "days_after_deadline",
+]
+
+TEAM_DATES_SQL = """
+    SELECT report_month, team_id, COUNT(*) AS row_count, COUNT(submitted_date) AS dated_rows,
+           MIN(submitted_date) AS first_submitted, MAX(submitted_date) AS last_submitted
+    FROM raw_submissions
+    WHERE report_month IN ({placeholders})
+    GROUP BY report_month, team_id;
+"""
+DELETE_TIMELINESS_SQL = "DELETE FROM team_timeliness WHERE report_month IN ({placeholders});"
+
+
+def deadline(report_month: str) -> date:
+    """Day SUBMISSION_DEADLINE_DAY of the month after report_month (its last day if shorter)."""
+    due = pd.Period(report_month, freq="M") + 1
+    return date(due.year, due.month, min(settings.submission_deadline_day, due.days_in_month))
+
+
+def _iso(values: pd.Series) -> pd.Series:
+    # DATE columns come back as text from SQLite and as datetime.date from Postgres
+    return pd.to_datetime(values).dt.strftime("%Y-%m-%d")
+
+
+def refresh_timeliness(conn: Any, months: Iterable[str]) -> int:
+    """Replace these months' rows of team_timeliness from raw_submissions; returns the rows written. Does not commit."""
+    months = sorted(set(months))
+    if not months:
+        return 0
+    placeholders = ",".join("?" * len(months))
+
+    teams = read_sql(conn, TEAM_DATES_SQL.format(placeholders=placeholders), months)
+    due = pd.to_datetime(teams["report_month"].map({m: deadline(m) for m in months}))
+    last = pd.to_datetime(teams["last_submitted"])
+    teams["first_submitted"] = _iso(teams["first_submitted"])
+    teams["last_submitted"] = last.dt.strftime("%Y-%m-%d")
+    teams["deadline"] = due.dt.strftime("%Y-%m-%d")
+    teams["days_after_deadline"] = pd.array((last - due).dt.days, dtype="Int64")
+
+    execute(conn, DELETE_TIMELINESS_SQL.format(placeholders=placeholders), months)
+    return bulk_insert(conn, "team_timeliness", teams[TIMELINESS_COLUMNS])
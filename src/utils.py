@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+
+import pandas as pd
+
+
+def file_sha256(path: Path, block_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+@dataclass(frozen=True)
+class FileSignature:
+    sha256: str
+    size_bytes: int
+    mtime_ns: int
+
+
+def file_signature(path: Path) -> FileSignature:
+    # stat first: if the file changes while it is hashed, the next stat differs and it is seen again
+    st = path.stat()
+    return FileSignature(file_sha256(path), st.st_size, st.st_mtime_ns)
+
+
+def parquet_available() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def month_range(start: str, end: str) -> list[str]:
+    """Inclusive list of YYYY-MM months from start to end."""
+    periods = pd.period_range(start=start, end=end, freq="M")
+    if len(periods) == 0:
+        raise ValueError(f"Empty month range: {start} .. {end}")
+    return [str(p) for p in periods]
@@ -2,8 +2,12 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Callable, Iterable, Optional
+import numpy as np
 import pandas as pd
 
+from src.standardize import load_normalization
+
 
 @dataclass
 class ValidationResult:
@@ -11,104 +15,199 @@ class ValidationResult:
     exceptions: pd.DataFrame
 
 
+@dataclass
+class RuleHit:
+    """Rows flagged by one rule: a boolean mask over the frame plus what to log for them."""
+
+    field: str
+    issue: str | pd.Series  # a Series is aligned to the flagged rows (per-row message)
+    severity: str
+    mask: pd.Series
+
+
+class SeenKeys:
+    """
+    Hashed duplicate keys already seen in earlier chunks of the same file.
+
+    Held as one sorted uint64 array (8 bytes per distinct key) so duplicate detection
+    across chunks does not need the earlier chunks themselves.
+    """
+
+    def __init__(self):
+        self._hashes = np.empty(0, dtype=np.uint64)
+
+    def check_and_add(self, hashes: np.ndarray) -> np.ndarray:
+        pos = np.searchsorted(self._hashes, hashes)
+        found = np.zeros(len(hashes), dtype=bool)
+        inside = pos < len(self._hashes)
+        found[inside] = self._hashes[pos[inside]] == hashes[inside]
+        self._hashes = np.union1d(self._hashes, hashes)
+        return found
+
+
+@dataclass
+class RuleContext:
+    valid_indicator_codes: set[str]
+    # canonical values of the normalized columns (region, gender, age_band), from the normalization config
+    valid_values: dict[str, frozenset[str]]
+    seen_keys: Optional[SeenKeys] = None  # set when validating a file chunk by chunk
+
+
 REQUIRED_FIELDS = ["report_month", "team", "indicator_code", "value"]
-VALID_REGIONS = {"North", "South", "East", "West"}
+KEY_COLS = ["report_month", "team", "indicator_code", "region", "gender", "age_band"]
+
+EXCEPTION_COLUMNS = [
+    "report_month",
+    "team",
+    "indicator_code",
+    "field",
+    "issue",
+    "severity",
+    "source_file",
+    "row_ref",
+    "created_at",
+]
+
+# columns copied from the flagged row into the exceptions log
+_ROW_CONTEXT_COLS = ["report_month", "team", "indicator_code", "source_file"]
+
+
+def _per_value(s: pd.Series, fn: Callable[[pd.Series], pd.Series]) -> pd.Series:
+    # a categorical is tested once per category (plus once for missing) and mapped back by code
+    if not isinstance(s.dtype, pd.CategoricalDtype):
+        return fn(s)
+    values = pd.Series([*s.cat.categories, None], dtype=object)
+    hits = fn(values).to_numpy(dtype=bool, na_value=False)
+    return pd.Series(hits[s.cat.codes.to_numpy()], index=s.index)
 
 
-def validate(df: pd.DataFrame, valid_indicator_codes: set[str]) -> ValidationResult:
+def _blank(s: pd.Series) -> pd.Series:
+    return _per_value(s, lambda v: v.isna() | (v.astype("string").str.strip() == ""))
+
+
+def _in(s: pd.Series, allowed: set[str]) -> pd.Series:
+    return _per_value(s, lambda v: v.astype("string").isin(allowed))
+
+
+def key_hashes(df: pd.DataFrame) -> np.ndarray:
     """
-    Rules:
-    - ERROR: missing required fields, non-numeric value, negative value, indicator not in registry
-    - WARNING: missing/invalid region, duplicate records, invalid date format, suspicious outliers
+    uint64 hash of each row's KEY_COLS values (those present). Hashed as text, so a categorical
+    and a plain column hash alike; pandas' fixed hash key keeps it stable across runs.
     """
-    df = df.copy()
-    issues = []
-
-    def now_utc():
-        return datetime.now(timezone.utc).isoformat(timespec="seconds")
-
-    def log_issue(ix, field, issue, severity="error"):
-        issues.append(
-            {
-                "report_month": df.at[ix, "report_month"] if "report_month" in df.columns else None,
-                "team": df.at[ix, "team"] if "team" in df.columns else None,
-                "indicator_code": df.at[ix, "indicator_code"] if "indicator_code" in df.columns else None,
-                "field": field,
-                "issue": issue,
-                "severity": severity,
-                "source_file": df.at[ix, "source_file"] if "source_file" in df.columns else None,
-                "row_ref": str(ix),
-                "created_at": now_utc(),
-            }
-        )
-
-    # 1) Required fields
+    key_cols = [c for c in KEY_COLS if c in df.columns]
+    return pd.util.hash_pandas_object(df[key_cols].astype("string"), index=False).to_numpy()
+
+
+# 1) Required fields
+def rule_required_fields(df: pd.DataFrame, ctx: RuleContext) -> Iterable[RuleHit]:
     for f in REQUIRED_FIELDS:
-        missing = df[f].isna() | (df[f].astype("string").str.strip() == "")
-        for ix in df[missing].index:
-            log_issue(ix, f, "Missing required field", "error")
+        yield RuleHit(f, "Missing required field", "error", _blank(df[f]))
+
 
-    # 2) Indicator must exist in registry
-    bad_indicator = ~df["indicator_code"].astype("string").isin(valid_indicator_codes)
-    for ix in df[bad_indicator].index:
-        log_issue(ix, "indicator_code", "Indicator code not found in registry", "error")
+# 2) Indicator must exist in registry
+def rule_registry_code(df: pd.DataFrame, ctx: RuleContext) -> Iterable[RuleHit]:
+    bad_indicator = ~_in(df["indicator_code"], ctx.valid_indicator_codes)
+    yield RuleHit("indicator_code", "Indicator code not found in registry", "error", bad_indicator)
 
-    # 3) Value rules
-    bad_value = df["value"].isna()
-    for ix in df[bad_value].index:
-        log_issue(ix, "value", "Value is not numeric", "error")
 
-    negative = df["value"].fillna(0) < 0
-    for ix in df[negative].index:
-        log_issue(ix, "value", "Negative values not allowed", "error")
+# 3) Value rules
+def rule_value(df: pd.DataFrame, ctx: RuleContext) -> Iterable[RuleHit]:
+    yield RuleHit("value", "Value is not numeric", "error", df["value"].isna())
+    yield RuleHit("value", "Negative values not allowed", "error", df["value"].fillna(0) < 0)
 
-    # 4) Region quality (warning)
+
+# 4) Region quality, and values the normalization config does not recognise (warning)
+def rule_region(df: pd.DataFrame, ctx: RuleContext) -> Iterable[RuleHit]:
     if "region" in df.columns:
-        missing_region = df["region"].isna() | (df["region"].astype("string").str.strip() == "")
-        for ix in df[missing_region].index:
-            log_issue(ix, "region", "Missing region (disaggregation incomplete)", "warning")
-
-        invalid_region = (~missing_region) & (~df["region"].astype("string").isin(VALID_REGIONS))
-        for ix in df[invalid_region].index:
-            log_issue(ix, "region", f"Invalid region value: {df.at[ix, 'region']}", "warning")
-
-    # 5) Date format check (warning)
-    if "submitted_on" in df.columns:
-        bad_date = df["submitted_on"].isna() | (
-            ~df["submitted_on"].astype("string").str.match(r"^\d{4}-\d{2}-\d{2}$")
-        )
-        for ix in df[bad_date].index:
-            log_issue(ix, "submitted_on", "Invalid date format (expected YYYY-MM-DD)", "warning")
-
-    # 6) Duplicate detection (warning)
-    # duplicates across key dimensions
-    key_cols = ["report_month", "team", "indicator_code", "region", "gender", "age_band"]
-    key_cols = [c for c in key_cols if c in df.columns]
-    if key_cols:
-        dup_mask = df.duplicated(subset=key_cols, keep="first")
-        for ix in df[dup_mask].index:
-            log_issue(ix, "record", f"Duplicate record detected on keys: {', '.join(key_cols)}", "warning")
-
-    # 7) Outlier detection (warning) — simple thresholding
-    # Flag unusually large values relative to team distribution
-    if df["value"].notna().sum() > 10:
-        v = df["value"].dropna()
-        q1, q3 = v.quantile(0.25), v.quantile(0.75)
-        iqr = q3 - q1
-        upper = q3 + 3 * iqr  # lenient
-        outlier_mask = df["value"] > upper
-        for ix in df[outlier_mask].index:
-            log_issue(ix, "value", f"Potential outlier value: {df.at[ix, 'value']} (upper bound ~ {round(float(upper),2)})", "warning")
-
-    exceptions_df = pd.DataFrame(issues)
+        yield RuleHit("region", "Missing region (disaggregation incomplete)", "warning", _blank(df["region"]))
+
+    # reported per row, so each unmapped spelling reaches the exceptions report for triage
+    for col, allowed in ctx.valid_values.items():
+        if col not in df.columns:
+            continue
+        invalid = (~_blank(df[col])) & (~_in(df[col], allowed))
+        issue = f"Invalid {col} value: " + df.loc[invalid, col].astype(str)
+        yield RuleHit(col, issue, "warning", invalid)
+
+
+# 5) Date format check (warning): submitted_date is missing when no configured format fits
+def rule_date_format(df: pd.DataFrame, ctx: RuleContext) -> Iterable[RuleHit]:
+    if "submitted_date" not in df.columns:
+        return
+    yield RuleHit("submitted_on", "Missing or unrecognised submission date", "warning", df["submitted_date"].isna())
+
+
+# 6) Duplicate detection (warning) across key dimensions
+def rule_duplicates(df: pd.DataFrame, ctx: RuleContext) -> Iterable[RuleHit]:
+    key_cols = [c for c in KEY_COLS if c in df.columns]
+    if not key_cols:
+        return
+    dup_mask = df.duplicated(subset=key_cols, keep="first")
+    if ctx.seen_keys is not None:
+        # keys from earlier chunks count as "first" occurrences too
+        dup_mask |= ctx.seen_keys.check_and_add(key_hashes(df))
+    yield RuleHit("record", f"Duplicate record detected on keys: {', '.join(key_cols)}", "warning", dup_mask)
+
+
+# Evaluated in order; the exceptions log keeps this rule order, then row order within a rule.
+RULES: list[Callable[[pd.DataFrame, RuleContext], Iterable[RuleHit]]] = [
+    rule_required_fields,
+    rule_registry_code,
+    rule_value,
+    rule_region,
+    rule_date_format,
+    rule_duplicates,
+]
+
+
+def _hit_frame(df: pd.DataFrame, hit: RuleHit, mask: pd.Series, created_at: str) -> pd.DataFrame:
+    flagged = df.loc[mask]
+    out = pd.DataFrame(index=flagged.index)
+    for c in _ROW_CONTEXT_COLS:
+        out[c] = flagged[c] if c in df.columns else None
+    out["field"] = hit.field
+    out["issue"] = hit.issue
+    out["severity"] = hit.severity
+    out["row_ref"] = flagged.index.astype(str)
+    out["created_at"] = created_at
+    return out[EXCEPTION_COLUMNS]
+
+
+def validate(
+    df: pd.DataFrame,
+    valid_indicator_codes: set[str],
+    seen_keys: Optional[SeenKeys] = None,
+) -> ValidationResult:
+    """
+    Rules:
+    - ERROR: missing required fields, non-numeric value, negative value, indicator not in registry
+    - WARNING: missing region, region/gender/age band value not in the normalization config,
+      duplicate records, invalid date format
 
-    # Reject rows that have ANY error
-    error_rows = (
-        set(exceptions_df.loc[exceptions_df["severity"] == "error", "row_ref"].astype(str).tolist())
-        if not exceptions_df.empty
-        else set()
+    Pass the same SeenKeys to every chunk of a file so duplicates are detected across chunks.
+    Unusual values are checked against history once loaded (src/anomalies.py), not per file.
+    """
+    df = df.copy()
+    norm = load_normalization()
+    ctx = RuleContext(valid_indicator_codes, {c: norm.canonical(c) for c in norm.values}, seen_keys)
+    created_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    frames = []
+    reject_mask = pd.Series(False, index=df.index)
+    for rule in RULES:
+        for hit in rule(df, ctx):
+            mask = hit.mask.fillna(False).astype(bool)
+            if not mask.any():
+                continue
+            frames.append(_hit_frame(df, hit, mask, created_at))
+            if hit.severity == "error":
+                reject_mask |= mask
+
+    exceptions_df = (
+        pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=EXCEPTION_COLUMNS)
     )
-    reject_mask = df.index.astype(str).isin(error_rows)
+
+    # Reject rows that have ANY error
     clean_df = df.loc[~reject_mask].copy()
 
-    return ValidationResult(clean=clean_df, exceptions=exceptions_df)
\ No newline at end of file
+    return ValidationResult(clean=clean_df, exceptions=exceptions_df)
@@ -0,0 +1,173 @@
+"""
+Watch RAW_SUBMISSIONS_DIR and load submission files as they arrive, instead of waiting for
+the month-end batch.
+
+    python src/watch.py                     # scan every WATCH_POLL_SECONDS until stopped
+    python src/watch.py --once              # load whatever changed since the last load, then exit
+
+A new or changed file in a YYYY-MM folder is loaded once its size and modification time have
+held still for WATCH_DEBOUNCE_SECONDS, so a workbook still being copied or saved is not read.
+Only that file goes through read -> standardize -> validate -> load, then the gold partitions
+of the months it touched are re-aggregated and their exceptions report and briefs queued
+(etl_run.refresh_files). A file deleted from its folder has its rows removed. What was loaded
+is tracked in the ingest_files table, so a restart picks up where it left off. Existing
+databases need `python scripts/init_db.py 09_ingest_files.sql` once, then a batch run of the
+months already loaded so their files are recorded.
+
+Scanning polls the folder rather than relying on OS file events, which network shares and
+synced folders don't deliver reliably.
+"""
+from __future__ import annotations
+
+import re
+import time
+from pathlib import Path
+from typing import Optional
+
+from src.config import settings
+from src.db import connect, execute
+from src.etl_run import INGEST_FILES_SQL, MonthStats, refresh_files
+
+MONTH_DIR = re.compile(r"\d{4}-\d{2}")
+SUBMISSION_SUFFIXES = {".xlsx", ".csv"}
+
+# (month folder, file name) -> (size_bytes, mtime_ns), None once the file is gone
+FileKey = tuple[str, str]
+FileStat = Optional[tuple[int, int]]
+
+
+def scan(root: Path) -> dict[FileKey, tuple[int, int]]:
+    files = {}
+    if not root.is_dir():
+        return files
+    for month_dir in root.iterdir():
+        if not (month_dir.is_dir() and MONTH_DIR.fullmatch(month_dir.name)):
+            continue
+        for p in month_dir.iterdir():
+            # ~$ and dot files are editor lock / temp files next to an open workbook
+            if p.suffix.lower() not in SUBMISSION_SUFFIXES or p.name.startswith(("~$", ".")):
+                continue
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            files[(month_dir.name, p.name)] = (st.st_size, st.st_mtime_ns)
+    return files
+
+
+def loaded_files() -> dict[FileKey, tuple[int, int]]:
+    conn = connect()
+    try:
+        rows = execute(conn, INGEST_FILES_SQL).fetchall()
+    finally:
+        conn.close()
+    return {(r[0], r[1]): (int(r[3]), int(r[4])) for r in rows}
+
+
+class Debouncer:
+    """Reports a key once the state observed for it has held still for `seconds`."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self._since: dict[FileKey, tuple[FileStat, float]] = {}
+
+    def settled(self, observed: dict[FileKey, FileStat], now: float) -> list[FileKey]:
+        ready = []
+        for key, state in observed.items():
+            seen = self._since.get(key)
+            if seen is None or seen[0] != state:
+                self._since[key] = (state, now)
+                seen = self._since[key]
+            if now - seen[1] >= self.seconds:
+                ready.append(key)
+        for key in self._since.keys() - observed.keys():
+            del self._since[key]
+        return sorted(ready)
+
+    def restart(self, keys: list[FileKey], now: float) -> None:
+        # wait a full debounce period again before retrying these
+        for key in keys:
+            if key in self._since:
+                self._since[key] = (self._since[key][0], now)
+
+
+def pending_changes(root: Path) -> dict[FileKey, FileStat]:
+    """Files whose stat differs from what was last loaded, and loaded files that are gone."""
+    on_disk = scan(root)
+    loaded = loaded_files()
+    changes: dict[FileKey, FileStat] = {k: stat for k, stat in on_disk.items() if loaded.get(k) != stat}
+    changes.update({k: None for k in loaded.keys() - on_disk.keys()})
+    return changes
+
+
+def process(root: Path, keys: list[FileKey], changes: dict[FileKey, FileStat], **refresh_kw) -> list[MonthStats]:
+    changed = [root / month / name for month, name in keys if changes[(month, name)] is not None]
+    removed = [k for k in keys if changes[k] is None]
+    return refresh_files(changed, removed, **refresh_kw)
+
+
+def watch(
+    root: Path | None = None,
+    poll_seconds: float | None = None,
+    debounce_seconds: float | None = None,
+    once: bool = False,
+    **refresh_kw,
+) -> None:
+    """
+    Poll the submissions folder and refresh settled changes until interrupted. once=True
+    loads everything that differs from ingest_files right away and returns.
+    """
+    root = Path(root or settings.raw_submissions_dir)
+    poll_seconds = settings.watch_poll_seconds if poll_seconds is None else poll_seconds
+    debouncer = Debouncer(0 if once else settings.watch_debounce_seconds if debounce_seconds is None else debounce_seconds)
+    if not once:
+        print(f"Watching {root.resolve()} (every {poll_seconds:g}s, debounce {debouncer.seconds:g}s); Ctrl+C to stop")
+    while True:
+        changes = pending_changes(root)
+        now = time.monotonic()
+        ready = debouncer.settled(changes, now)
+        if ready:
+            try:
+                if not process(root, ready, changes, **refresh_kw):
+                    print(f"{len(ready)} file(s) touched without content changes; nothing to load")
+            except Exception as exc:
+                if once:
+                    raise
+                # e.g. the database is locked by a month-end batch; the files stay pending
+                print(f"WARNING: refresh of {len(ready)} file(s) failed, retrying after the debounce period ({type(exc).__name__}: {exc})")
+                debouncer.restart(ready, now)
+        if once:
+            if not ready:
+                print("No new, changed or removed submission files")
+            return
+        time.sleep(poll_seconds)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--once", action="store_true", help="process pending changes without debouncing, then exit")
+    parser.add_argument("--poll", type=float, default=None, help="seconds between scans (default: WATCH_POLL_SECONDS)")
+    parser.add_argument("--debounce", type=float, default=None, help="seconds a file must be unmodified (default: WATCH_DEBOUNCE_SECONDS)")
+    parser.add_argument(
+        "--brief-scopes",
+        default=None,
+        help="comma-separated brief scopes: national, region, team (default: BRIEF_SCOPES)",
+    )
+    parser.add_argument("--export", action="store_true", help="also queue an incremental Power BI export after each refresh")
+    parser.add_argument("--no-wait", action="store_true", help="queue post-load jobs for `python src/jobs.py work --follow`")
+    parser.add_argument("--job-workers", type=int, default=None, help="job worker processes (default: JOB_WORKERS)")
+    args = parser.parse_args()
+    try:
+        watch(
+            poll_seconds=args.poll,
+            debounce_seconds=args.debounce,
+            once=args.once,
+            brief_scopes=args.brief_scopes.split(",") if args.brief_scopes else None,
+            export=args.export,
+            wait_for_jobs=not args.no_wait,
+            job_workers=args.job_workers,
+        )
+    except KeyboardInterrupt:
+        print("Stopped")